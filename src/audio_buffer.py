@@ -0,0 +1,125 @@
+import time
+
+SD_BLOCK_SIZE = 512
+
+
+class AudioRingBuffer:
+    """Preallocated byte ring that drains to a file in whole SD blocks.
+
+    ``write()`` copies a bytes-like chunk (including a memoryview) straight
+    into the ring without an intermediate ``bytes`` object. ``drain()`` hands
+    the file contiguous memoryview slices whose length is a multiple of
+    ``block_size``, so the card only sees whole-sector writes; a partial
+    block is held back until ``drain(force=True)``. Chunks that do not fit
+    are dropped and counted as overruns.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 16384,
+        *,
+        block_size: int = SD_BLOCK_SIZE,
+        flush_bytes: int = 4096,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if capacity < block_size:
+            capacity = block_size
+        capacity -= capacity % block_size
+
+        self.capacity = capacity
+        self.block_size = block_size
+        self.flush_bytes = flush_bytes  # drain once this many bytes are queued
+        self.flush_interval = flush_interval  # ...or this many seconds have passed
+
+        self._buf = bytearray(capacity)
+        self._mv = memoryview(self._buf)
+        self._head = 0  # next write position
+        self._tail = 0  # next read position
+        self.level = 0
+        self._last_drain = time.monotonic()
+
+        self.reset_stats()
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.level
+
+    def reset(self) -> None:
+        """Discard queued data (stats are kept)."""
+        self._head = 0
+        self._tail = 0
+        self.level = 0
+        self._last_drain = time.monotonic()
+
+    def reset_stats(self) -> None:
+        self.high_water = 0
+        self.overruns = 0
+        self.dropped_bytes = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.drains = 0
+
+    def write(self, chunk) -> int:
+        """Queue ``chunk`` and return its size in bytes, or 0 if it won't fit."""
+        mv = chunk if isinstance(chunk, memoryview) else memoryview(chunk)
+        if getattr(mv, "itemsize", 1) != 1:
+            mv = mv.cast("B")
+        size = len(mv)
+        if size > self.capacity - self.level:
+            self.overruns += 1
+            self.dropped_bytes += size
+            return 0
+
+        head = self._head
+        first = self.capacity - head
+        if size <= first:
+            self._mv[head:head + size] = mv
+        else:
+            self._mv[head:] = mv[:first]
+            self._mv[:size - first] = mv[first:]
+        self._head = (head + size) % self.capacity
+
+        self.level += size
+        self.bytes_in += size
+        if self.level > self.high_water:
+            self.high_water = self.level
+        return size
+
+    def drain_due(self, now: float) -> bool:
+        if self.level >= self.flush_bytes:
+            return True
+        return self.level >= self.block_size and now - self._last_drain >= self.flush_interval
+
+    def drain(self, sink, now=None, force: bool = False) -> int:
+        """Write queued whole blocks (everything if ``force``) to ``sink``."""
+        if now is None:
+            now = time.monotonic()
+        if not force and not self.drain_due(now):
+            return 0
+
+        size = self.level if force else self.level - self.level % self.block_size
+        written = 0
+        while written < size:
+            tail = self._tail
+            run = min(size - written, self.capacity - tail)
+            sink.write(self._mv[tail:tail + run])
+            self._tail = (tail + run) % self.capacity
+            self.level -= run
+            written += run
+
+        self.bytes_out += written
+        self.drains += 1
+        self._last_drain = now
+        return written
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "level": self.level,
+            "high_water": self.high_water,
+            "overruns": self.overruns,
+            "dropped_bytes": self.dropped_bytes,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "drains": self.drains,
+        }
@@ -0,0 +1,283 @@
+import time
+from array import array
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    import numpy as np
+
+
+class BufferedAdcSource:
+    """Reads radio and mic audio with ``analogbufio.BufferedIn``.
+
+    Samples are left as raw ADC codes in ``array('H')`` buffers. Only one
+    continuous conversion runs at a time, so each call converts one channel
+    and blocks for the length of ``buf``; :class:`AudioCapture` keeps those
+    reads short and alternates them. Pass ``mic_pin=None`` to record the
+    radio only.
+    """
+
+    def __init__(self, radio_pin, mic_pin=None, *, sample_rate: int = 16000, adc_bits: int = 12) -> None:
+        import analogbufio
+
+        self.sample_rate = sample_rate
+        self.adc_bits = adc_bits
+        self._radio = analogbufio.BufferedIn(radio_pin, sample_rate=sample_rate)
+        self._mic = None
+        if mic_pin is not None:
+            self._mic = analogbufio.BufferedIn(mic_pin, sample_rate=sample_rate)
+
+    @property
+    def has_mic(self) -> bool:
+        return self._mic is not None
+
+    def read_radio(self, buf) -> None:
+        self._radio.readinto(buf)
+
+    def read_mic(self, buf) -> None:
+        self._mic.readinto(buf)
+
+    def deinit(self) -> None:
+        self._radio.deinit()
+        if self._mic is not None:
+            self._mic.deinit()
+
+
+class LoopSource:
+    """Plays preloaded ADC codes back in a loop; a stand-in for the ADC on a host.
+
+    ``radio`` and ``mic`` are sequences of raw codes (``adc_bits`` wide).
+    """
+
+    def __init__(self, radio, mic=None, *, sample_rate: int = 16000, adc_bits: int = 12) -> None:
+        self.sample_rate = sample_rate
+        self.adc_bits = adc_bits
+        self._radio = array("H", radio)
+        self._mic = array("H", mic) if mic is not None else None
+        self._radio_pos = 0
+        self._mic_pos = 0
+
+    @property
+    def has_mic(self) -> bool:
+        return self._mic is not None
+
+    def read_radio(self, buf) -> None:
+        self._radio_pos = self._copy_loop(self._radio, self._radio_pos, buf)
+
+    def read_mic(self, buf) -> None:
+        self._mic_pos = self._copy_loop(self._mic, self._mic_pos, buf)
+
+    @staticmethod
+    def _copy_loop(src, pos, dst) -> int:
+        n = len(dst)
+        filled = 0
+        while filled < n:
+            run = min(n - filled, len(src) - pos)
+            dst[filled:filled + run] = src[pos:pos + run]
+            filled += run
+            pos = (pos + run) % len(src)
+        return pos
+
+
+class AudioCapture:
+    """Double-buffered capture of interleaved radio (L) / mic (R) blocks.
+
+    Each ``step()`` reads one chunk of ``chunk_frames`` raw samples from a
+    single channel, so a call blocks for at most ``chunk_period`` and the
+    other scheduler tasks keep their deadlines. Once a block of
+    ``block_frames`` is complete it is converted to signed 16-bit stereo in
+    one of two preallocated frame buffers, using whole-array operations
+    (ulab on the device, NumPy on a host) rather than per-sample loops.
+
+    The mic channel is only filled while the PTT input is held (decided per
+    block); otherwise it is silence. The ADC converts one channel at a time,
+    so with the mic on the chunks alternate between radio and mic. Every
+    chunk still becomes ``chunk_frames`` stereo frames at its place in
+    time, so the WAV keeps real time; the channel that was not being
+    converted is written as silence for that chunk. Each channel then only
+    covers half of a mic block, which is recorded as a ``mic_on alt_us=...``
+    WAV marker (the length of each alternating chunk) where mic blocks
+    start, and ``mic_off`` where they stop. ``gap_frames`` counts the
+    frames written as silence on one channel.
+
+    While ``radio_muted`` is set (e.g. during a radio refresh excursion to
+    another channel) radio chunks are still read, to keep the timing, but
+    recorded as silence; ``muted_frames`` counts them.
+
+    The finished buffer goes straight to ``SessionManager.append_audio_chunk``
+    and to any ``listeners``, and stays valid until the block after next, so
+    readers never need a copy. Blocks the session ring refused are counted
+    in ``dropped``; blocks lost because ``step()`` ran late are counted in
+    ``missed``.
+    """
+
+    def __init__(
+        self,
+        source,
+        session_manager=None,
+        *,
+        block_frames: int = 256,
+        chunk_frames: int = 64,
+        ptt=None,
+        ptt_active_low: bool = True,
+        debug: bool = False,
+    ) -> None:
+        self.source = source
+        self.session_manager = session_manager
+        if chunk_frames <= 0 or block_frames % chunk_frames:
+            raise ValueError("chunk_frames must divide block_frames.")
+        self.block_frames = block_frames
+        self.chunk_frames = chunk_frames
+        self.ptt = ptt  # anything with a boolean .value, e.g. digitalio.DigitalInOut
+        self.ptt_active_low = ptt_active_low
+        self.debug = debug
+        self.enabled = True
+        self.radio_muted = False
+        self.listeners = []  # callables(frame_view, mic_active)
+        self.period = block_frames / source.sample_rate
+        self.chunk_period = chunk_frames / source.sample_rate
+
+        # Raw ADC codes: ``adc_bits`` unsigned, re-centred in place as int16
+        adc_bits = source.adc_bits
+        if adc_bits > 15:
+            raise ValueError("AudioCapture supports ADCs up to 15 bits.")
+        self._bias = 1 << (adc_bits - 1)
+        self._scale = 1 << (16 - adc_bits)
+        self._radio_raw = array("H", bytes(2 * block_frames))
+        self._mic_raw = array("H", bytes(2 * block_frames))
+        self._radio = np.frombuffer(self._radio_raw, dtype=np.int16)
+        self._mic = np.frombuffer(self._mic_raw, dtype=np.int16)
+        self._radio_mv = memoryview(self._radio_raw)
+        self._mic_mv = memoryview(self._mic_raw)
+        # Mid-scale codes, written over a channel's unconverted chunks
+        self._silence = array("H", [self._bias] * chunk_frames)
+        self._pos = 0  # frames of the current block read so far
+        self._block_mic = False
+
+        # Two interleaved stereo frame buffers, filled alternately
+        frame_bytes = 4 * block_frames
+        self._buffers = (bytearray(frame_bytes), bytearray(frame_bytes))
+        self._views = (memoryview(self._buffers[0]), memoryview(self._buffers[1]))
+        self._frames = (
+            np.frombuffer(self._buffers[0], dtype=np.int16),
+            np.frombuffer(self._buffers[1], dtype=np.int16),
+        )
+        self._fill = 0
+        self.latest = None  # memoryview of the last finished block
+        self.latest_mic = False
+
+        self._deadline = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.blocks = 0
+        self.mic_blocks = 0
+        self.dropped = 0
+        self.missed = 0
+        self.gap_frames = 0
+        self.muted_frames = 0
+
+    def mic_wanted(self) -> bool:
+        if self.ptt is None:
+            return False
+        return bool(self.ptt.value) != self.ptt_active_low
+
+    def next_deadline(self, now):
+        if not self.enabled:
+            return now + 0.25
+        if self._deadline is None:
+            return now
+        return self._deadline
+
+    def step(self, now=None) -> bool:
+        """Capture, convert and hand off one block; False if it was dropped."""
+        if not self.enabled:
+            return False
+        if now is None:
+            now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        elif now - self._deadline >= self.period:
+            late = int((now - self._deadline) / self.period)
+            self.missed += late
+            self._deadline += late * self.period
+            # The partial block has a gap in it; start a new one
+            self._pos = 0
+
+        pos = self._pos
+        end = pos + self.chunk_frames
+        if pos == 0:
+            self._block_mic = self.source.has_mic and self.mic_wanted()
+        if not self._block_mic or (pos // self.chunk_frames) % 2 == 0:
+            self.source.read_radio(self._radio_mv[pos:end])
+            if self.radio_muted:
+                self._radio_mv[pos:end] = self._silence
+                self.muted_frames += self.chunk_frames
+            if self._block_mic:
+                self._mic_mv[pos:end] = self._silence
+                self.gap_frames += self.chunk_frames
+        else:
+            self.source.read_mic(self._mic_mv[pos:end])
+            self._radio_mv[pos:end] = self._silence
+            self.gap_frames += self.chunk_frames
+        self._deadline += self.chunk_period
+        self._pos = end
+        if end < self.block_frames:
+            return True
+        self._pos = 0
+
+        mic_active = self._block_mic
+        index = self._fill
+        self._convert(self._frames[index], mic_active)
+        self._fill = 1 - index
+
+        view = self._views[index]
+        manager = self.session_manager
+        if mic_active != self.latest_mic and manager is not None and manager.session_active:
+            if mic_active:
+                manager.add_marker("mic_on alt_us={}".format(int(self.chunk_period * 1e6)))
+            else:
+                manager.add_marker("mic_off")
+        self.latest = view
+        self.latest_mic = mic_active
+        self.blocks += 1
+        if mic_active:
+            self.mic_blocks += 1
+
+        for listener in self.listeners:
+            listener(view, mic_active)
+
+        if manager is not None and manager.session_active:
+            if not manager.append_audio_chunk(view):
+                self.dropped += 1
+                if self.debug:
+                    print("AudioCapture: block dropped by session ring")
+                return False
+        return True
+
+    def stats(self):
+        return {
+            "blocks": self.blocks,
+            "mic_blocks": self.mic_blocks,
+            "dropped": self.dropped,
+            "missed": self.missed,
+            "gap_frames": self.gap_frames,
+            "muted_frames": self.muted_frames,
+            "block_frames": self.block_frames,
+            "chunk_frames": self.chunk_frames,
+        }
+
+    # Private methods
+    def _convert(self, frames, mic_active: bool) -> None:
+        # Raw codes fit in int16, so centring and scaling can run in place
+        radio = self._radio
+        radio -= self._bias
+        radio *= self._scale
+        frames[0::2] = radio
+        if mic_active:
+            mic = self._mic
+            mic -= self._bias
+            mic *= self._scale
+            frames[1::2] = mic
+        else:
+            frames[1::2] = 0
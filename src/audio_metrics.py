@@ -0,0 +1,87 @@
+import math
+from array import array
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    import numpy as np
+
+RADIO = 0
+MIC = 1
+FULL_SCALE = 32768
+
+
+class AudioMetrics:
+    """RMS, peak and clip counts for each captured stereo block.
+
+    Register ``update`` as an :class:`AudioCapture` listener. Every block is
+    measured once with whole-array ulab/NumPy reductions and the results are
+    published in place in small preallocated arrays (``rms``, ``peak``,
+    ``clips``, indexed by ``RADIO``/``MIC``), so the PTT LED, the UI and the
+    data sidecar all read the same numbers without copying or recomputing.
+    ``sequence`` increases with every block so readers can tell fresh values
+    from stale ones.
+    """
+
+    def __init__(self, *, clip_level: int = 32000, floor_db: float = -60.0) -> None:
+        self.clip_level = clip_level
+        self.floor_db = floor_db
+        self.rms = array("f", [0.0, 0.0])
+        self.peak = array("H", [0, 0])
+        self.clips = array("H", [0, 0])
+        self.mic_active = False
+        self.sequence = 0
+        self.total_clips = 0
+        # The capture stage reuses two buffers; keep one ndarray view per buffer
+        self._views = {}
+
+    def update(self, block, mic_active: bool = False) -> None:
+        frames = self._views.get(id(block))
+        if frames is None:
+            frames = np.frombuffer(block, dtype=np.int16)
+            self._views[id(block)] = frames
+
+        self._measure(RADIO, frames[0::2])
+        if mic_active:
+            self._measure(MIC, frames[1::2])
+        else:
+            self.rms[MIC] = 0.0
+            self.peak[MIC] = 0
+            self.clips[MIC] = 0
+        self.mic_active = mic_active
+        self.sequence += 1
+
+    def dbfs(self, channel: int = RADIO) -> float:
+        rms = self.rms[channel]
+        if rms <= 0.0:
+            return self.floor_db
+        return max(self.floor_db, 20.0 * math.log10(rms / FULL_SCALE))
+
+    def brightness(self, channel: int = RADIO) -> float:
+        """Level mapped onto 0.0-1.0 across ``floor_db``..0 dBFS."""
+        return 1.0 - self.dbfs(channel) / self.floor_db
+
+    def payload_into(self, payload):
+        """Add the latest levels to a sidecar payload dict and return it."""
+        payload["radio_rms"] = int(self.rms[RADIO])
+        payload["mic_rms"] = int(self.rms[MIC])
+        payload["clips"] = self.clips[RADIO] + self.clips[MIC]
+        return payload
+
+    # Private methods
+    def _measure(self, channel: int, samples) -> None:
+        # mean/std run in floating point, so int16 squares cannot overflow
+        mean = float(np.mean(samples))
+        std = float(np.std(samples))
+        self.rms[channel] = math.sqrt(std * std + mean * mean)
+
+        peak = max(int(np.max(samples)), -int(np.min(samples)))
+        if peak > 0xFFFF:
+            peak = 0xFFFF
+        self.peak[channel] = peak
+
+        clips = 0
+        if peak >= self.clip_level:
+            clips = int(np.sum(samples >= self.clip_level)) + int(np.sum(samples <= -self.clip_level))
+        self.clips[channel] = clips
+        self.total_clips += clips
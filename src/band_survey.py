@@ -0,0 +1,236 @@
+class SurveyState:
+    IDLE = 0
+    TUNE = 1
+    WAIT_STC = 2
+    SETTLE = 3
+    SEEK = 4
+
+
+class BandSurvey:
+    """Non-blocking RSSI survey of a list of FM channels.
+
+    Each channel is tuned and, once STC is set, RSSI is sampled until
+    ``settle_count`` consecutive readings agree within ``settle_tolerance``
+    or ``max_dwell`` expires, so strong and empty channels both finish as
+    soon as the reading is stable. With ``use_seek`` the chip's hardware
+    seek skips between occupied channels; channels it passes over are
+    recorded at ``seek_floor_rssi``.
+
+    ``on_measure(freq, rssi, now)`` is called for every recorded channel.
+    """
+
+    def __init__(
+        self,
+        radio,
+        on_measure,
+        *,
+        min_dwell: float = 0.01,
+        max_dwell: float = 0.2,
+        settle_count: int = 3,
+        settle_tolerance: int = 1,
+        use_seek: bool = False,
+        seek_threshold: int = 4,
+        seek_floor_rssi: int = 0,
+        debug: bool = False,
+    ) -> None:
+        self.radio = radio
+        self.on_measure = on_measure
+        self.min_dwell = min_dwell
+        self.max_dwell = max_dwell
+        self.settle_count = settle_count
+        self.settle_tolerance = settle_tolerance
+        self.use_seek = use_seek
+        self.seek_threshold = seek_threshold
+        self.seek_floor_rssi = seek_floor_rssi
+        self.debug = debug
+
+        self.state = SurveyState.IDLE
+        self._freqs = []
+        self._index = 0
+        self._tune_time = 0.0
+        self._stc_time = 0.0
+        self._sample_time = 0.0
+        self._last_rssi = -1
+        self._agree = 0
+
+        self._reset_stats()
+
+    @property
+    def in_progress(self) -> bool:
+        return self.state != SurveyState.IDLE
+
+    def start(self, freqs, now: float) -> bool:
+        """Begin surveying ``freqs`` (ascending, in 10 kHz units)."""
+        if not freqs:
+            return False
+
+        self._freqs = freqs
+        self._index = 0
+        self._reset_stats()
+        self._start_time = now
+
+        if self.use_seek:
+            # The first channel is tuned directly, then we seek upwards from it
+            self.radio.set_seek_threshold(self.seek_threshold)
+        self.state = SurveyState.TUNE
+
+        if self.debug:
+            print("BandSurvey: surveying", len(freqs), "channels, seek =", self.use_seek)
+        return True
+
+    def cancel(self) -> None:
+        self.state = SurveyState.IDLE
+
+    def next_deadline(self, now: float) -> float:
+        """Monotonic time at which step() next has work to do."""
+        if self.state == SurveyState.SETTLE:
+            return self._sample_time + self.min_dwell
+        return now
+
+    def step(self, now: float) -> bool:
+        """Advance the survey; returns True when it has just finished."""
+        state = self.state
+        if state == SurveyState.IDLE:
+            return False
+
+        if state == SurveyState.TUNE:
+            if self._index >= len(self._freqs):
+                return self._finish(now)
+            self.radio.set_freq(self._freqs[self._index])
+            self._tune_time = now
+            self.state = SurveyState.WAIT_STC
+
+        elif state == SurveyState.WAIT_STC:
+            if self.radio.poll_tune():
+                self._begin_settle(now)
+            elif now - self._tune_time >= self.max_dwell:
+                # Tune never completed; record what the chip reports
+                self._stc_time = now
+                self._record(self._freqs[self._index], self.radio.status_rssi(0), now, False)
+                self._advance()
+
+        elif state == SurveyState.SETTLE:
+            if now - self._sample_time >= self.min_dwell:
+                self._sample(now)
+
+        elif state == SurveyState.SEEK:
+            found = self.radio.poll_seek()
+            if found is not None:
+                self._seek_done(found, now)
+
+        return self.state == SurveyState.IDLE
+
+    def stats(self):
+        """Survey duration and per-channel dwell statistics."""
+        measured = self.channels_measured
+        return {
+            "elapsed_s": self.elapsed,
+            "channels_measured": measured,
+            "channels_skipped": self.channels_skipped,
+            "early_exits": self.early_exits,
+            "timeouts": self.timeouts,
+            "seeks": self.seeks,
+            "dwell_min_s": self.dwell_min if measured else 0.0,
+            "dwell_max_s": self.dwell_max,
+            "dwell_mean_s": self.dwell_total / measured if measured else 0.0,
+            "stc_mean_s": self.stc_total / measured if measured else 0.0,
+        }
+
+    # Private methods
+    def _reset_stats(self) -> None:
+        self._start_time = 0.0
+        self.elapsed = 0.0
+        self.channels_measured = 0
+        self.channels_skipped = 0
+        self.early_exits = 0
+        self.timeouts = 0
+        self.seeks = 0
+        self.dwell_min = 0.0
+        self.dwell_max = 0.0
+        self.dwell_total = 0.0
+        self.stc_total = 0.0
+
+    def _begin_settle(self, now: float) -> None:
+        self._stc_time = now
+        self._sample_time = now
+        self._last_rssi = self.radio.rssi
+        self._agree = 1
+        self.state = SurveyState.SETTLE
+
+    def _sample(self, now: float) -> None:
+        rssi = self.radio.status_rssi(0)
+        if abs(rssi - self._last_rssi) <= self.settle_tolerance:
+            self._agree += 1
+        else:
+            self._agree = 1
+        self._last_rssi = rssi
+        self._sample_time = now
+
+        settled = self._agree >= self.settle_count
+        if settled or now - self._tune_time >= self.max_dwell:
+            self._record(self._freqs[self._index], rssi, now, settled)
+            if self.use_seek:
+                self._index += 1
+                self._start_seek(now)
+            else:
+                self._advance()
+
+    def _record(self, freq: int, rssi: int, now: float, settled: bool) -> None:
+        dwell = now - self._tune_time
+        if self.channels_measured == 0 or dwell < self.dwell_min:
+            self.dwell_min = dwell
+        if dwell > self.dwell_max:
+            self.dwell_max = dwell
+        self.dwell_total += dwell
+        self.stc_total += self._stc_time - self._tune_time
+        self.channels_measured += 1
+        if settled:
+            self.early_exits += 1
+        else:
+            self.timeouts += 1
+
+        self.on_measure(freq, rssi, now)
+        if self.debug:
+            print("BandSurvey: RSSI for", freq, "is", rssi, "after", dwell, "s")
+
+    def _advance(self) -> None:
+        self._index += 1
+        self.state = SurveyState.TUNE
+
+    def _start_seek(self, now: float) -> None:
+        if self._index >= len(self._freqs):
+            self._finish(now)
+            return
+        self.radio.start_seek(up=True, wrap=False)
+        self._tune_time = now
+        self.seeks += 1
+        self.state = SurveyState.SEEK
+
+    def _seek_done(self, found: bool, now: float) -> None:
+        freqs = self._freqs
+        stop = self.radio.frequency if found else freqs[-1] + 1
+
+        # Every channel the seek passed over is below the seek threshold
+        while self._index < len(freqs) and freqs[self._index] < stop:
+            self.on_measure(freqs[self._index], self.seek_floor_rssi, now)
+            self.channels_skipped += 1
+            self._index += 1
+
+        if self._index >= len(freqs):
+            self._finish(now)
+            return
+
+        if freqs[self._index] == stop:
+            # Seek landed on a channel we still need; it is already tuned
+            self._tune_time = now
+            self._begin_settle(now)
+        else:
+            # Landed on a channel that was already measured; keep seeking
+            self._start_seek(now)
+
+    def _finish(self, now: float) -> bool:
+        self.elapsed = now - self._start_time
+        self.state = SurveyState.IDLE
+        if self.debug:
+            print("BandSurvey: survey complete:", self.stats())
+        return True
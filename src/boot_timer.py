@@ -0,0 +1,80 @@
+import time
+
+# Addresses on the STEMMA bus: RDA5807M (random access), LIS2MDL, IS31FL3741
+RADIO_ADDRESS = 0x11
+MAG_ADDRESS = 0x1E
+MATRIX_ADDRESS = 0x30
+EXPECTED_ADDRESSES = (RADIO_ADDRESS, MAG_ADDRESS, MATRIX_ADDRESS)
+
+
+class BootTimer:
+    """Records how long each boot phase takes.
+
+    ``mark(name)`` closes the phase that started at the previous mark (or
+    at construction). ``milestone(name)`` notes the time since boot without
+    starting a new phase, e.g. when the first audio block arrives, and is
+    only kept the first time. ``target_ms`` flags a slow first-audio time
+    in the report.
+    """
+
+    def __init__(self, *, target_ms=None) -> None:
+        self.target_ms = target_ms
+        self._start = time.monotonic_ns()
+        self._last = self._start
+        self.phases = []  # (name, ms)
+        self.milestones = {}  # name -> ms since boot
+
+    def elapsed_ms(self) -> float:
+        return (time.monotonic_ns() - self._start) / 1e6
+
+    def mark(self, name: str) -> float:
+        """End the current phase as ``name``; returns its duration in ms."""
+        now = time.monotonic_ns()
+        duration = (now - self._last) / 1e6
+        self._last = now
+        self.phases.append((name, duration))
+        return duration
+
+    def milestone(self, name: str) -> None:
+        if name not in self.milestones:
+            self.milestones[name] = self.elapsed_ms()
+
+    def report(self):
+        first_audio = self.milestones.get("first_audio")
+        return {
+            "phases": list(self.phases),
+            "milestones": dict(self.milestones),
+            "total_ms": (self._last - self._start) / 1e6,
+            "on_target": None if self.target_ms is None or first_audio is None else first_audio <= self.target_ms,
+        }
+
+    def print_report(self) -> None:
+        print("Boot timing:")
+        for name, duration in self.phases:
+            print("  {:<20} {:8.1f} ms".format(name, duration))
+        for name, at in self.milestones.items():
+            print("  {:<20} at {:5.1f} ms".format(name, at))
+        on_target = self.report()["on_target"]
+        if on_target is False:
+            print("  first audio missed the", self.target_ms, "ms target")
+
+
+def probe_i2c(i2c, addresses=EXPECTED_ADDRESSES):
+    """Return the subset of ``addresses`` that acknowledge, without a full scan.
+
+    Each address gets a zero-length write; on a 7-bit bus that is a single
+    address byte, where ``i2c.scan()`` walks all 112 addresses.
+    """
+    while not i2c.try_lock():
+        pass
+    present = []
+    try:
+        for address in addresses:
+            try:
+                i2c.writeto(address, b"")
+                present.append(address)
+            except OSError:
+                pass
+    finally:
+        i2c.unlock()
+    return present
@@ -0,0 +1,262 @@
+import random
+from array import array
+
+# Rebuild phases
+_IDLE = 0
+_SUM = 1
+_PARTITION = 2
+_PAIR = 3
+_FINISH = 4
+
+
+class AliasSampler:
+    """Weighted random channel picker using Vose's alias method.
+
+    ``sample()`` is O(1). Weights are updated one channel at a time with
+    ``set_weight()``; a changed weight marks the table dirty and a new table
+    is built in the background, ``chunk`` entries per ``rebuild_step()``
+    call, then swapped in. The per-hop cost therefore stays constant while
+    the table follows the spectrum with a short lag.
+    """
+
+    def __init__(self, size: int, *, chunk: int = 32) -> None:
+        self.size = size
+        self.chunk = chunk
+        self.weights = array("f", [1.0] * size)
+        self.offset = 0
+        self.count = size
+
+        # Double-buffered tables; _active is the one sample() reads
+        self._prob = (array("f", [1.0] * size), array("f", [1.0] * size))
+        self._alias = (array("H", range(size)), array("H", range(size)))
+        self._active = 0
+        self._table_offset = 0
+        self._table_count = 0
+
+        # Scratch space for the incremental build
+        self._scaled = array("f", [0.0] * size)
+        self._small = array("H", [0] * size)
+        self._large = array("H", [0] * size)
+        self._n_small = 0
+        self._n_large = 0
+        self._total = 0.0
+        self._cursor = 0
+        self._phase = _IDLE
+        self._build_offset = 0
+        self._build_count = 0
+
+        self.dirty = True
+        self.rebuilds = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._table_count > 0
+
+    def set_range(self, offset: int, count: int) -> None:
+        """Restrict sampling to channels [offset, offset + count)."""
+        if offset == self.offset and count == self.count:
+            return
+        self.offset = offset
+        self.count = count
+        self.dirty = True
+        self._phase = _IDLE
+
+    def set_weight(self, index: int, weight: float) -> None:
+        if self.weights[index] != weight:
+            self.weights[index] = weight
+            if self.offset <= index < self.offset + self.count:
+                self.dirty = True
+
+    def rebuild_step(self, budget=None) -> bool:
+        """Do up to ``budget`` units of table building; True when swapped in."""
+        if budget is None:
+            budget = self.chunk
+        if self._phase == _IDLE:
+            if not self.dirty:
+                return False
+            self._begin_build()
+
+        while budget > 0 and self._phase != _IDLE:
+            budget -= 1
+            self._build_unit()
+        return self._phase == _IDLE
+
+    def rebuild(self) -> None:
+        """Build a complete table immediately."""
+        # Restart from the current weights, including a build in progress
+        self._phase = _IDLE
+        self.dirty = True
+        while not self.rebuild_step(self.size * 4 + 8):
+            pass
+
+    def sample(self) -> int:
+        """Return a channel index drawn in proportion to its weight."""
+        if not self.ready:
+            self.rebuild()
+        i = random.randrange(self._table_count)
+        if random.random() < self._prob[self._active][i]:
+            return self._table_offset + i
+        return self._table_offset + self._alias[self._active][i]
+
+    # Private methods
+    def _begin_build(self) -> None:
+        self.dirty = False
+        if self.count <= 0:
+            return
+        self._build_offset = self.offset
+        self._build_count = self.count
+        self._total = 0.0
+        self._cursor = 0
+        self._n_small = 0
+        self._n_large = 0
+        self._phase = _SUM
+
+    def _build_unit(self) -> None:
+        target = 1 - self._active
+        prob = self._prob[target]
+        alias = self._alias[target]
+        count = self._build_count
+        scaled = self._scaled
+
+        if self._phase == _SUM:
+            # Snapshot weights so later updates only affect the next build
+            i = self._cursor
+            w = self.weights[self._build_offset + i]
+            scaled[i] = w
+            self._total += w
+            self._cursor += 1
+            if self._cursor >= count:
+                self._cursor = 0
+                self._phase = _PARTITION
+
+        elif self._phase == _PARTITION:
+            i = self._cursor
+            if self._total > 0.0:
+                scaled[i] = scaled[i] * count / self._total
+            else:
+                scaled[i] = 1.0
+            if scaled[i] < 1.0:
+                self._small[self._n_small] = i
+                self._n_small += 1
+            else:
+                self._large[self._n_large] = i
+                self._n_large += 1
+            self._cursor += 1
+            if self._cursor >= count:
+                self._phase = _PAIR
+
+        elif self._phase == _PAIR:
+            if self._n_small == 0 or self._n_large == 0:
+                self._phase = _FINISH
+                return
+            self._n_small -= 1
+            s = self._small[self._n_small]
+            l = self._large[self._n_large - 1]
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                self._n_large -= 1
+                self._small[self._n_small] = l
+                self._n_small += 1
+
+        elif self._phase == _FINISH:
+            # Leftovers are 1.0 up to rounding error
+            if self._n_large:
+                self._n_large -= 1
+                prob[self._large[self._n_large]] = 1.0
+            elif self._n_small:
+                self._n_small -= 1
+                prob[self._small[self._n_small]] = 1.0
+            else:
+                self._active = target
+                self._table_offset = self._build_offset
+                self._table_count = count
+                self._phase = _IDLE
+                self.rebuilds += 1
+
+
+# Maximal-length Galois LFSR feedback masks (and their reciprocals) by width
+_LFSR_MASKS = {
+    2: (0x3, 0x3),
+    3: (0x6, 0x5),
+    4: (0xC, 0x9),
+    5: (0x14, 0x12),
+    6: (0x30, 0x21),
+    7: (0x60, 0x41),
+    8: (0xB8, 0x8E),
+    9: (0x110, 0x108),
+    10: (0x240, 0x204),
+    11: (0x500, 0x402),
+    12: (0x829, 0xCA0),
+}
+
+
+def _gcd(a: int, b: int) -> int:
+    while b:
+        a, b = b, a % b
+    return a
+
+
+class LfsrPermutation:
+    """Pseudo-random permutation of channel indices 0..size-1 in O(1) memory.
+
+    A maximal-length LFSR walks every non-zero state of its width once per
+    period; states above ``size`` are skipped and the rest are mixed through
+    an affine map ``(a * v + b) % size``. Every cycle is re-seeded with a new
+    start state, feedback mask and affine map. ``next_index`` only accepts
+    channels inside the caller's range/step filter, so changing the filter
+    mid-cycle carries on with the same cycle instead of restarting it.
+    """
+
+    def __init__(self, size: int) -> None:
+        width = 2
+        while (1 << width) - 1 < size:
+            width += 1
+        if width not in _LFSR_MASKS:
+            raise ValueError("Too many channels for LfsrPermutation.")
+
+        self.size = size
+        self.width = width
+        self.period = (1 << width) - 1
+        self.cycles = 0
+        self._mask = 0
+        self._start = 1
+        self._state = 1
+        self._a = 1
+        self._b = 0
+        self.reseed()
+
+    def reseed(self) -> None:
+        """Start a new cycle with fresh randomness."""
+        self._mask = _LFSR_MASKS[self.width][random.getrandbits(1)]
+        self._start = random.randint(1, self.period)
+        self._state = self._start
+        size = self.size
+        a = random.randint(1, max(1, size - 1))
+        while _gcd(a, size) != 1:
+            a = a % (size - 1) + 1
+        self._a = a
+        self._b = random.randrange(size)
+
+    def next_index(self, lo: int, hi: int, step: int = 1):
+        """Next channel in [lo, hi] with (index - lo) % step == 0."""
+        size = self.size
+        for _ in range(2 * self.period + 1):
+            value = self._state - 1
+            index = (self._a * value + self._b) % size if value < size else -1
+
+            # Advance the Galois LFSR
+            state = self._state
+            lsb = state & 1
+            state >>= 1
+            if lsb:
+                state ^= self._mask
+            self._state = state
+            if state == self._start:
+                self.cycles += 1
+                self.reseed()
+
+            if lo <= index <= hi and (index - lo) % step == 0:
+                return index
+        return None
@@ -1,26 +1,47 @@
 import board
-import time
+from boot_timer import BootTimer, probe_i2c
+
+# Started first so module imports are part of the boot report
+boot = BootTimer(target_ms=1500)
+
 from device_controller import DeviceController
-import asyncio
-import tinkeringtech_rda5807m
-import adafruit_is31fl3741
-from adafruit_is31fl3741.adafruit_rgbmatrixqt import Adafruit_RGBMatrixQT
-from adafruit_bus_device.i2c_device import I2CDevice
+
+boot.mark("imports")
+
+# Audio inputs (AC-coupled, biased to mid-scale) and the PTT button
+RADIO_AUDIO_PIN = board.A0
+MIC_AUDIO_PIN = board.A1
+PTT_PIN = board.D5
+# Give up waiting for the first audio block after this long
+FIRST_AUDIO_TIMEOUT_MS = 5000
+
+def build_audio_capture():
+    import digitalio
+    from audio_capture import AudioCapture, BufferedAdcSource
+
+    ptt = digitalio.DigitalInOut(PTT_PIN)
+    ptt.switch_to_input(pull=digitalio.Pull.UP)
+    source = BufferedAdcSource(RADIO_AUDIO_PIN, MIC_AUDIO_PIN)
+    return AudioCapture(source, ptt=ptt)
 
 def main() -> None:
-    i2c = board.I2C()
     i2c = board.STEMMA_I2C()
-    while not i2c.try_lock():
-        time.sleep(0.01)
-
-    try:
-        addresses = i2c.scan()
-        print("Found addresses:", [hex(addr) for addr in addresses])
-    finally:
-        i2c.unlock()
-    # controller = DeviceController(i2c=i2c, debug=True)
-    # controller.initialize()
-    # controller.run_forever()
+    # Ask only the chips we expect to find instead of scanning the whole bus
+    present = probe_i2c(i2c)
+    boot.mark("i2c_probe")
+    print("Found addresses:", [hex(addr) for addr in present])
+
+    audio_capture = build_audio_capture()
+    boot.mark("audio")
+
+    controller = DeviceController(i2c=i2c, present=present, audio_capture=audio_capture, boot_timer=boot)
+    controller.initialize()
+    # Run until the first block is captured so the report covers time-to-audio
+    while "first_audio" not in boot.milestones and boot.elapsed_ms() < FIRST_AUDIO_TIMEOUT_MS:
+        controller.loop()
+    boot.print_report()
+    # controller.enable_emf()
+    controller.run_forever()
 
 if __name__ == "__main__":
     main()
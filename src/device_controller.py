@@ -1,14 +1,23 @@
 import time
 import board
-from radio_scanner import RadioScanner
-from emf_reader import EMFReader
+from scheduler import Scheduler
+from boot_timer import MAG_ADDRESS, MATRIX_ADDRESS, RADIO_ADDRESS
 
 class DeviceController:
     """Coordinates hardware services for the Experimental Spooky Box.
 
-    This initial version wires up the radio scanner and exposes hooks for the
-    eventual cooperative scheduler. As the project grows, additional services
-    (UI, session logging, sensors, indicators, etc.) can plug into this class.
+    Each service registers with a deadline-driven :class:`Scheduler` and is
+    only woken when it has work to do. As the project grows, additional
+    services (UI, session logging, sensors, indicators, etc.) can plug into
+    this class by registering their own tasks.
+
+    Subsystems are imported only when they are used (the radio when it
+    answered, audio metrics with a capture, the atlas with a label) or the
+    first time they are enabled (see :meth:`enable_emf`), so missing or
+    unused ones cost nothing at boot. Pass
+    ``present`` (from :func:`boot_timer.probe_i2c`) to skip devices that did
+    not answer (``radio_scanner`` is None without the radio), and a
+    ``boot_timer`` to have the boot phases and the first audio block timed.
     """
 
     def __init__(
@@ -16,32 +25,186 @@ class DeviceController:
         *,
         board_module=board,
         i2c=None,
+        session_manager=None,
+        audio_capture=None,
+        ptt_led=None,
+        atlas_label=None,
+        present=None,
+        boot_timer=None,
         debug: bool = False,
+        report_interval: float = 0.0,
     ) -> None:
         self.board = board_module
         self.i2c = i2c or self.board.STEMMA_I2C()
         self.debug = debug
+        self.present = present  # I2C addresses that answered, None if unknown
+        self.boot_timer = boot_timer
+
+        self.radio_scanner = None
+        if self.present is not None and RADIO_ADDRESS not in self.present:
+            print("DeviceController: no radio on the bus; radio scanner disabled.")
+        else:
+            from radio_scanner import RadioScanner
+
+            self.radio_scanner = RadioScanner(self.i2c, debug=self.debug)
+        self.session_manager = session_manager
+        if self.session_manager and self.radio_scanner:
+            self.radio_scanner.on_tune = self._mark_freq_change
+        if self.radio_scanner and (self.session_manager or audio_capture):
+            self.radio_scanner.on_excursion = self._mark_excursion
+        self._mark_boot("radio")
+        # Created by enable_emf() on first use
+        self.emf_reader = None
+        # Optional AudioCapture feeding session audio (see audio_capture.py)
+        self.audio_capture = audio_capture
+        self.audio_metrics = None
+        if self.audio_capture:
+            from audio_metrics import AudioMetrics
+
+            self.audio_metrics = AudioMetrics()
+            self.audio_capture.listeners.append(self.audio_metrics.update)
+            if self.boot_timer:
+                self.audio_capture.listeners.append(self._first_audio)
+        # PWM output (e.g. pwmio.PWMOut) whose brightness follows the radio level
+        self.ptt_led = ptt_led
+        # Spectrum and RDS stations saved on the SD card per location label
+        self.atlas = None
+        if self.session_manager and self.radio_scanner and atlas_label:
+            from station_atlas import StationAtlas
+
+            self.atlas = StationAtlas(
+                self.radio_scanner.spectrum,
+                self.radio_scanner.rds_service,
+                directory=self.session_manager.mount_point + "/atlas",
+                label=atlas_label,
+                debug=self.debug,
+            )
 
-        self.radio_scanner = RadioScanner(self.i2c, debug=self.debug)
-        # self.emf_reader = EMFReader(self.i2c, debug=self.debug)
+        self.scheduler = Scheduler(debug=self.debug)
+        # Seconds between scheduler timing reports (0 disables them)
+        self.report_interval = report_interval
 
     def initialize(self) -> None:
         """Apply default configuration for all managed peripherals."""
         if self.debug:
             print("DeviceController: initializing subsystems.")
-        self.radio_scanner.setup()
-        # self.emf_reader.calibrate(time.monotonic(), duration=5.0)
+        if self.radio_scanner:
+            self.radio_scanner.setup()
+            self._mark_boot("radio_setup")
+        if self.atlas and self.session_manager.ensure_mounted():
+            self.atlas.load()
+            self.scheduler.add_task("atlas", self.atlas.maybe_save, period=self.atlas.save_interval)
+            self._mark_boot("atlas")
+
+        if self.radio_scanner:
+            self.scheduler.add_task(
+                "radio_scanner",
+                self.radio_scanner.update,
+                next_deadline=self.radio_scanner.next_deadline,
+                tolerance=0.01,
+            )
+            rds = self.radio_scanner.rds_service
+            self.scheduler.add_task("rds", rds.update, next_deadline=rds.next_deadline, tolerance=rds.poll_interval)
+        if self.audio_capture:
+            self.scheduler.add_task(
+                "audio_capture",
+                self.audio_capture.step,
+                next_deadline=self.audio_capture.next_deadline,
+                tolerance=self.audio_capture.chunk_period,
+            )
+        if self.ptt_led and self.audio_metrics:
+            self.scheduler.add_task("ptt_led", self._update_ptt_led, period=0.05)
+        if self.report_interval > 0:
+            self.scheduler.add_task(
+                "scheduler_report",
+                self._print_report,
+                period=self.report_interval,
+                start=time.monotonic() + self.report_interval,
+            )
+        self._mark_boot("initialize")
+
+    def enable_emf(self, enabled: bool = True) -> bool:
+        """Turn the EMF reader on or off; it is created on first enable."""
+        if self.emf_reader is None:
+            if not enabled:
+                return False
+            if self.present is not None and MAG_ADDRESS not in self.present:
+                if self.debug:
+                    print("DeviceController: no magnetometer on the bus; EMF reader unavailable.")
+                return False
+            from emf_reader import EMFReader
+
+            self.emf_reader = EMFReader(self.i2c, debug=self.debug)
+            # Matrix setup and the frame cache render happen here, not in
+            # the first scheduled frame
+            if self.present is None or MATRIX_ADDRESS in self.present:
+                self.emf_reader.init_matrix()
+            elif self.debug:
+                print("DeviceController: no LED matrix on the bus; EMF display disabled.")
+            self.scheduler.add_task(
+                "emf_reader",
+                self.emf_reader.update,
+                next_deadline=self.emf_reader.next_deadline,
+            )
+            self._mark_boot("emf")
+        self.emf_reader.enabled = enabled
+        return True
 
     def loop(self) -> None:
-        now = time.monotonic()
+        """Run every task that is currently due."""
+        self.scheduler.run_due(time.monotonic())
 
-        self.radio_scanner.update(now)
-        # self.emf_reader.update(now)
+    def timing_report(self):
+        """Per-task jitter and overrun statistics from the scheduler."""
+        return self.scheduler.report()
 
-    def run_forever(self) -> None:
+    def boot_report(self):
+        """Boot phase durations and milestones, if a boot timer was given."""
+        return self.boot_timer.report() if self.boot_timer else None
+
+    async def run(self) -> None:
         if self.debug:
             print("DeviceController: entering run loop.")
 
-        while True:
-            self.loop()
-            time.sleep(0.01)
+        await self.scheduler.run()
+
+    def run_forever(self) -> None:
+        try:
+            import asyncio
+        except ImportError:
+            self.scheduler.run_blocking()
+            return
+        asyncio.run(self.run())
+
+    # Private methods
+    def _update_ptt_led(self, now) -> None:
+        level = self.audio_metrics.brightness()
+        self.ptt_led.duty_cycle = int(level * level * 0xFFFF)  # rough gamma
+
+    def _mark_boot(self, phase) -> None:
+        if self.boot_timer:
+            self.boot_timer.mark(phase)
+
+    def _first_audio(self, view, mic_active) -> None:
+        # Only the first call is kept; removing the listener here would
+        # skip the next one in AudioCapture's loop
+        self.boot_timer.milestone("first_audio")
+
+    def _mark_freq_change(self, freq) -> None:
+        # Frequencies are in 10 kHz units, e.g. 9110 -> "freq 91.10"
+        self.session_manager.add_marker("freq {}.{:02d}".format(freq // 100, freq % 100), routine=True)
+
+    def _mark_excursion(self, freq) -> None:
+        # Keep another channel out of the recording during a background
+        # refresh, and note where it happened
+        if self.audio_capture:
+            self.audio_capture.radio_muted = freq is not None
+        if self.session_manager:
+            if freq is None:
+                label = "refresh_end"
+            else:
+                label = "refresh {}.{:02d}".format(freq // 100, freq % 100)
+            self.session_manager.add_marker(label, routine=True)
+
+    def _print_report(self, now) -> None:
+        self.scheduler.print_report()
@@ -1,13 +1,19 @@
 import time
 import math
 import adafruit_lis2mdl
-import adafruit_is31fl3741
-from adafruit_is31fl3741.adafruit_rgbmatrixqt import Adafruit_RGBMatrixQT
+from mag_sampler import MagSampler
+from mag_calibration import NvmStore, OnlineCalibrator
+from mains_detector import MainsDetector
 
 THRESH = [2.5, 5, 10.00, 20.00]
 HYST = 0.03  # Hysteresis in µT
 LEVEL_COLORS = [0x0044ff, 0x00ff1e, 0xff6f00, 0xFF0000]
-ALPHA = 0.2  # EMA smoothing factor
+EMA_SHIFT = 2  # EMA smoothing factor 1/4, applied in fixed point by MagSampler
+NUM_FRAMES = 7  # solid square plus six expanding outlines
+# Single-shot rate; every continuous ODR puts 50 Hz on DC or Nyquist
+MAINS_RATE_HZ = 140
+MAINS_BAR_UT = 0.05  # µT of mains field per lit pixel on the bottom row
+MAINS_BAR_COLOR = 0x8000ff
 
 class EMFReader:
   def __init__(
@@ -15,25 +21,53 @@ class EMFReader:
         i2c,
         enabled: bool = True,
         debug: bool = False,
+        odr_hz: int = 100,
+        decimation: int = 5,
+        drdy=None,
+        calibration_store=None,
+        mains_detection: bool = True,
       ):
       self.mag = adafruit_lis2mdl.LIS2MDL(i2c)
-      self.led_matrix = Adafruit_RGBMatrixQT(i2c, allocate=adafruit_is31fl3741.PREFER_BUFFER)
-      self.led_matrix.set_led_scaling(0x33)
-      self.led_matrix.global_current = 0x11
-      self.led_matrix.enable = True
+      # Paced by the sensor's data-ready flag (or INT pin) instead of our ticks
+      self.sampler = MagSampler(
+        self.mag.i2c_device,
+        odr_hz=odr_hz,
+        decimation=decimation,
+        ema_shift=EMA_SHIFT,
+        drdy=drdy,
+      )
+      # Hard/soft-iron fit and baseline, learned continuously in the background
+      self.calibrator = OnlineCalibrator(calibration_store or NvmStore())
+      self.calibrator.load()
+      self.sampler.listeners.append(self.calibrator.update)
+      self.sampler.correction = self.calibrator.correct
+      # Narrowband 50/60 Hz field strength, separate from the DC baseline
+      self.mains = None
+      if mains_detection:
+        self.sampler.set_rate(MAINS_RATE_HZ)
+        self.mains = MainsDetector(self.sampler)
+      self.mains_bar = 0
+      # Set up by init_matrix() when the reader is enabled; no frames are
+      # drawn without it
+      self.i2c = i2c
+      self.led_matrix = None
+      self.frame_cache = None
       self.enabled = enabled
       self.debug = debug
       self.frame = 0
       self.frame_rate_hz = 10
+      self.idle_interval = 0.25
       self.prev_frame_tick = time.monotonic()
       self.k2_level = 0
-      self.ema = self.mag_abs_uT()
-      self.baseline = self.ema
-      self.calibrating = False
-      self.calibration_start_time = None
-      self.calibration_duration_seconds = 0.0
-      self.calibration_total = 0.0
-      self.calibration_num_samples = 0
+      self.ema = 0.0
+      # Taken from the first sample unless a saved calibration provides it
+      self.baseline = self.calibrator.baseline_uT if self.calibrator.baseline_ready else None
+      self.last_drawn = None
+      self.draws = 0
+      self.draws_skipped = 0
+      self.draw_time_us = 0
+      self.draw_time_max_us = 0
+      self.draw_time_total_us = 0
 
   def mag_abs_uT(self):
     x, y, z = self.mag.magnetic  # µT
@@ -51,73 +85,169 @@ class EMFReader:
 
     self.k2_level = lvl
   
-  def calibrate(self, now, duration: float = 10.0) -> None:
-    if not self.calibrating:
-      if self.debug:
-          print("EMFReader: starting calibration for", duration, "seconds.")
-      self.calibrating = True
-      self.calibration_start_time = time.monotonic()
-      self.calibration_duration_seconds = duration
-      self.calibration_total = 0.0
-      self.calibration_num_samples = 0
-
-    if now - self.calibration_start_time <= self.calibration_duration_seconds:
-      reading = self.mag_abs_uT()
-      self.calibration_total += reading
-      self.calibration_num_samples += 1
+  def recalibrate(self) -> None:
+    """Discard the saved and fitted calibration and learn it again from scratch."""
+    self.calibrator.reset()
+    self.baseline = self.ema
+    if self.debug:
+        print("EMFReader: calibration reset.")
 
-    else:
-      self.baseline = self.calibration_total / self.calibration_num_samples
-      self.calibrating = False 
-      if self.debug:
-          print("EMFReader: calibration complete. Baseline set to", self.baseline, "µT.")
-  
-  def draw_square(self) -> None:
+  def init_matrix(self) -> None:
+    """Import and configure the LED matrix driver and render the frame cache."""
+    import adafruit_is31fl3741
+    from adafruit_is31fl3741.adafruit_rgbmatrixqt import Adafruit_RGBMatrixQT
+
+    self.led_matrix = Adafruit_RGBMatrixQT(self.i2c, allocate=adafruit_is31fl3741.PREFER_BUFFER)
+    self.led_matrix.set_led_scaling(0x33)
+    self.led_matrix.global_current = 0x11
+    self.led_matrix.enable = True
+    self.build_frame_cache()
+
+  def build_frame_cache(self) -> None:
+    """Render every animation frame at every level into the pixel buffer once.
+
+    Each (frame, level) pair is drawn with the normal pixel calls and the
+    resulting ``_pixel_buffer`` contents are kept, so later frames are shown
+    with a single buffer copy and one bulk transfer instead of dozens of
+    pixel() calls. Without a pixel buffer the cache stays empty and frames
+    are drawn pixel by pixel.
+    """
     matrix = self.led_matrix
+    buffer = getattr(matrix, "_pixel_buffer", None)
+    self.frame_cache = None
+    if buffer is None:
+      return
 
-    # Clear the matrix
-    matrix.fill(0x000000)
+    cache = []
+    for level in range(len(LEVEL_COLORS)):
+      frames = []
+      for frame in range(NUM_FRAMES):
+        matrix.fill(0x000000)
+        self.render_square(frame, LEVEL_COLORS[level])
+        frames.append(bytes(buffer))
+      cache.append(frames)
+    self.frame_cache = cache
+    self.last_drawn = None
+
+  def render_square(self, frame, color) -> None:
+    matrix = self.led_matrix
 
     # First frame is just a solid square
-    if self.frame == 0:
+    if frame == 0:
         for x in range(5, 8):
             for y in range(3, 6):
-                matrix.pixel(x, y, LEVEL_COLORS[self.k2_level])
+                matrix.pixel(x, y, color)
 
     # Subsequent frames are expanding square outlines (stroke width 2)
     else:
-        for x in range(5 - self.frame, 8 + self.frame):
-            matrix.pixel(x, 3 - self.frame, LEVEL_COLORS[self.k2_level])
-        for x in range(5 - self.frame, 7 + self.frame):
-            matrix.pixel(x, 4 - self.frame, LEVEL_COLORS[self.k2_level])
-        for x in range(5 - self.frame, 8 + self.frame):
-            matrix.pixel(x, 5 + self.frame, LEVEL_COLORS[self.k2_level])
-        for x in range(5 - self.frame, 7 + self.frame):
-            matrix.pixel(x, 4 + self.frame, LEVEL_COLORS[self.k2_level])
-        for y in range(3 - self.frame, 6 + self.frame):
-            matrix.pixel(5 - self.frame, y, LEVEL_COLORS[self.k2_level])
-        for y in range(4 - self.frame, 5 + self.frame):
-            matrix.pixel(6 - self.frame, y, LEVEL_COLORS[self.k2_level])
-        for y in range(3 - self.frame, 6 + self.frame):
-            matrix.pixel(7 + self.frame, y, LEVEL_COLORS[self.k2_level])
-        for y in range(4 - self.frame, 5 + self.frame):
-            matrix.pixel(6 + self.frame, y, LEVEL_COLORS[self.k2_level])
+        for x in range(5 - frame, 8 + frame):
+            matrix.pixel(x, 3 - frame, color)
+        for x in range(5 - frame, 7 + frame):
+            matrix.pixel(x, 4 - frame, color)
+        for x in range(5 - frame, 8 + frame):
+            matrix.pixel(x, 5 + frame, color)
+        for x in range(5 - frame, 7 + frame):
+            matrix.pixel(x, 4 + frame, color)
+        for y in range(3 - frame, 6 + frame):
+            matrix.pixel(5 - frame, y, color)
+        for y in range(4 - frame, 5 + frame):
+            matrix.pixel(6 - frame, y, color)
+        for y in range(3 - frame, 6 + frame):
+            matrix.pixel(7 + frame, y, color)
+        for y in range(4 - frame, 5 + frame):
+            matrix.pixel(6 + frame, y, color)
 
+  def draw_square(self) -> None:
+    if self.led_matrix is None:
+      return
+    key = (self.frame, self.k2_level, self.mains_bar)
+    if key == self.last_drawn:
+      # Same frame and level as what is already on the matrix
+      self.draws_skipped += 1
+      return
+
+    start = time.monotonic_ns()
+    matrix = self.led_matrix
+    if self.frame_cache:
+      matrix._pixel_buffer[:] = self.frame_cache[self.k2_level][self.frame]
+    else:
+      matrix.fill(0x000000)
+      self.render_square(self.frame, LEVEL_COLORS[self.k2_level])
+    # Mains field strength as a bar along the bottom row
+    for x in range(self.mains_bar):
+      matrix.pixel(x, 8, MAINS_BAR_COLOR)
     matrix.show()
+    self.last_drawn = key
+
+    elapsed_us = (time.monotonic_ns() - start) // 1000
+    self.draws += 1
+    self.draw_time_us = elapsed_us
+    self.draw_time_total_us += elapsed_us
+    if elapsed_us > self.draw_time_max_us:
+      self.draw_time_max_us = elapsed_us
+
+  def draw_stats(self):
+    """Per-frame drawing time in microseconds and skipped redraw count."""
+    return {
+      "draws": self.draws,
+      "skipped": self.draws_skipped,
+      "cached": bool(self.frame_cache),
+      "last_us": self.draw_time_us,
+      "max_us": self.draw_time_max_us,
+      "avg_us": self.draw_time_total_us // self.draws if self.draws else 0,
+    }
+
+  def payload_into(self, payload):
+    """Add the EMF readings to a sidecar payload dict and return it."""
+    payload["emf_uT"] = self.ema
+    payload["emf_level"] = self.k2_level
+    if self.mains:
+      self.mains.payload_into(payload)
+    return payload
+
+  def sample_stats(self):
+    """Magnetometer sample, dropped (overrun) and duplicate-poll counts."""
+    return self.sampler.stats()
+
+  def next_deadline(self, now):
+    """Monotonic time at which update() next has work to do."""
+    if not self.enabled:
+      return now + self.idle_interval
+
+    next_sample = self.sampler.next_deadline(now)
+    next_frame = self.prev_frame_tick + 1.0 / self.frame_rate_hz
+    return min(next_sample, next_frame)
 
   def update(self, now):
     if not self.enabled:
       return
 
-    reading = self.mag_abs_uT()
-    self.ema = ALPHA * reading + (1 - ALPHA) * self.ema
-    deviation = max(0.0, self.ema - self.baseline)
-    self.update_k2_level(deviation)
+    # Frame-only wake-ups skip the bus; the sensor has nothing new yet
+    polled = now >= self.sampler.next_deadline(now) and self.sampler.poll(now)
+    if self.mains and self.mains.update():
+      self.mains_bar = min(13, int(self.mains.mains_uT / MAINS_BAR_UT))
+      if self.debug:
+          print("EMFReader: mains =", self.mains.mains_uT, "µT, dominant =", self.mains.dominant_hz, "Hz")
 
-    if self.debug:
-        print("EMFReader: mag =", reading, "µT, ema =", self.ema, "µT, baseline =", self.baseline, "µT, deviation =", deviation, "µT, K2 level =", self.k2_level)
+    if polled:
+      reading = self.sampler.magnitude_uT
+      self.ema = self.sampler.ema_uT
+      if self.calibrator.baseline_ready:
+        self.baseline = self.calibrator.baseline_uT
+      elif self.baseline is None:
+        self.baseline = self.ema
+      self.calibrator.maybe_save(now)
+      deviation = max(0.0, self.ema - self.baseline)
+      self.update_k2_level(deviation)
+
+      if self.debug:
+          print("EMFReader: mag =", reading, "µT, ema =", self.ema, "µT, baseline =", self.baseline, "µT, deviation =", deviation, "µT, K2 level =", self.k2_level)
 
     if now - self.prev_frame_tick >= 1.0 / self.frame_rate_hz:
+      if self.k2_level == 0:
+        # Idle: hold the solid square so unchanged frames skip the redraw
+        self.frame = 0
       self.draw_square()
-      self.frame = (self.frame + 1) % 7
+      if self.k2_level:
+        self.frame = (self.frame + 1) % NUM_FRAMES
       self.prev_frame_tick = now
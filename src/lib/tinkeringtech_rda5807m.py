@@ -44,6 +44,7 @@ RADIO_REG_CTRL_MONO = 0x2000
 RADIO_REG_CTRL_BASS = 0x1000
 RADIO_REG_CTRL_SEEKUP = 0x0200
 RADIO_REG_CTRL_SEEK = 0x0100
+RADIO_REG_CTRL_SKMODE = 0x0080  # stop seeking at the band limit
 RADIO_REG_CTRL_RDS = 0x0008
 RADIO_REG_CTRL_NEW = 0x0004
 RADIO_REG_CTRL_RESET = 0x0002
@@ -66,6 +67,7 @@ RADIO_REG_R4_AFC = 0x0100
 RADIO_REG_VOL = 0x05
 RADIO_REG_VOL_VOL = 0x000F
 RADIO_REG_VOL_SEEKTH = 0x0F00     # bits 11:8 – seek threshold
+RADIO_REG_VOL_SEEKTH_SHIFT = 8
 
 RADIO_REG_RA = 0x0A
 RADIO_REG_RA_RDS = 0x8000
@@ -78,12 +80,24 @@ RADIO_REG_RA_SF = 0x2000
 RADIO_REG_RB = 0x0B
 RADIO_REG_RB_FMTRUE = 0x0100
 RADIO_REG_RB_FMREADY = 0x0080
+RADIO_REG_RB_RSSI_SHIFT = 10
+RADIO_REG_RB_BLERA = 0x000C  # block A error level, 3 = uncorrectable
+RADIO_REG_RB_BLERB = 0x0003  # block B error level
+RADIO_REG_RB_BLER = RADIO_REG_RB_BLERA | RADIO_REG_RB_BLERB
 
 RADIO_REG_RDSA = 0x0C
 RADIO_REG_RDSB = 0x0D
 RADIO_REG_RDSC = 0x0E
 RADIO_REG_RDSD = 0x0F
 
+# Writable registers that can be flushed in a single burst (0x02-0x07)
+RADIO_REG_WRITE_FIRST = RADIO_REG_CTRL
+RADIO_REG_WRITE_LAST = 0x07
+
+# Read-only status block (0x0A-0x0F) fetched by read_status()
+RADIO_REG_STATUS_FIRST = RADIO_REG_RA
+RADIO_REG_STATUS_COUNT = 6
+
 
 # Radio class definition
 class Radio:
@@ -112,6 +126,23 @@ class Radio:
         self.board = board
         self.frequency = frequency
 
+        # Bit n set = virtual register n changed since the last commit()
+        self.dirty = 0
+        # When False, setters leave changes in the virtual registers until
+        # commit() is called, so several changes share one bus burst
+        self.auto_commit = True
+        self._write_buf = bytearray(
+            1 + 2 * (RADIO_REG_WRITE_LAST - RADIO_REG_WRITE_FIRST + 1)
+        )
+
+        # Status snapshot of 0x0A-0x0F; reads younger than status_max_age
+        # seconds are served from the virtual registers without bus traffic
+        self.status_max_age = 0.01
+        self.status_time = None
+        self._status_ptr = bytes([RADIO_REG_STATUS_FIRST])
+        self._status_buf = bytearray(2 * RADIO_REG_STATUS_COUNT)
+        self._rds_sent = [0, 0, 0, 0]  # last RDS group passed to send_rds
+
         # Basic audio info
         self.volume = volume
         self.bass_boost = False
@@ -151,18 +182,22 @@ class Radio:
         # Initialized to volume - 6 by default
         self.registers[RADIO_REG_VOL] = 0x84D1
         # Other registers are already set to zero
-        # Update registers
-        self.save_register(RADIO_REG_CTRL)
-        self.save_register(RADIO_REG_VOL)
-
-        self.registers[RADIO_REG_CTRL] = (
+        # Update registers 0x02-0x05 in one burst; the chip state is unknown
+        # at boot so every register is flushed regardless of the shadow
+        for reg_num in range(RADIO_REG_CTRL, RADIO_REG_VOL + 1):
+            self.mark_dirty(reg_num)
+        self.commit()
+
+        auto_commit = self.auto_commit
+        self.auto_commit = False
+        self.set_register(
+            RADIO_REG_CTRL,
             RADIO_REG_CTRL_ENABLE
             | RADIO_REG_CTRL_NEW
             | RADIO_REG_CTRL_RDS
             | RADIO_REG_CTRL_UNMUTE
-            | RADIO_REG_CTRL_OUTPUT
+            | RADIO_REG_CTRL_OUTPUT,
         )
-        self.save_register(RADIO_REG_CTRL)
 
         # Turn on bass boost and rds
         self.set_bass_boost(True)
@@ -170,12 +205,18 @@ class Radio:
         self.rds = True
         self.mute = False
         self.set_soft_mute(False)
+        self.auto_commit = auto_commit
+        self.commit()
 
     def tune(self):
         """docstring."""
         # Tunes radio to current frequency and volume
+        auto_commit = self.auto_commit
+        self.auto_commit = False
         self.set_freq(self.frequency)
         self.set_volume(self.volume)
+        self.auto_commit = auto_commit
+        self.commit()
         self.tuned = True
 
     def set_freq(self, freq):
@@ -191,44 +232,102 @@ class Radio:
         reg_channel = RADIO_REG_CHAN_TUNE  # Enable tuning
         reg_channel = reg_channel | (new_channel << 6)
 
-        # Enable output, unmute
-        self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] | (
-            RADIO_REG_CTRL_OUTPUT
-            | RADIO_REG_CTRL_UNMUTE
-            | RADIO_REG_CTRL_RDS
-            | RADIO_REG_CTRL_ENABLE
+        # Enable output, unmute (only written if these bits were cleared)
+        self.set_register(
+            RADIO_REG_CTRL,
+            self.registers[RADIO_REG_CTRL]
+            | (
+                RADIO_REG_CTRL_OUTPUT
+                | RADIO_REG_CTRL_UNMUTE
+                | RADIO_REG_CTRL_RDS
+                | RADIO_REG_CTRL_ENABLE
+            ),
         )
-        self.save_register(RADIO_REG_CTRL)
 
-        # Save frequency to register
+        # Save frequency to register; always written since TUNE starts a tune
         self.registers[RADIO_REG_CHAN] = reg_channel
-        self.save_register(RADIO_REG_CHAN)
-
-        # Adjust volume
-        self.save_register(RADIO_REG_VOL)
+        self.mark_dirty(RADIO_REG_CHAN)
+        self._apply()
 
     def poll_tune(self):
-        self.write_bytes(bytes([RADIO_REG_RA]))
-        ra = self.read16()
-        if not (ra & RADIO_REG_RA_STC):
+        """Return True once the pending tune has completed (STC set)."""
+        if not self.status_stc():
             return False  # still tuning
-        
+
         self.tune_pending = False
         self.get_freq()
 
+        # The chip clears TUNE itself once STC is set; only the shadow copy
+        # needs updating so a later burst doesn't start another tune
         self.registers[RADIO_REG_CHAN] &= ~RADIO_REG_CHAN_TUNE
-        self.save_register(RADIO_REG_CHAN)
-        self.rds_ready = self.get_rssi() > self.rds_threshold
+        self.rds_ready = self.rssi > self.rds_threshold
 
         return True
 
+    def read_status(self, max_age=None):
+        """Snapshot registers 0x0A-0x0F in one bus transaction."""
+        # Returns True if the bus was read, False if the cached snapshot was
+        # still fresh enough
+        if max_age is None:
+            max_age = self.status_max_age
+        now = time.monotonic()
+        if self.status_time is not None and now - self.status_time < max_age:
+            return False
+
+        buf = self._status_buf
+        with self.board:
+            self.board.write_then_readinto(self._status_ptr, buf)
+        for i in range(RADIO_REG_STATUS_COUNT):
+            self.registers[RADIO_REG_STATUS_FIRST + i] = (buf[2 * i] << 8) | buf[
+                2 * i + 1
+            ]
+        self.rssi = self.registers[RADIO_REG_RB] >> RADIO_REG_RB_RSSI_SHIFT
+        self.status_time = now
+        return True
+
+    def invalidate_status(self):
+        """Force the next status accessor to read the chip."""
+        self.status_time = None
+
+    def status_stc(self, max_age=None):
+        """Seek/tune complete flag from the status snapshot."""
+        self.read_status(max_age)
+        return bool(self.registers[RADIO_REG_RA] & RADIO_REG_RA_STC)
+
+    def status_rssi(self, max_age=None):
+        """Signal strength (0-63) from the status snapshot."""
+        self.read_status(max_age)
+        return self.rssi
+
+    def status_stereo(self, max_age=None):
+        """Stereo indicator from the status snapshot."""
+        self.read_status(max_age)
+        return bool(self.registers[RADIO_REG_RA] & RADIO_REG_RA_STEREO)
+
+    def status_channel(self, max_age=None):
+        """Tuned channel number from the status snapshot."""
+        self.read_status(max_age)
+        return self.registers[RADIO_REG_RA] & RADIO_REG_RA_NR
+
+    def status_rds_ready(self, max_age=None):
+        """RDSR flag: a new RDS group is waiting in the status snapshot."""
+        self.read_status(max_age)
+        return bool(self.registers[RADIO_REG_RA] & RADIO_REG_RA_RDS)
+
+    def status_rds_blocks(self, max_age=None):
+        """RDS blocks A-D as held in the status snapshot."""
+        self.read_status(max_age)
+        return (
+            self.registers[RADIO_REG_RDSA],
+            self.registers[RADIO_REG_RDSB],
+            self.registers[RADIO_REG_RDSC],
+            self.registers[RADIO_REG_RDSD],
+        )
+
     def get_freq(self):
         """docstring."""
         # Read register RA
-        self.write_bytes(bytes([RADIO_REG_RA]))
-        self.registers[RADIO_REG_RA] = self.read16()
-
-        chnl = self.registers[RADIO_REG_RA] & RADIO_REG_RA_NR
+        chnl = self.status_channel()
 
         self.frequency = self.freq_low + chnl * 10
         return self.frequency
@@ -254,51 +353,89 @@ class Radio:
             r = RADIO_REG_CHAN_BAND_FM
         else:
             r = RADIO_REG_CHAN_BAND_FMWORLD
-        self.registers[RADIO_REG_CHAN] = r | RADIO_REG_CHAN_SPACE_100
-        self.save_register(RADIO_REG_CHAN)
+        self.set_register(RADIO_REG_CHAN, r | RADIO_REG_CHAN_SPACE_100)
+        self._apply()
 
     def seek_up(self):
         """docstring."""
         # Start seek mode upwards
-        self.registers[RADIO_REG_CTRL] = (
-            self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_SEEKUP
-        )
-        self.registers[RADIO_REG_CTRL] = (
-            self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_SEEK
+        self.set_register(
+            RADIO_REG_CTRL,
+            self.registers[RADIO_REG_CTRL]
+            | RADIO_REG_CTRL_SEEKUP
+            | RADIO_REG_CTRL_SEEK,
         )
-        self.save_register(RADIO_REG_CTRL)
+        self.commit()
 
         # Wait until scan is over
         time.sleep(1)
         self.get_freq()
-        self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-            ~RADIO_REG_CTRL_SEEK
+        self.set_register(
+            RADIO_REG_CTRL, self.registers[RADIO_REG_CTRL] & (~RADIO_REG_CTRL_SEEK)
         )
-        self.save_register(RADIO_REG_CTRL)
+        self.commit()
 
     def seek_down(self):
         """docstring."""
         # Start seek mode downwards
-        self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-            ~RADIO_REG_CTRL_SEEKUP
+        self.set_register(
+            RADIO_REG_CTRL,
+            (self.registers[RADIO_REG_CTRL] & (~RADIO_REG_CTRL_SEEKUP))
+            | RADIO_REG_CTRL_SEEK,
         )
-        self.registers[RADIO_REG_CTRL] = (
-            self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_SEEK
-        )
-        self.save_register(RADIO_REG_CTRL)
+        self.commit()
 
         # Wait until scan is over
         time.sleep(1)
         self.get_freq()
-        self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-            ~RADIO_REG_CTRL_SEEK
+        self.set_register(
+            RADIO_REG_CTRL, self.registers[RADIO_REG_CTRL] & (~RADIO_REG_CTRL_SEEK)
+        )
+        self.commit()
+
+    def set_seek_threshold(self, threshold):
+        """Set the hardware seek threshold (SEEKTH, 0-15)."""
+        threshold = max(0, min(15, threshold))
+        self.set_register(
+            RADIO_REG_VOL,
+            (self.registers[RADIO_REG_VOL] & (~RADIO_REG_VOL_SEEKTH))
+            | (threshold << RADIO_REG_VOL_SEEKTH_SHIFT),
         )
-        self.save_register(RADIO_REG_CTRL)
+        self._apply()
+
+    def start_seek(self, up=True, wrap=False):
+        """Start a hardware seek without waiting for it to finish."""
+        # Poll poll_seek() until it returns a result
+        reg_ctrl = self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_SEEK
+        if up:
+            reg_ctrl = reg_ctrl | RADIO_REG_CTRL_SEEKUP
+        else:
+            reg_ctrl = reg_ctrl & (~RADIO_REG_CTRL_SEEKUP)
+        if wrap:
+            reg_ctrl = reg_ctrl & (~RADIO_REG_CTRL_SKMODE)
+        else:
+            reg_ctrl = reg_ctrl | RADIO_REG_CTRL_SKMODE
+        self.set_register(RADIO_REG_CTRL, reg_ctrl)
+        self.mark_dirty(RADIO_REG_CTRL)
+        self.commit()
+
+    def poll_seek(self):
+        """Return None while seeking, else True if a station was found."""
+        if not self.status_stc():
+            return None
+
+        self.get_freq()
+        # The chip clears SEEK itself when STC is set; mirror it in the shadow
+        self.registers[RADIO_REG_CTRL] &= ~RADIO_REG_CTRL_SEEK
+        return not self.registers[RADIO_REG_RA] & RADIO_REG_RA_SF
 
     def term(self):
         """docstring."""
         # Terminates all receiver functions
+        auto_commit = self.auto_commit
+        self.auto_commit = False
         self.set_volume(0)
+        self.auto_commit = auto_commit
         self.registers[RADIO_REG_CTRL] = 0x0000
         self.save_registers()
 
@@ -311,66 +448,55 @@ class Radio:
             reg_ctrl = reg_ctrl | RADIO_REG_CTRL_BASS
         else:
             reg_ctrl = reg_ctrl & (~RADIO_REG_CTRL_BASS)
-        self.registers[RADIO_REG_CTRL] = reg_ctrl
-        self.save_register(RADIO_REG_CTRL)
+        self.set_register(RADIO_REG_CTRL, reg_ctrl)
+        self._apply()
 
     def set_mono(self, switch_on):
         """docstring."""
         # Switches mono to 0 or 1
         self.mono = switch_on
-        self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-            ~RADIO_REG_CTRL_SEEK
-        )
+        reg_ctrl = self.registers[RADIO_REG_CTRL] & (~RADIO_REG_CTRL_SEEK)
         if switch_on:
-            self.registers[RADIO_REG_CTRL] = (
-                self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_MONO
-            )
+            reg_ctrl = reg_ctrl | RADIO_REG_CTRL_MONO
         else:
-            self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-                ~RADIO_REG_CTRL_MONO
-            )
-        self.save_register(RADIO_REG_CTRL)
+            reg_ctrl = reg_ctrl & (~RADIO_REG_CTRL_MONO)
+        self.set_register(RADIO_REG_CTRL, reg_ctrl)
+        self._apply()
 
     def set_mute(self, switch_on):
         """docstring."""
         # Switches mute off or on
         self.mute = switch_on
         if switch_on:
-            self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-                ~RADIO_REG_CTRL_UNMUTE
-            )
+            reg_ctrl = self.registers[RADIO_REG_CTRL] & (~RADIO_REG_CTRL_UNMUTE)
         else:
-            self.registers[RADIO_REG_CTRL] = (
-                self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_UNMUTE
-            )
-        self.save_register(RADIO_REG_CTRL)
+            reg_ctrl = self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_UNMUTE
+        self.set_register(RADIO_REG_CTRL, reg_ctrl)
+        self._apply()
 
     def set_soft_mute(self, switch_on):
         """docstring."""
         # Switches soft mute off or on
         self.soft_mute = switch_on
         if switch_on:
-            self.registers[RADIO_REG_R4] = (
-                self.registers[RADIO_REG_R4] | RADIO_REG_R4_SOFTMUTE
-            )
+            reg_r4 = self.registers[RADIO_REG_R4] | RADIO_REG_R4_SOFTMUTE
         else:
-            self.registers[RADIO_REG_R4] = self.registers[RADIO_REG_R4] & (
-                ~RADIO_REG_R4_SOFTMUTE
-            )
-        self.save_register(RADIO_REG_R4)
+            reg_r4 = self.registers[RADIO_REG_R4] & (~RADIO_REG_R4_SOFTMUTE)
+        self.set_register(RADIO_REG_R4, reg_r4)
+        self._apply()
 
     def soft_reset(self):
         """docstring."""
         # Soft reset chip
-        self.registers[RADIO_REG_CTRL] = (
-            self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_RESET
+        self.set_register(
+            RADIO_REG_CTRL, self.registers[RADIO_REG_CTRL] | RADIO_REG_CTRL_RESET
         )
-        self.save_register(RADIO_REG_CTRL)
+        self.commit()
         time.sleep(2)
-        self.registers[RADIO_REG_CTRL] = self.registers[RADIO_REG_CTRL] & (
-            ~RADIO_REG_CTRL_RESET
+        self.set_register(
+            RADIO_REG_CTRL, self.registers[RADIO_REG_CTRL] & (~RADIO_REG_CTRL_RESET)
         )
-        self.save_register(RADIO_REG_CTRL)
+        self.commit()
 
     def set_volume(self, volume):
         """docstring."""
@@ -378,44 +504,29 @@ class Radio:
         if volume > self.maxvolume:
             volume = self.maxvolume
         self.volume = volume
-        self.registers[RADIO_REG_VOL] = self.registers[RADIO_REG_VOL] & (
-            ~RADIO_REG_VOL_VOL
+        self.set_register(
+            RADIO_REG_VOL,
+            (self.registers[RADIO_REG_VOL] & (~RADIO_REG_VOL_VOL)) | volume,
         )
-        self.registers[RADIO_REG_VOL] = self.registers[RADIO_REG_VOL] | volume
-        self.save_register(RADIO_REG_VOL)
+        self._apply()
 
     def check_rds(self):
         """docstring."""
         # Check for rds data
         self.check_threshold()
         if self.send_rds and self.rds_ready:
-            self.registers[RADIO_REG_RA] = self.read16()
+            # The status snapshot already holds RA and the RDS blocks
+            self.read_status()
 
             if self.registers[RADIO_REG_RA] & RADIO_REG_RA_RDS:
                 # Check for new RDS data available
+                sent = self._rds_sent
                 result = False
-
-                self.write_bytes(bytes([RADIO_REG_RDSA]))
-
-                new_data = self.read16()
-                if new_data != self.registers[RADIO_REG_RDSA]:
-                    self.registers[RADIO_REG_RDSA] = new_data
-                    result = True
-
-                new_data = self.read16()
-                if new_data != self.registers[RADIO_REG_RDSB]:
-                    self.registers[RADIO_REG_RDSB] = new_data
-                    result = True
-
-                new_data = self.read16()
-                if new_data != self.registers[RADIO_REG_RDSC]:
-                    self.registers[RADIO_REG_RDSC] = new_data
-                    result = True
-
-                new_data = self.read16()
-                if new_data != self.registers[RADIO_REG_RDSD]:
-                    self.registers[RADIO_REG_RDSD] = new_data
-                    result = True
+                for i in range(4):
+                    new_data = self.registers[RADIO_REG_RDSA + i]
+                    if new_data != sent[i]:
+                        sent[i] = new_data
+                        result = True
 
                 if result:
                     self.send_rds(
@@ -423,6 +534,7 @@ class Radio:
                         self.registers[RADIO_REG_RDSB],
                         self.registers[RADIO_REG_RDSC],
                         self.registers[RADIO_REG_RDSD],
+                        self.registers[RADIO_REG_RB] & RADIO_REG_RB_BLER,
                     )
 
     def check_threshold(self):
@@ -439,10 +551,7 @@ class Radio:
     def get_rssi(self):
         """docstring."""
         # Get the current signal strength
-        self.write_bytes(bytes([RADIO_REG_RB]))
-        self.registers[RADIO_REG_RB] = self.read16()
-        self.rssi = self.registers[RADIO_REG_RB] >> 10
-        return self.rssi
+        return self.status_rssi()
 
     def get_radio_info(self):
         """docstring."""
@@ -466,6 +575,55 @@ class Radio:
         self.write_bytes(
             bytes([reg_num, reg_val_1, reg_val_2])
         )  # reg_num is a register address
+        self.dirty &= ~(1 << reg_num)
+        self.status_time = None
+
+    def set_register(self, reg_num, value):
+        """Update a virtual register, marking it dirty only if it changed."""
+        value &= 0xFFFF
+        if self.registers[reg_num] != value:
+            self.registers[reg_num] = value
+            self.dirty |= 1 << reg_num
+
+    def mark_dirty(self, reg_num):
+        """Force a virtual register to be written on the next commit()."""
+        self.dirty |= 1 << reg_num
+
+    def commit(self):
+        """Flush dirty registers, one sequential burst per contiguous run."""
+        # Returns the number of bus transactions issued
+        transactions = 0
+        reg_num = RADIO_REG_WRITE_FIRST
+        while self.dirty and reg_num <= RADIO_REG_WRITE_LAST:
+            if not self.dirty & (1 << reg_num):
+                reg_num += 1
+                continue
+
+            # Gather the run of contiguous dirty registers starting here; the
+            # chip auto-increments the register address after each word
+            buf = self._write_buf
+            buf[0] = reg_num
+            end = 1
+            while reg_num <= RADIO_REG_WRITE_LAST and self.dirty & (1 << reg_num):
+                reg_val = self.registers[reg_num]
+                buf[end] = reg_val >> 8
+                buf[end + 1] = reg_val & 255
+                end += 2
+                self.dirty &= ~(1 << reg_num)
+                reg_num += 1
+
+            with self.board:
+                self.board.write(buf, end=end)
+            transactions += 1
+        if transactions:
+            # Tuning/seek state changes with register writes
+            self.status_time = None
+        return transactions
+
+    def _apply(self):
+        # Commit pending register changes unless the caller is batching them
+        if self.auto_commit:
+            self.commit()
 
     def write_bytes(self, values):
         """docstring."""
@@ -474,8 +632,10 @@ class Radio:
 
     def save_registers(self):
         """docstring."""
+        # Write registers 0x02-0x06 in a single burst
         for i in range(2, 7):
-            self.save_register(i)
+            self.mark_dirty(i)
+        self.commit()
 
     def read16(self):
         """docstring."""
@@ -488,42 +648,39 @@ class Radio:
     def read_registers(self):
         """docstring."""
         # Reads register from chip to virtual memory
-        with self.board:
-            self.board.write(bytes([RADIO_REG_RA]))
-            for i in range(6):
-                self.registers[0xA + i] = self.read16()
+        self.read_status(max_age=0)
 
 
-def replace_element(index, text, newchar):
-    """docstring."""
-    # Replaces char in string at index with newchar
-    newlist = list(text)
-    if isinstance(newchar, int):
-        newlist[index] = " "
-        # this used to be an AND but that would make no sense. Changed to OR
-        if newchar < 127 or newchar > 31:
-            newlist[index] = chr(newchar)
-    else:
-        newlist[index] = newchar
-    return "".join(newlist)
+# RDS text buffer sizes
+RDS_PS_LEN = 8
+RDS_TEXT_LEN = 64  # 2A RadioText; 2B carries at most 32 characters
+RDS_CR = 0x0D  # RadioText end marker
+RDS_BLER_UNCORRECTABLE = 3
 
 
 class RDSParser:
     # pylint: disable=too-many-instance-attributes
-    # pylint: disable=too-many-branches
-    # pylint: disable=too-many-statements
     """
-    A class used for parsing rds data into readable strings
+    Decodes RDS groups 0A/0B (service name), 2A/2B (RadioText) and 4A
+    (clock time).
+
+    Characters are written into preallocated bytearrays, so decoding a
+    group neither allocates nor blocks; a string is only built when a
+    complete, changed name or text is published to the callbacks. Each
+    service name segment must be received twice in a row before it is
+    accepted. Groups whose block B the chip reports as uncorrectable are
+    dropped, and the BLERA/BLERB levels are counted for stats().
     """
 
     def __init__(self):
         # RDS Values
         self.rds_group_type = None
+        self.pi = 0
         # Traffic programme
         self.rds_tp = None
         # Program type
         self.rds_pty = None
-        # RDS text chars get stored here
+        # RadioText A/B flag; a change clears the text
         self.text_ab = None
         self.last_text_ab = None
         # Time
@@ -535,36 +692,68 @@ class RDSParser:
         self.send_service_name = None
         self.send_text = None
         self.send_time = None
+        # Station name: last received segments, confirmed segments, published
+        self.ps_name1 = bytearray(b"-" * RDS_PS_LEN)
+        self.ps_name2 = bytearray(RDS_PS_LEN)
+        self._ps_published = bytearray(b" " * RDS_PS_LEN)
         # Radio text
-        self.rds_text = " " * 66
-        # Station names
-        self.ps_name1 = "--------"
-        self.ps_name2 = self.ps_name1
+        self.text = bytearray(b" " * RDS_TEXT_LEN)
+        self._text_published = bytearray(RDS_TEXT_LEN)
+        self._text_published_len = 0
+        # Published strings
         self.program_service_name = "        "
+        self.rds_text = ""
+        self.reset_stats()
+        self.init()
 
     def init(self):
-        """docstring."""
-        self.rds_text = " " * 66
-        self.ps_name1 = "--------"
-        self.ps_name2 = self.ps_name1
+        """Forget the station name and text (after a retune)."""
+        for i in range(RDS_PS_LEN):
+            self.ps_name1[i] = 0x2D  # "-"
+            self.ps_name2[i] = 0x20
+            self._ps_published[i] = 0x20
+        self._clear_text()
+        self._text_published_len = 0
         self.program_service_name = "        "
+        self.rds_text = ""
         self.last_text_idx = 0
+        self.last_text_ab = None
+        self.pi = 0
+
+    def reset_stats(self):
+        """Zero the group and block error counters."""
+        self.groups = 0
+        self.dropped = 0
+        self.bler_a = [0, 0, 0, 0]  # groups per BLERA level
+        self.bler_b = [0, 0, 0, 0]
+
+    def stats(self):
+        """Decoded/dropped group counts and block error levels."""
+        return {
+            "groups": self.groups,
+            "dropped": self.dropped,
+            "bler_a": tuple(self.bler_a),
+            "bler_b": tuple(self.bler_b),
+            "error_rate": self.dropped / self.groups if self.groups else 0.0,
+        }
 
     def attach_service_name_callback(self, new_function):
-        """docstring."""
+        """Call new_function(name) when a new station name is confirmed."""
         self.send_service_name = new_function
 
     def attach_text_callback(self, new_function):
-        """docstring."""
+        """Call new_function(text) when a complete RadioText changes."""
         self.send_text = new_function
 
     def attach_time_callback(self, new_function):
-        """docstring."""
+        """Call new_function(hour, minute) on a new clock-time group."""
         self.send_time = new_function
 
-    def process_data(self, block1, block2, block3, block4):
-        """docstring."""
+    def process_data(self, block1, block2, block3, block4, bler=0):
+        """Decode one RDS group.
 
+        ``bler`` is the RB register's BLERA/BLERB bits for this group.
+        """
         # Analyzing block 1
         if block1 == 0:
             # If block1 set to zero, reset all RDS info
@@ -575,78 +764,127 @@ class RDSParser:
                 self.send_text("")
             return 0
 
+        self.groups += 1
+        bler_a = (bler & RADIO_REG_RB_BLERA) >> 2
+        bler_b = bler & RADIO_REG_RB_BLERB
+        self.bler_a[bler_a] += 1
+        self.bler_b[bler_b] += 1
+        if bler_b == RDS_BLER_UNCORRECTABLE:
+            # Without block B the group type is unknown
+            self.dropped += 1
+            return 0
+        if bler_a != RDS_BLER_UNCORRECTABLE:
+            self.pi = block1
+
         # Block 2
         rds_group_type = 0x0A | ((block2 & 0xF000) >> 8) | ((block2 & 0x0800) >> 11)
-        self.rds_tp = block2 & 0x0400
-        self.rds_pty = block2 & 0x0400
-
-        if rds_group_type == 0x0B:
-            # Data received is part of Service Station name
-            idx = 2 * (block2 & 0x0003)
-
-            cdata_1 = block4 >> 8
-            cdata_2 = block4 & 0x00FF
-
-            # Check that the data was successfuly received
-            if (self.ps_name1[idx] == cdata_1) and (self.ps_name1[idx + 1] == cdata_2):
-                self.ps_name2 = replace_element(idx, self.ps_name2, cdata_1)
-                self.ps_name2 = replace_element(idx + 1, self.ps_name2, cdata_2)
-                if (
-                    idx == 6
-                    and self.ps_name2 == self.ps_name1
-                    and self.program_service_name != self.ps_name2
-                ):
-                    # Publish station name
-                    self.program_service_name = self.ps_name2
-                    if self.send_service_name:
-                        self.send_service_name(self.program_service_name)
-
-            if (self.ps_name1[idx] != cdata_1) or (self.ps_name1[idx + 1] != cdata_2):
-                self.ps_name1 = replace_element(idx, self.ps_name1, cdata_1)
-                self.ps_name1 = replace_element(idx + 1, self.ps_name1, cdata_2)
+        self.rds_group_type = rds_group_type
+        self.rds_tp = bool(block2 & 0x0400)
+        self.rds_pty = (block2 >> 5) & 0x1F
 
+        if rds_group_type in (0x0A, 0x0B):
+            self._service_name(2 * (block2 & 0x0003), block4 >> 8, block4 & 0x00FF)
         elif rds_group_type == 0x2A:
-            time.sleep(0.1)
-            self.text_ab = block2 & 0x0010
             idx = 4 * (block2 & 0x000F)
-            if idx < self.last_text_idx and self.send_text:
-                self.send_text(self.rds_text)
-            self.last_text_idx = idx
-
-            if self.text_ab != self.last_text_ab:
-                # Clear buffer
-                self.last_text_ab = self.text_ab
-                self.rds_text = " " * 66
-
-            self.rds_text = replace_element(idx, self.rds_text, block3 >> 8)
-            idx += 1
-            self.rds_text = replace_element(idx, self.rds_text, block3 & 0x00FF)
-            idx += 1
-            self.rds_text = replace_element(idx, self.rds_text, block4 >> 8)
-            idx += 1
-            self.rds_text = replace_element(idx, self.rds_text, block4 & 0x00FF)
-            idx += 1
+            self._text_segment(block2, idx)
+            self._put_text(idx, block3 >> 8)
+            self._put_text(idx + 1, block3 & 0x00FF)
+            self._put_text(idx + 2, block4 >> 8)
+            self._put_text(idx + 3, block4 & 0x00FF)
+        elif rds_group_type == 0x2B:
+            # Block 3 repeats the PI code; two characters per group
+            idx = 2 * (block2 & 0x000F)
+            self._text_segment(block2, idx)
+            self._put_text(idx, block4 >> 8)
+            self._put_text(idx + 1, block4 & 0x00FF)
         elif rds_group_type == 0x4A:
-            time.sleep(0.1)
-            off = (block4) & 0x3F
-            mins = (block4 >> 6) & 0x3F
-            mins += 60 * (((block3 & 0x0001) << 4) | ((block4 >> 12) & 0x0F))
-            if off & 0x20:
-                mins -= 30 * (off & 0x1F)
-            else:
-                mins += 30 * (off & 0x1F)
-
-            # Check if function sendTime was set, and chek if the time is different from last time
-            if (self.send_time) and (mins != self.last_minutes_1):
-                # Checks if time appeared in the last two instances - To avoid noise
-                if (
-                    self.last_minutes_1 + 1 == mins
-                    or self.last_minutes_2 + 1 == mins
-                    or self.last_minutes_1 == 0
-                    or self.last_minutes_2 == 0
-                ):
-                    self.last_minutes_2 = self.last_minutes_1
-                    self.last_minutes_1 = mins
-                    self.send_time(mins // 60, mins % 60)
+            self._clock_time(block3, block4)
 
         return 0
+
+    # Private methods
+    def _service_name(self, idx, cdata_1, cdata_2):
+        cdata_1 = _rds_char(cdata_1)
+        cdata_2 = _rds_char(cdata_2)
+        ps_name1 = self.ps_name1
+        # Check that the data was successfuly received
+        if ps_name1[idx] == cdata_1 and ps_name1[idx + 1] == cdata_2:
+            ps_name2 = self.ps_name2
+            ps_name2[idx] = cdata_1
+            ps_name2[idx + 1] = cdata_2
+            if idx == 6 and ps_name2 == ps_name1 and ps_name2 != self._ps_published:
+                # Publish station name
+                self._ps_published[:] = ps_name2
+                self.program_service_name = ps_name2.decode()
+                if self.send_service_name:
+                    self.send_service_name(self.program_service_name)
+        else:
+            ps_name1[idx] = cdata_1
+            ps_name1[idx + 1] = cdata_2
+
+    def _text_segment(self, block2, idx):
+        text_ab = block2 & 0x0010
+        if idx < self.last_text_idx:
+            # The segment address wrapped: the whole message has been sent
+            self._publish_text(RDS_TEXT_LEN)
+        self.last_text_idx = idx
+        if text_ab != self.last_text_ab:
+            # Clear buffer
+            self.last_text_ab = text_ab
+            self._clear_text()
+
+    def _put_text(self, idx, char):
+        if char == RDS_CR:
+            self._publish_text(idx)
+            return
+        self.text[idx] = _rds_char(char)
+
+    def _clear_text(self):
+        text = self.text
+        for i in range(RDS_TEXT_LEN):
+            text[i] = 0x20
+
+    def _publish_text(self, length):
+        text = self.text
+        while length > 0 and text[length - 1] == 0x20:
+            length -= 1
+        published = self._text_published
+        if length == self._text_published_len:
+            for i in range(length):
+                if published[i] != text[i]:
+                    break
+            else:
+                return
+        published[:length] = text[:length]
+        self._text_published_len = length
+        self.rds_text = published[:length].decode()
+        if self.send_text:
+            self.send_text(self.rds_text)
+
+    def _clock_time(self, block3, block4):
+        off = block4 & 0x3F
+        mins = (block4 >> 6) & 0x3F
+        mins += 60 * (((block3 & 0x0001) << 4) | ((block4 >> 12) & 0x0F))
+        if off & 0x20:
+            mins -= 30 * (off & 0x1F)
+        else:
+            mins += 30 * (off & 0x1F)
+        mins %= 24 * 60
+
+        # Check if function sendTime was set, and chek if the time is different from last time
+        if self.send_time and mins != self.last_minutes_1:
+            # Checks if time appeared in the last two instances - To avoid noise
+            if (
+                self.last_minutes_1 + 1 == mins
+                or self.last_minutes_2 + 1 == mins
+                or self.last_minutes_1 == 0
+                or self.last_minutes_2 == 0
+            ):
+                self.last_minutes_2 = self.last_minutes_1
+                self.last_minutes_1 = mins
+                self.send_time(mins // 60, mins % 60)
+
+
+def _rds_char(char):
+    # Printable ASCII only; the RDS-specific code pages map to spaces
+    return char if 31 < char < 127 else 0x20
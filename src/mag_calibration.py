@@ -0,0 +1,340 @@
+import math
+import struct
+import time
+
+from mag_sampler import UT_PER_LSB
+
+_MAGIC = b"CAL1"
+_RECORD = "<4s7fIB"  # magic, offsets, scales, baseline, samples, checksum
+RECORD_SIZE = struct.calcsize(_RECORD)
+_SCALE = 0.01  # fit in units of 100 µT to keep the RLS well conditioned
+
+
+class NvmStore:
+    """Keeps the calibration record in ``microcontroller.nvm``."""
+
+    def __init__(self, offset: int = 0) -> None:
+        self.offset = offset
+        try:
+            import microcontroller
+
+            self.nvm = microcontroller.nvm
+        except (ImportError, AttributeError):
+            self.nvm = None
+
+    def read(self):
+        if self.nvm is None or len(self.nvm) < self.offset + RECORD_SIZE:
+            return None
+        return bytes(self.nvm[self.offset:self.offset + RECORD_SIZE])
+
+    def write(self, data) -> bool:
+        if self.nvm is None or len(self.nvm) < self.offset + len(data):
+            return False
+        self.nvm[self.offset:self.offset + len(data)] = data
+        return True
+
+
+class _Welford:
+    """Running mean/variance; after ``cap`` samples it behaves like an EMA."""
+
+    def __init__(self, cap: int) -> None:
+        self.cap = cap
+        self.reset()
+
+    def reset(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        if self.n < self.cap:
+            self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        if self.n == self.cap:
+            # Keep the variance estimate windowed too
+            self.m2 *= (self.cap - 1) / self.cap
+
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return 0.0
+        return math.sqrt(max(0.0, self.m2 / (self.n - 1)))
+
+
+class OnlineCalibrator:
+    """Continuous hard/soft-iron calibration and field baseline.
+
+    Each decimated raw sample (from :class:`MagSampler` listeners) updates a
+    recursive least-squares fit of an axis-aligned ellipsoid
+    ``A x² + B y² + C z² + D x + E y + F z = 1``, from which the hard-iron
+    offsets and per-axis soft-iron scales follow. The 6x6 update is O(1) per
+    sample. Samples are only fed to the fit when the box has moved at least
+    ``min_step`` µT since the last accepted one, so a box sitting still does
+    not wind up the covariance.
+
+    The corrected magnitude feeds a Welford baseline; samples far outside it
+    (an actual field event) are left out so they do not drag it along. The
+    baseline starts over when a new fit moves the correction by more than
+    ``refit_tolerance`` µT, and after ``reseed_after`` rejected samples in a
+    row, since by then it no longer describes the corrected field. The
+    fitted parameters are written to ``store`` every ``save_interval``
+    seconds when they have changed, and loaded on the next boot.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        *,
+        forgetting: float = 0.998,
+        min_step: float = 2.0,
+        min_spread: float = 8.0,
+        min_fit_samples: int = 60,
+        baseline_window: int = 1200,
+        outlier_sigma: float = 4.0,
+        save_interval: float = 300.0,
+        refit_tolerance: float = 0.5,
+        reseed_after: int = 200,
+    ) -> None:
+        self.store = store
+        self.forgetting = forgetting
+        self.min_step = min_step
+        self.min_spread = min_spread
+        self.min_fit_samples = min_fit_samples
+        self.outlier_sigma = outlier_sigma
+        self.save_interval = save_interval
+        self.refit_tolerance = refit_tolerance
+        self.reseed_after = reseed_after
+
+        self.offset = [0.0, 0.0, 0.0]  # hard iron, µT
+        self.scale = [1.0, 1.0, 1.0]  # soft iron (diagonal)
+        self.fitted = False
+        self.loaded = False
+
+        self._axes = (_Welford(baseline_window), _Welford(baseline_window), _Welford(baseline_window))
+        self._baseline = _Welford(baseline_window)
+        self._last = None
+        self.accepted = 0
+        self._rejected_run = 0
+        self.reseeds = 0
+        self._baseline_ref = (self.offset, self.scale)
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self.saves = 0
+        self._reset_fit()
+
+    @property
+    def baseline_ready(self) -> bool:
+        return self._baseline.n >= 10
+
+    @property
+    def baseline_uT(self) -> float:
+        return self._baseline.mean
+
+    def reset(self) -> None:
+        """Forget the fit and baseline and start over."""
+        self.offset = [0.0, 0.0, 0.0]
+        self.scale = [1.0, 1.0, 1.0]
+        self.fitted = False
+        for stats in self._axes:
+            stats.reset()
+        self._reset_baseline(self.offset, self.scale)
+        self._last = None
+        self.accepted = 0
+        self._reset_fit()
+
+    def correct(self, x: float, y: float, z: float):
+        """Apply the current calibration to a raw-LSB vector (result in LSB)."""
+        o = self.offset
+        s = self.scale
+        k = 1.0 / UT_PER_LSB
+        return (x - o[0] * k) * s[0], (y - o[1] * k) * s[1], (z - o[2] * k) * s[2]
+
+    def update(self, x: float, y: float, z: float) -> None:
+        """Feed one raw-LSB sample (MagSampler listener)."""
+        ux = x * UT_PER_LSB
+        uy = y * UT_PER_LSB
+        uz = z * UT_PER_LSB
+
+        last = self._last
+        if last is None or abs(ux - last[0]) + abs(uy - last[1]) + abs(uz - last[2]) >= self.min_step:
+            self._last = (ux, uy, uz)
+            self._axes[0].add(ux)
+            self._axes[1].add(uy)
+            self._axes[2].add(uz)
+            self._fit_step(ux * _SCALE, uy * _SCALE, uz * _SCALE)
+            self.accepted += 1
+            if self.accepted >= self.min_fit_samples and self._excited():
+                self._adopt_fit()
+
+        cx, cy, cz = self.correct(x, y, z)
+        magnitude = math.sqrt(cx * cx + cy * cy + cz * cz) * UT_PER_LSB
+        baseline = self._baseline
+        if baseline.n > 20 and abs(magnitude - baseline.mean) > self.outlier_sigma * baseline.std + 1.0:
+            self._rejected_run += 1
+            if self._rejected_run < self.reseed_after:
+                return
+            # Not an event any more: the field (or correction) has moved
+            self._reset_baseline(self.offset, self.scale)
+            self.reseeds += 1
+        self._rejected_run = 0
+        baseline.add(magnitude)
+
+    def maybe_save(self, now=None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        if not self._dirty or now - self._last_save < self.save_interval:
+            return False
+        return self.save(now)
+
+    def save(self, now=None) -> bool:
+        self._last_save = time.monotonic() if now is None else now
+        if self.store is None or not self.fitted:
+            return False
+        body = struct.pack(_RECORD[:-1], _MAGIC, *self.offset, *self.scale, self.baseline_uT, self.accepted)
+        if not self.store.write(body + bytes((sum(body) & 0xFF,))):
+            return False
+        self._dirty = False
+        self.saves += 1
+        return True
+
+    def load(self) -> bool:
+        """Start from the parameters saved by a previous boot, if any."""
+        data = self.store.read() if self.store is not None else None
+        if not data or len(data) < RECORD_SIZE:
+            return False
+        fields = struct.unpack(_RECORD, data)
+        if fields[0] != _MAGIC or sum(data[:-1]) & 0xFF != fields[-1]:
+            return False
+        offset = list(fields[1:4])
+        scale = list(fields[4:7])
+        if not all(0.2 < s < 5.0 for s in scale):
+            return False
+
+        self.offset = offset
+        self.scale = scale
+        self._baseline_ref = (offset, scale)
+        self.fitted = True
+        self.loaded = True
+        self._seed_fit()
+        baseline = fields[7]
+        if baseline > 0:
+            self._baseline.n = 10
+            self._baseline.mean = baseline
+        return True
+
+    def stats(self):
+        return {
+            "fitted": self.fitted,
+            "loaded": self.loaded,
+            "accepted": self.accepted,
+            "offset_uT": tuple(self.offset),
+            "scale": tuple(self.scale),
+            "baseline_uT": self.baseline_uT,
+            "baseline_std": self._baseline.std,
+            "saves": self.saves,
+            "reseeds": self.reseeds,
+        }
+
+    # Private methods
+    def _reset_baseline(self, offset, scale) -> None:
+        self._baseline.reset()
+        self._baseline_ref = (offset, scale)
+        self._rejected_run = 0
+
+    def _reset_fit(self) -> None:
+        self.theta = [0.0] * 6
+        # Large initial covariance: no confidence in the zero start
+        self.P = [[1000.0 if i == j else 0.0 for j in range(6)] for i in range(6)]
+
+    def _seed_fit(self) -> None:
+        """Express saved offsets/scales as ellipsoid coefficients."""
+        r_mean = self.baseline_uT if self.baseline_uT > 0 else 50.0
+        coeff = []
+        k = 1.0
+        for i in range(3):
+            r = r_mean / self.scale[i] * _SCALE
+            o = self.offset[i] * _SCALE
+            coeff.append((r, o))
+            k -= o * o / (r * r)
+        if abs(k) < 1e-6:
+            return
+        theta = [0.0] * 6
+        for i, (r, o) in enumerate(coeff):
+            theta[i] = 1.0 / (r * r * k)
+            theta[i + 3] = -2.0 * o / (r * r * k)
+        self.theta = theta
+        self.P = [[10.0 if i == j else 0.0 for j in range(6)] for i in range(6)]
+
+    def _fit_step(self, x: float, y: float, z: float) -> None:
+        phi = (x * x, y * y, z * z, x, y, z)
+        P = self.P
+        lam = self.forgetting
+
+        Pphi = [sum(P[i][j] * phi[j] for j in range(6)) for i in range(6)]
+        denom = lam + sum(phi[i] * Pphi[i] for i in range(6))
+        if denom <= 0.0:
+            self._reset_fit()
+            return
+        gain = [v / denom for v in Pphi]
+        err = 1.0 - sum(self.theta[i] * phi[i] for i in range(6))
+        for i in range(6):
+            self.theta[i] += gain[i] * err
+        # P = (P - gain * Pphi') / lam, kept symmetric
+        trace = 0.0
+        for i in range(6):
+            row = P[i]
+            gi = gain[i]
+            for j in range(i, 6):
+                value = (row[j] - gi * Pphi[j]) / lam
+                row[j] = value
+                P[j][i] = value
+            trace += row[i]
+        if trace > 1e6 or trace != trace:
+            self._reset_fit()
+
+    def _excited(self) -> bool:
+        spread = 0
+        for stats in self._axes:
+            if stats.std >= self.min_spread:
+                spread += 1
+        return spread >= 2
+
+    def _adopt_fit(self) -> None:
+        a = self.theta[0:3]
+        d = self.theta[3:6]
+        if not (a[0] > 0 and a[1] > 0 and a[2] > 0) and not (a[0] < 0 and a[1] < 0 and a[2] < 0):
+            return
+        g = 1.0
+        for i in range(3):
+            g += d[i] * d[i] / (4.0 * a[i])
+        radii = []
+        offset = []
+        for i in range(3):
+            r2 = g / a[i]
+            if r2 <= 0:
+                return
+            radii.append(math.sqrt(r2) / _SCALE)
+            offset.append(-d[i] / (2.0 * a[i]) / _SCALE)
+        r_mean = (radii[0] + radii[1] + radii[2]) / 3.0
+        if not 10.0 < r_mean < 200.0:
+            return
+        scale = [r_mean / r for r in radii]
+        if not all(0.2 < s < 5.0 for s in scale):
+            return
+
+        if max(abs(offset[i] - self.offset[i]) for i in range(3)) > 0.5:
+            self._dirty = True
+        # Compare with the correction the baseline was learned under, so
+        # small steps that add up are caught too
+        ref_offset, ref_scale = self._baseline_ref
+        r = self.baseline_uT if self.baseline_uT > 0 else r_mean
+        shift = 0.0
+        for i in range(3):
+            shift = max(shift, abs(offset[i] - ref_offset[i]), r * abs(scale[i] - ref_scale[i]))
+        if shift > self.refit_tolerance:
+            self._reset_baseline(offset, scale)
+        self.offset = offset
+        self.scale = scale
+        self.fitted = True
@@ -0,0 +1,258 @@
+import math
+import time
+from array import array
+
+# LIS2MDL registers
+LIS2MDL_CFG_REG_A = 0x60
+LIS2MDL_CFG_REG_C = 0x62
+LIS2MDL_STATUS_REG = 0x67  # followed by OUTX_L..OUTZ_H (0x68-0x6D)
+
+CFG_A_ODR_MASK = 0x0C
+CFG_A_MD_MASK = 0x03  # 00 = continuous mode
+CFG_A_MD_SINGLE = 0x01  # one conversion, then back to idle
+CFG_C_DRDY_ON_PIN = 0x01
+CFG_C_BDU = 0x10
+STATUS_ZYXDA = 0x08  # new x/y/z sample available
+STATUS_ZYXOR = 0x80  # a sample was overwritten before it was read
+
+UT_PER_LSB = 0.15  # 1.5 mG/LSB
+_ODR_BITS = {10: 0x00, 20: 0x04, 50: 0x08, 100: 0x0C}
+SINGLE_SHOT_MAX_HZ = 150  # fastest rate of triggered single conversions
+_Q = 8  # fixed-point fraction bits for the EMA
+
+
+class MagSampler:
+    """Samples the LIS2MDL at its own output data rate or on a timer.
+
+    At one of the sensor's ODRs (10/20/50/100 Hz) it runs in continuous
+    mode with block data update enabled. Any other ``odr_hz`` up to
+    ``SINGLE_SHOT_MAX_HZ`` uses single-shot mode instead: each poll reads
+    the finished conversion and triggers the next one, so the sample rate
+    follows our ``period`` rather than the sensor's fixed ODRs (which put
+    50 Hz mains on DC or Nyquist). ``poll()`` reads the status register and
+    the x/y/z outputs in one burst and only keeps the sample when the
+    data-ready bit is set, so a sample is never read twice nor (unless the
+    sensor reports an overrun) skipped. With ``drdy`` (a DigitalInOut on
+    the INT/DRDY pin) the status read is skipped entirely until the pin
+    goes high.
+
+    Raw samples go into a fixed ``ring_size`` ring of int16 x/y/z triplets.
+    Every ``decimation`` samples the block average is passed to
+    ``listeners`` (raw), optionally corrected by ``correction`` (e.g. a
+    hard/soft-iron calibration), reduced to a magnitude and fed into a
+    fixed-point EMA (``1 / 2**ema_shift`` smoothing).
+    """
+
+    def __init__(
+        self,
+        device,
+        *,
+        odr_hz: int = 100,
+        ring_size: int = 64,
+        decimation: int = 5,
+        ema_shift: int = 2,
+        drdy=None,
+    ) -> None:
+        _check_rate(odr_hz)
+        self.device = device  # adafruit_bus_device I2CDevice for the sensor
+        self.odr_hz = odr_hz
+        self.period = 1.0 / odr_hz
+        self.decimation = decimation
+        self.ema_shift = ema_shift
+        self.drdy = drdy
+
+        self.ring_size = ring_size
+        self.ring = array("h", bytes(6 * ring_size))  # x, y, z interleaved
+        self.head = 0  # next triplet slot
+        self.filled = 0
+
+        self._cmd = bytearray(1)
+        self._rx = bytearray(7)
+        self._rx_mv = memoryview(self._rx)
+        self._next_poll = None
+        self._cfg_a = 0
+
+        self._sx = 0
+        self._sy = 0
+        self._sz = 0
+        self._n = 0
+        self.x = 0.0  # last decimated vector, raw LSB
+        self.y = 0.0
+        self.z = 0.0
+        self.magnitude_q = 0
+        self.ema_q = None
+        self.listeners = []  # callables(x, y, z) at the decimated rate
+        self.correction = None  # callable(x, y, z) -> corrected (x, y, z)
+
+        self.reset_stats()
+        self.configure()
+
+    @property
+    def single_shot(self) -> bool:
+        return self.odr_hz not in _ODR_BITS
+
+    def configure(self) -> None:
+        """Set ODR and mode, BDU and (optionally) DRDY on the INT pin."""
+        cfg_c = self._read_reg(LIS2MDL_CFG_REG_C) | CFG_C_BDU
+        if self.drdy is not None:
+            cfg_c |= CFG_C_DRDY_ON_PIN
+        self._write_reg(LIS2MDL_CFG_REG_C, cfg_c)
+
+        cfg_a = self._read_reg(LIS2MDL_CFG_REG_A) & ~(CFG_A_ODR_MASK | CFG_A_MD_MASK)
+        if self.single_shot:
+            # Fastest conversion; writing this starts the first one
+            cfg_a |= _ODR_BITS[100] | CFG_A_MD_SINGLE
+        else:
+            cfg_a |= _ODR_BITS[self.odr_hz]
+        self._cfg_a = cfg_a
+        self._write_reg(LIS2MDL_CFG_REG_A, cfg_a)
+
+    def set_rate(self, odr_hz) -> None:
+        """Switch sample rate, e.g. to a single-shot rate for mains detection."""
+        _check_rate(odr_hz)
+        if odr_hz == self.odr_hz:
+            return
+        self.odr_hz = odr_hz
+        self.period = 1.0 / odr_hz
+        self._next_poll = None
+        self.configure()
+
+    def reset_stats(self) -> None:
+        self.samples = 0
+        self.outputs = 0
+        self.dropped = 0
+        self.duplicates = 0
+
+    @property
+    def magnitude_uT(self) -> float:
+        return self.magnitude_q * UT_PER_LSB / (1 << _Q)
+
+    @property
+    def ema_uT(self) -> float:
+        if self.ema_q is None:
+            return 0.0
+        return self.ema_q * UT_PER_LSB / (1 << _Q)
+
+    def vector_uT(self):
+        return self.x * UT_PER_LSB, self.y * UT_PER_LSB, self.z * UT_PER_LSB
+
+    def next_deadline(self, now):
+        if self._next_poll is None:
+            return now
+        return self._next_poll
+
+    def poll(self, now=None) -> bool:
+        """Collect a new sample if one is ready; True when a decimated output updated."""
+        if now is None:
+            now = time.monotonic()
+        if self.drdy is not None and not self.drdy.value:
+            self.duplicates += 1
+            self._next_poll = now + self.period * 0.25
+            return False
+
+        rx = self._rx
+        self._cmd[0] = LIS2MDL_STATUS_REG
+        with self.device as i2c:
+            i2c.write_then_readinto(self._cmd, rx)
+        status = rx[0]
+        if not status & STATUS_ZYXDA:
+            # Polled before the next conversion finished; nothing new
+            self.duplicates += 1
+            self._next_poll = now + self.period * 0.25
+            return False
+        if status & STATUS_ZYXOR:
+            self.dropped += 1
+
+        x = _s16(rx[1] | rx[2] << 8)
+        y = _s16(rx[3] | rx[4] << 8)
+        z = _s16(rx[5] | rx[6] << 8)
+        if self.single_shot:
+            self._write_reg(LIS2MDL_CFG_REG_A, self._cfg_a)  # next conversion
+        self._push(x, y, z)
+        # Stay on the sensor's sample grid rather than drifting with our wake-ups
+        if self._next_poll is None or now - self._next_poll >= self.period:
+            self._next_poll = now + self.period
+        else:
+            self._next_poll += self.period
+        return self._decimate(x, y, z)
+
+    def copy_axis(self, axis: int, out) -> int:
+        """Copy the newest ``len(out)`` samples of one axis, oldest first."""
+        n = min(len(out), self.filled)
+        ring = self.ring
+        size = self.ring_size
+        start = self.head - n
+        for i in range(n):
+            out[i] = ring[3 * ((start + i) % size) + axis]
+        return n
+
+    def stats(self):
+        return {
+            "odr_hz": self.odr_hz,
+            "single_shot": self.single_shot,
+            "samples": self.samples,
+            "outputs": self.outputs,
+            "dropped": self.dropped,
+            "duplicates": self.duplicates,
+        }
+
+    # Private methods
+    def _push(self, x: int, y: int, z: int) -> None:
+        i = 3 * self.head
+        ring = self.ring
+        ring[i] = x
+        ring[i + 1] = y
+        ring[i + 2] = z
+        self.head = (self.head + 1) % self.ring_size
+        if self.filled < self.ring_size:
+            self.filled += 1
+        self.samples += 1
+
+    def _decimate(self, x: int, y: int, z: int) -> bool:
+        self._sx += x
+        self._sy += y
+        self._sz += z
+        self._n += 1
+        if self._n < self.decimation:
+            return False
+
+        n = self._n
+        self.x = self._sx / n
+        self.y = self._sy / n
+        self.z = self._sz / n
+        self._sx = self._sy = self._sz = self._n = 0
+
+        for listener in self.listeners:
+            listener(self.x, self.y, self.z)
+
+        if self.correction is not None:
+            cx, cy, cz = self.correction(self.x, self.y, self.z)
+        else:
+            cx, cy, cz = self.x, self.y, self.z
+        mag_q = int(math.sqrt(cx * cx + cy * cy + cz * cz) * (1 << _Q))
+        self.magnitude_q = mag_q
+        if self.ema_q is None:
+            self.ema_q = mag_q
+        else:
+            self.ema_q += (mag_q - self.ema_q) >> self.ema_shift
+        self.outputs += 1
+        return True
+
+    def _read_reg(self, reg: int) -> int:
+        self._cmd[0] = reg
+        with self.device as i2c:
+            i2c.write_then_readinto(self._cmd, self._rx_mv[:1])
+        return self._rx[0]
+
+    def _write_reg(self, reg: int, value: int) -> None:
+        with self.device as i2c:
+            i2c.write(bytes((reg, value & 0xFF)))
+
+
+def _check_rate(odr_hz) -> None:
+    if odr_hz not in _ODR_BITS and not 0 < odr_hz <= SINGLE_SHOT_MAX_HZ:
+        raise ValueError("Unsupported LIS2MDL data rate: {} Hz".format(odr_hz))
+
+
+def _s16(value: int) -> int:
+    return value - 0x10000 if value & 0x8000 else value
@@ -0,0 +1,156 @@
+import math
+from array import array
+
+from mag_sampler import UT_PER_LSB
+
+# Nominal mains fundamentals and harmonics (Hz)
+MAINS_BANDS = (50, 60, 100, 120, 150, 180)
+
+
+def alias_frequency(freq: float, sample_rate: float) -> float:
+    """Where a tone at ``freq`` lands after sampling at ``sample_rate``."""
+    return abs(freq - sample_rate * round(freq / sample_rate))
+
+
+class MainsDetector:
+    """Goertzel filter bank for narrowband (50/60 Hz mains) magnetic fields.
+
+    Every ``block`` new samples the newest ``block`` x/y/z samples are
+    copied out of the :class:`MagSampler` ring, de-meaned and Hann
+    windowed, and one Goertzel recursion per band and axis measures the
+    field at that frequency: O(block) per band instead of a full FFT. The
+    per-axis amplitudes are combined into a vector amplitude in µT and
+    published in ``amplitude`` (one entry per band), apart from the DC
+    baseline the K2 level uses.
+
+    The sampler runs well below the mains frequencies, so bands above
+    Nyquist are measured at their alias. Bands that alias within two bins
+    of DC or of Nyquist, or onto another band's bin, are reported as NaN
+    rather than double counted or measured with a phase-dependent
+    amplitude. The LIS2MDL's continuous ODRs all put 50 Hz on DC or
+    Nyquist, so the EMF reader samples with single-shot conversions at
+    140 Hz: 50, 60, 100 (at 40 Hz), 120 (at 20 Hz) and 150 Hz (at 10 Hz)
+    each get their own bin, and only 180 Hz (also at 40 Hz) is NaN.
+    Blocks that span a sensor overrun are skipped.
+    """
+
+    def __init__(self, sampler, *, block: int = 64, bands=MAINS_BANDS) -> None:
+        if block > sampler.ring_size:
+            raise ValueError("MainsDetector block exceeds the sampler ring size.")
+        self.sampler = sampler
+        self.block = block
+        self.bands = tuple(bands)
+        self.sample_rate = sampler.odr_hz
+
+        self.window = array("f", [0.5 - 0.5 * math.cos(2 * math.pi * i / (block - 1)) for i in range(block)])
+        self._gain = 2.0 / sum(self.window)
+        self._samples = array("f", [0.0] * block)
+        self._axis = array("h", [0] * block)
+        self.amplitude = array("f", [0.0] * len(self.bands))
+        self.coeffs = array("f", [0.0] * len(self.bands))
+        self.aliases = []
+        self._plan()
+
+        self._next_at = sampler.samples + block
+        self._dropped_at = sampler.dropped
+        self.blocks = 0
+        self.skipped = 0
+
+    @property
+    def mains_uT(self) -> float:
+        """Strongest 50/60 Hz fundamental; NaN bands are ignored."""
+        best = 0.0
+        for i, band in enumerate(self.bands):
+            if band in (50, 60) and self.amplitude[i] > best:
+                best = self.amplitude[i]
+        return best
+
+    @property
+    def dominant_hz(self) -> int:
+        best = 0.0
+        freq = 0
+        for i, band in enumerate(self.bands):
+            if self.amplitude[i] > best:
+                best = self.amplitude[i]
+                freq = band
+        return freq
+
+    def update(self) -> bool:
+        """Analyse a block if enough new samples arrived; True when updated."""
+        sampler = self.sampler
+        if sampler.odr_hz != self.sample_rate:
+            self.sample_rate = sampler.odr_hz
+            self._plan()
+        if sampler.samples < self._next_at:
+            return False
+        self._next_at = sampler.samples + self.block
+
+        if sampler.dropped != self._dropped_at:
+            self._dropped_at = sampler.dropped
+            self.skipped += 1
+            return False
+
+        power = [0.0] * len(self.bands)
+        for axis in range(3):
+            self._load_axis(axis)
+            for i in range(len(self.bands)):
+                if self.aliases[i] is not None:
+                    power[i] += self._goertzel(self.coeffs[i])
+        for i in range(len(self.bands)):
+            if self.aliases[i] is None:
+                self.amplitude[i] = float("nan")
+            else:
+                self.amplitude[i] = math.sqrt(power[i]) * self._gain * UT_PER_LSB
+        self.blocks += 1
+        return True
+
+    def payload_into(self, payload):
+        """Add the mains level and dominant band to a sidecar payload dict."""
+        payload["emf_mains_uT"] = self.mains_uT
+        payload["emf_mains_hz"] = self.dominant_hz
+        return payload
+
+    def stats(self):
+        return {
+            "blocks": self.blocks,
+            "skipped": self.skipped,
+            "bands": {band: self.amplitude[i] for i, band in enumerate(self.bands)},
+            "aliases": {band: self.aliases[i] for i, band in enumerate(self.bands)},
+        }
+
+    # Private methods
+    def _plan(self) -> None:
+        """Work out each band's aliased bin and its Goertzel coefficient."""
+        bin_width = self.sample_rate / self.block
+        taken = {}
+        self.aliases = []
+        for i, band in enumerate(self.bands):
+            alias = alias_frequency(band, self.sample_rate)
+            k = round(alias / bin_width)
+            if k < 2 or k > self.block // 2 - 2 or k in taken:
+                # Too close to DC (killed by de-meaning), too close to
+                # Nyquist (amplitude depends on the sampling phase) or
+                # shared with another band
+                self.aliases.append(None)
+                continue
+            taken[k] = band
+            self.aliases.append(alias)
+            self.coeffs[i] = 2.0 * math.cos(2.0 * math.pi * alias / self.sample_rate)
+
+    def _load_axis(self, axis: int) -> None:
+        n = self.sampler.copy_axis(axis, self._axis)
+        raw = self._axis
+        samples = self._samples
+        mean = sum(raw) / n if n else 0.0
+        window = self.window
+        for i in range(self.block):
+            samples[i] = (raw[i] - mean) * window[i] if i < n else 0.0
+
+    def _goertzel(self, coeff: float) -> float:
+        s1 = 0.0
+        s2 = 0.0
+        for x in self._samples:
+            s0 = x + coeff * s1 - s2
+            s2 = s1
+            s1 = s0
+        return s1 * s1 + s2 * s2 - coeff * s1 * s2
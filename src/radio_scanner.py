@@ -1,17 +1,27 @@
 import time
 import random
-import tinkeringtech_rda5807m
-from adafruit_bus_device.i2c_device import I2CDevice
+from band_survey import BandSurvey
+from spectrum_map import SpectrumMap
+from channel_sampler import AliasSampler, LfsrPermutation
 
 # Absolute limits for radio scan settings
 MIN_SCAN_RATE = 1  # Minimum scan rate in jumps per minute
 MAX_SCAN_RATE = 150   # Maximum scan rate in jumps per minute
 MAX_SCAN_STEP = 100  # Maximum step size in 100kHz units
 MIN_SCAN_STEP = 1    # Minimum step size in 100kHz units
+MAX_RSSI = 63        # RSSI is a 6-bit value
 
 class ScanMethod:
   LINEAR = "linear"
   RANDOM = "random"
+  WEIGHTED = "weighted"  # favor strong channels
+  QUIET = "quiet"        # favor weak/empty channels
+  SHUFFLE = "shuffle"    # every channel once per cycle, in random order
+
+class RefreshState:
+  IDLE = 0
+  WAIT_STC = 1
+  SETTLE = 2
 
 class RadioScanner:
   def __init__(
@@ -28,11 +38,24 @@ class RadioScanner:
       starting_freq: int = 8700,
       min_scan_freq: int = 8700,
       max_scan_freq: int = 10800,
+      survey_use_seek: bool = False,
+      background_refresh: bool = False,
+      refresh_budget: float = 0.08,   # max seconds per refresh excursion
+      refresh_max_age: float = 300.0, # seconds before a channel counts as stale
+      rds_cache_size: int = 32,       # stations remembered by frequency
+      survey_max_age: float = 1800.0, # seconds before the survey re-measures a channel
     ):
+    # The driver is only loaded once a radio is actually being set up
+    import tinkeringtech_rda5807m
+    from adafruit_bus_device.i2c_device import I2CDevice
+    from rds_service import RdsService
+
     self.radio_i2c = I2CDevice(i2c, address)
     self.freq = starting_freq
     self.rds = tinkeringtech_rda5807m.RDSParser()
     self.radio = tinkeringtech_rda5807m.Radio(self.radio_i2c, self.rds, self.freq)
+    # Station identity for the tuned channel; schedule rds_service.update
+    self.rds_service = RdsService(self.radio, self.rds, cache_size=rds_cache_size)
     self.enabled = enabled
     self.debug = debug
     self.method = method
@@ -44,21 +67,51 @@ class RadioScanner:
     self.min_scan_freq = min_scan_freq
     self.max_scan_freq = max_scan_freq
     self.last_scan_tick = time.monotonic()
-    self.signal_strength_vector = [(self.radio.freq_low + (i * 10), 0) for i in range((self.radio.freq_high - self.radio.freq_low)//10 + 1)]  # One entry per 10kHz step
+    self.poll_interval = 0.01  # seconds between polls while a tune/scan is pending
+    self.idle_interval = 0.25  # seconds between wake-ups while disabled
+    self.on_tune = None  # optional callback(freq) after every scan hop
+    # Optional callback(freq) when a refresh excursion leaves the scan
+    # frequency, and callback(None) when it returns
+    self.on_excursion = None
+    self.spectrum = SpectrumMap(self.radio.freq_low, self.radio.freq_high, self.radio.freq_steps)  # One entry per 100kHz channel
     self.max_signal_strength = 0
+    self.sampler = AliasSampler(self.spectrum.size)
+    self.update_sampler_range()
+    self.update_sampler_weights()
+    self.shuffle = LfsrPermutation(self.spectrum.size)
 
-    # Full-frequency scan flags
+    # Full-frequency scan state
     self.prev_volume = 5
-    self.sig_strength_scan_in_progress = False
-    self.sig_strength_scan_freqs = []
-    self.sig_strength_scan_index = 0
-    self.sig_strength_scan_tune_pending = False
-    self.sig_strength_scan_rssi_stabilization_start_time = 0.0
-    self.sig_strength_scan_start_time = 0.0
+    self.survey = BandSurvey(
+      self.radio,
+      self.record_signal_strength,
+      use_seek=survey_use_seek,
+      seek_threshold=seek_threshold,
+      debug=debug,
+    )
+
+    # Background spectrum refresh state. An excursion retunes the only tuner,
+    # so for up to refresh_budget the speaker plays the other channel;
+    # on_excursion lets the recorder mute and mark that stretch.
+    self.background_refresh = background_refresh
+    self.refresh_budget = refresh_budget
+    self.refresh_max_age = refresh_max_age
+    self.survey_max_age = survey_max_age
+    self.refresh_settle = 0.02  # seconds to let RSSI settle after STC
+    self.refresh_return_margin = 0.03  # seconds reserved to retune before a hop
+    self.refresh_per_hop = 1    # excursions allowed between two scan hops
+    self.refresh_state = RefreshState.IDLE
+    self.refresh_index = 0
+    self.refresh_start_time = 0.0
+    self.refresh_stc_time = 0.0
+    self.refreshes_this_hop = 0
+    self.refresh_count = 0
+    self.refresh_aborts = 0
 
   def setup(self):
     self.radio.set_mono(True)
     self.set_volume(5)  # Default volume
+    self.rds_service.on_tune(self.freq)
 
   # Public methods
   def set_freq(self, freq: int):
@@ -69,60 +122,110 @@ class RadioScanner:
     else:
       self.freq = freq
     self.radio.set_freq(self.freq)
+    self.rds_service.on_tune(self.freq)
 
     if self.debug:
         print("RadioScanner: frequency set to", self.freq)
 
-  def fill_signal_strength_vector(self):
-    if not self.sig_strength_scan_in_progress:
+  def fill_signal_strength_vector(self, now=None):
+    if now is None:
+      now = time.monotonic()
+
+    if not self.survey.in_progress:
       if self.debug:
           print("RadioScanner: starting full spectrum signal strength scan.")
-      self.sig_strength_scan_freqs = [freq for freq, strength in self.signal_strength_vector if strength == 0]
-      if len(self.sig_strength_scan_freqs) == 0:
+      # Channels restored from a saved atlas only need measuring once stale
+      freqs = self.spectrum.stale_freqs(now, self.survey_max_age)
+      if len(freqs) == 0:
         if self.debug:
-          print("RadioScanner: signal strength vector already filled. Aborting scan.")
-      else:
-        if self.debug:
-          print("RadioScanner: frequencies to be scanned:", self.sig_strength_scan_freqs)
+          print("RadioScanner: signal strength vector is up to date. Aborting scan.")
+        return
+      if self.debug:
+        print("RadioScanner: frequencies to be scanned:", freqs)
       self.prev_volume = self.radio.volume
       self.set_volume(0)  # Mute during scan
-      self.sig_strength_scan_in_progress = True
-      self.sig_strength_scan_scan_index = 0
-      self.sig_strength_scan_tune_pending = True
-      self.sig_strength_scan_rssi_stabilization_start_time = 0.0
-      self.sig_strength_scan_start_time = time.monotonic()
-    else:
-      if self.sig_strength_scan_index >= len(self.sig_strength_scan_freqs):
-        if self.debug:
-            elapsed = time.monotonic() - self.sig_strength_scan_start_time
-            print("RadioScanner: signal strength scan completed in", elapsed, "seconds")
-        self.sig_strength_scan_in_progress = False
-        self.set_volume(self.prev_volume)
+      self.rds_service.enabled = False  # the survey hops too fast for RDS
+      self.survey.start(freqs, now)
+      return
+
+    if self.survey.step(now):
+      stats = self.survey.stats()
+      if self.debug:
+          print("RadioScanner: signal strength scan completed in", stats["elapsed_s"], "seconds")
+          print("RadioScanner: survey stats:", stats)
+      self.radio.set_freq(self.freq)
+      self.set_volume(self.prev_volume)
+      self.rds_service.enabled = True
+
+  def get_survey_stats(self):
+    return self.survey.stats()
+
+  def set_background_refresh(self, enabled: bool):
+    if not enabled and self.refresh_state != RefreshState.IDLE:
+      self.end_refresh(measured=False)
+    self.background_refresh = enabled
+
+    if self.debug:
+        print("RadioScanner: background refresh set to", self.background_refresh)
+
+  def refresh_step(self, now, next_hop):
+    """Re-measure the stalest channel in the dead time before the next hop."""
+    if self.refresh_state == RefreshState.IDLE:
+      if self.refreshes_this_hop >= self.refresh_per_hop:
+        return
+      if next_hop - now < self.refresh_budget + self.refresh_return_margin:
+        self.refreshes_this_hop = self.refresh_per_hop
         return
 
-      if self.sig_strength_scan_tune_pending:
-        self.radio.set_freq(self.sig_strength_scan_freqs[self.sig_strength_scan_index])
-        self.sig_strength_scan_tune_pending = False
+      lo = self.get_freq_index(self.min_scan_freq)
+      hi = self.get_freq_index(self.max_scan_freq) + 1
+      index = self.spectrum.stalest(lo, hi)
+      if index == self.get_freq_index(self.freq) or not self.spectrum.is_stale(index, now, self.refresh_max_age):
+        # Nothing worth an excursion until the next hop
+        self.refreshes_this_hop = self.refresh_per_hop
+        return
 
-      if self.radio.poll_tune():
-        if self.sig_strength_scan_rssi_stabilization_start_time == 0.0:
-          self.sig_strength_scan_rssi_stabilization_start_time = time.monotonic()
-        if time.monotonic() - self.sig_strength_scan_rssi_stabilization_start_time >= 0.2:
-          strength = self.radio.get_rssi()
-          freq = self.sig_strength_scan_freqs[self.sig_strength_scan_index]
-          self.signal_strength_vector[self.get_freq_index(freq)] = (freq, strength)
-          self.sig_strength_scan_index += 1
-          self.sig_strength_scan_rssi_stabilization_start_time = 0.0
-          self.sig_strength_scan_tune_pending = True
-          if self.debug:
-            print("RadioScanner: set RSSI for", freq, "to", strength)
+      self.refreshes_this_hop += 1
+      self.refresh_index = index
+      self.refresh_start_time = now
+      if self.on_excursion:
+        self.on_excursion(self.spectrum.freq(index))
+      self.radio.set_freq(self.spectrum.freq(index))
+      self.refresh_state = RefreshState.WAIT_STC
+      return
 
+    if now - self.refresh_start_time >= self.refresh_budget or next_hop - now <= self.refresh_return_margin:
+      self.end_refresh(measured=False)
+      return
 
+    if self.refresh_state == RefreshState.WAIT_STC:
+      if self.radio.poll_tune():
+        self.refresh_stc_time = now
+        self.refresh_state = RefreshState.SETTLE
+    elif now - self.refresh_stc_time >= self.refresh_settle:
+      strength = self.radio.status_rssi(0)
+      self.record_signal_strength(self.spectrum.freq(self.refresh_index), strength, now)
+      if self.debug:
+          print("RadioScanner: refreshed RSSI for", self.spectrum.freq(self.refresh_index), "to", strength)
+      self.end_refresh(measured=True)
 
+  def end_refresh(self, measured: bool):
+    """Return to the scan frequency after a refresh excursion."""
+    if measured:
+      self.refresh_count += 1
+    else:
+      self.refresh_aborts += 1
+    self.refresh_state = RefreshState.IDLE
+    self.radio.set_freq(self.freq)
+    if self.on_excursion:
+      self.on_excursion(None)
 
   def set_method(self, method: str):
-    if method in (ScanMethod.LINEAR, ScanMethod.RANDOM):
+    if method in (ScanMethod.LINEAR, ScanMethod.RANDOM, ScanMethod.WEIGHTED, ScanMethod.QUIET, ScanMethod.SHUFFLE):
+      prev_method = self.method
       self.method = method
+      if method != prev_method and method in (ScanMethod.WEIGHTED, ScanMethod.QUIET):
+        self.update_sampler_weights()
     else:
       self.method = ScanMethod.LINEAR
 
@@ -168,6 +271,7 @@ class RadioScanner:
       self.seek_threshold = 15
     else:
       self.seek_threshold = threshold
+    self.survey.seek_threshold = self.seek_threshold
     if self.debug:
         print("RadioScanner: seek threshold set to", self.seek_threshold)
 
@@ -176,6 +280,7 @@ class RadioScanner:
       self.min_scan_freq = self.radio.freq_low
     else:
       self.min_scan_freq = freq
+    self.update_sampler_range()
 
     if self.debug:
         print("RadioScanner: minimum scan frequency set to", self.min_scan_freq)
@@ -185,6 +290,7 @@ class RadioScanner:
       self.max_scan_freq = self.radio.freq_high
     else:
       self.max_scan_freq = freq
+    self.update_sampler_range()
 
     if self.debug:
         print("RadioScanner: maximum scan frequency set to", self.max_scan_freq)
@@ -199,15 +305,35 @@ class RadioScanner:
     return self.step * self.radio.freq_steps
   
   def get_freq_index(self, freq: int):
-    return (freq - self.radio.freq_low) // 10
+    return self.spectrum.index(freq)
   
-  def update_signal_strength(self):
+  def record_signal_strength(self, freq: int, strength: int, now):
+    index = self.get_freq_index(freq)
+    self.spectrum.update(index, strength, now)
+    self.sampler.set_weight(index, self.channel_weight(strength))
+
+  def channel_weight(self, strength: int):
+    """Sampling weight of a channel for the weighted scan modes."""
+    if self.method == ScanMethod.QUIET:
+      strength = MAX_RSSI - strength
+    return 1 + strength * strength
+
+  def update_sampler_weights(self):
+    rssi = self.spectrum.rssi
+    for index in range(self.spectrum.size):
+      self.sampler.set_weight(index, self.channel_weight(rssi[index]))
+
+  def update_sampler_range(self):
+    lo = self.get_freq_index(self.min_scan_freq)
+    hi = self.get_freq_index(self.max_scan_freq)
+    self.sampler.set_range(lo, max(1, hi - lo + 1))
+
+  def update_signal_strength(self, now):
     if self.debug:
         print("RadioScanner: updating signal strength vector.")
 
-    freq_index = self.get_freq_index(self.freq)
     strength = self.radio.get_rssi()
-    self.signal_strength_vector[freq_index] = (self.freq, strength)
+    self.record_signal_strength(self.freq, strength, now)
 
   def get_settings(self):
     return {
@@ -222,12 +348,28 @@ class RadioScanner:
       "volume": self.volume
     }
 
+  def next_deadline(self, now):
+    """Monotonic time at which update() next has work to do."""
+    if not self.enabled:
+      return now + self.idle_interval
+
+    if self.survey.in_progress:
+      return max(now + self.poll_interval, self.survey.next_deadline(now))
+
+    next_hop = self.last_scan_tick + 60 / self.rate
+    if self.background_refresh:
+      if self.refresh_state != RefreshState.IDLE:
+        return min(now + self.poll_interval, next_hop)
+      if self.refreshes_this_hop < self.refresh_per_hop:
+        return now
+    return next_hop
+
   def update(self, now):
     if self.enabled == False:
       return None
     
-    if self.sig_strength_scan_in_progress:
-      self.fill_signal_strength_vector()
+    if self.survey.in_progress:
+      self.fill_signal_strength_vector(now)
       return None
     
     if self.debug:
@@ -235,19 +377,31 @@ class RadioScanner:
     interval = 60 / self.rate
 
     if (now - self.last_scan_tick) < interval:
-      if self.debug:
+      if self.background_refresh:
+        self.refresh_step(now, self.last_scan_tick + interval)
+      elif self.debug:
           print("RadioScanner: skipping scan step; only", now - self.last_scan_tick, "seconds since last scan. (interval is", interval, "seconds)")
       return None
 
     self.last_scan_tick = now
-    self.update_signal_strength()
-
-    print("Signal strength vector:", self.signal_strength_vector)
+    self.refreshes_this_hop = 0
+    if self.refresh_state != RefreshState.IDLE:
+      # The hop retunes anyway; drop the unfinished excursion. The radio
+      # isn't on self.freq, so its RSSI can't be recorded this time.
+      self.refresh_aborts += 1
+      self.refresh_state = RefreshState.IDLE
+      if self.on_excursion:
+        self.on_excursion(None)
+    else:
+      self.update_signal_strength(now)
 
     if self.debug:
         print("RadioScanner: performing scan step.")
 
     self.scan_step()
+    self.rds_service.on_tune(self.freq)
+    if self.on_tune:
+      self.on_tune(self.freq)
 
     if self.debug:
         print("RadioScanner: scanned to frequency", self.freq)
@@ -257,6 +411,10 @@ class RadioScanner:
       self.random_scan()
     elif self.method == ScanMethod.LINEAR:
       self.linear_scan()
+    elif self.method in (ScanMethod.WEIGHTED, ScanMethod.QUIET):
+      self.weighted_scan()
+    elif self.method == ScanMethod.SHUFFLE:
+      self.shuffle_scan()
 
   # Private methods
   def linear_scan(self):
@@ -269,6 +427,24 @@ class RadioScanner:
     self.radio.set_freq(self.freq)
   
   def random_scan(self):
-    self.freq = random.randint(self.min_scan_freq, self.max_scan_freq)
+    lo = self.get_freq_index(self.min_scan_freq)
+    hi = self.get_freq_index(self.max_scan_freq)
+    self.freq = self.spectrum.freq(random.randint(lo, hi))
+    self.radio.set_freq(self.freq)
+
+  def weighted_scan(self):
+    # Spread table rebuilds over hops so each hop stays constant-time
+    self.sampler.rebuild_step()
+    self.freq = self.spectrum.freq(self.sampler.sample())
+    self.radio.set_freq(self.freq)
+    
+
+  def shuffle_scan(self):
+    lo = self.get_freq_index(self.min_scan_freq)
+    hi = self.get_freq_index(self.max_scan_freq)
+    index = self.shuffle.next_index(lo, hi, self.step)
+    if index is None:
+      self.linear_scan()
+      return
+    self.freq = self.spectrum.freq(index)
     self.radio.set_freq(self.freq)
-    
\ No newline at end of file
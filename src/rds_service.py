@@ -0,0 +1,230 @@
+from tinkeringtech_rda5807m import (
+    RADIO_REG_RA,
+    RADIO_REG_RA_NR,
+    RADIO_REG_RA_RDS,
+    RADIO_REG_RA_STC,
+    RADIO_REG_RB,
+    RADIO_REG_RB_BLER,
+    RADIO_REG_RDSA,
+    RADIO_REG_RDSB,
+    RADIO_REG_RDSC,
+    RADIO_REG_RDSD,
+)
+
+# The chip latches a new group every 87.6 ms and overwrites unread ones
+RDS_GROUP_PERIOD = 1.0 / 11.4
+
+
+class StationInfo:
+    """What RDS has told us about the station on one frequency."""
+
+    __slots__ = ("freq", "pi", "ps", "last_seen", "used")
+
+    def __init__(self, freq: int) -> None:
+        self.freq = freq
+        self.pi = 0
+        self.ps = ""
+        self.last_seen = 0.0  # monotonic time of the last decoded group
+        self.used = 0  # LRU tick
+
+
+class RdsService:
+    """Collects RDS groups for the tuned channel and remembers stations.
+
+    ``update()`` reads the radio status block (or reuses a snapshot taken
+    within ``poll_interval`` by the scanner) and only decodes when the RDSR
+    flag is set, the tune has completed and the chip is still on the
+    channel we were told about; a background refresh excursion elsewhere is
+    ignored. Each snapshot is decoded at most once.
+
+    The PI code (once seen in two consecutive groups) and the confirmed
+    service name are kept in a bounded LRU ``cache`` keyed by frequency, so
+    ``on_tune()`` can hand the UI and sidecar a revisited station's
+    identity straight away. ``listeners`` are called with the
+    :class:`StationInfo` (or None) whenever the current identity changes.
+    """
+
+    def __init__(
+        self,
+        radio,
+        parser=None,
+        *,
+        cache_size: int = 32,
+        poll_interval: float = RDS_GROUP_PERIOD / 2,
+        idle_interval: float = 0.5,
+    ) -> None:
+        self.radio = radio
+        self.parser = parser or radio.rds_parser
+        self.parser.attach_service_name_callback(self._on_service_name)
+        self.cache_size = cache_size
+        self.poll_interval = poll_interval
+        self.idle_interval = idle_interval
+        self.enabled = True
+
+        self.cache = {}  # freq -> StationInfo
+        self.current = None  # StationInfo of the tuned station, once known
+        self.freq = None
+        self._channel = -1
+        self._candidate_pi = 0
+        self._seen_status = None
+        self._next_poll = 0.0
+        self._tick = 0
+        # Bumped when a cached PI code or name changes, e.g. for persistence
+        self.version = 0
+        self.listeners = []  # callables(StationInfo or None)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.polls = 0
+        self.groups = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def on_tune(self, freq: int) -> None:
+        """The scanner moved to ``freq``; start over and recall the cache."""
+        if freq == self.freq:
+            return
+        self.freq = freq
+        self._channel = (freq - self.radio.freq_low) // self.radio.freq_steps
+        self._candidate_pi = 0
+        self._seen_status = None
+        self.parser.init()
+        info = self.cache.get(freq)
+        if info is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._touch(info)
+        self._set_current(info)
+
+    def remember(self, freq: int, pi: int, ps: str, last_seen: float) -> None:
+        """Seed the cache with a station known from elsewhere (e.g. an atlas)."""
+        info = self.cache.get(freq)
+        if info is not None and info.last_seen >= last_seen:
+            return
+        info = self._entry(freq)
+        info.pi = pi
+        info.ps = ps
+        info.last_seen = last_seen
+        self.version += 1
+
+    def lookup(self, freq: int):
+        """Cached StationInfo for ``freq``, or None."""
+        return self.cache.get(freq)
+
+    def next_deadline(self, now):
+        if not self.enabled or self.freq is None:
+            return now + self.idle_interval
+        return max(now, self._next_poll)
+
+    def update(self, now) -> None:
+        if not self.enabled or self.freq is None:
+            return
+        self._next_poll = now + self.poll_interval
+        radio = self.radio
+        radio.read_status(self.poll_interval)
+        if radio.status_time == self._seen_status:
+            return  # snapshot already handled
+        self._seen_status = radio.status_time
+        self.polls += 1
+
+        regs = radio.registers
+        ra = regs[RADIO_REG_RA]
+        if not ra & RADIO_REG_RA_RDS or not ra & RADIO_REG_RA_STC:
+            return
+        if ra & RADIO_REG_RA_NR != self._channel:
+            return  # tuned elsewhere for a refresh excursion
+
+        self.groups += 1
+        self.parser.process_data(
+            regs[RADIO_REG_RDSA],
+            regs[RADIO_REG_RDSB],
+            regs[RADIO_REG_RDSC],
+            regs[RADIO_REG_RDSD],
+            regs[RADIO_REG_RB] & RADIO_REG_RB_BLER,
+        )
+        self._on_group(now)
+
+    def payload_into(self, payload):
+        """Add the tuned station's PI code and name to a sidecar payload dict."""
+        info = self.current
+        payload["rds_pi"] = info.pi if info else 0
+        payload["rds_ps"] = info.ps if info else ""
+        return payload
+
+    def stats(self):
+        return {
+            "polls": self.polls,
+            "groups": self.groups,
+            "cached": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "decoder": self.parser.stats(),
+        }
+
+    # Private methods
+    def _on_group(self, now) -> None:
+        pi = self.parser.pi
+        if not pi:
+            return
+        info = self.current
+        if info is not None and info.pi == pi:
+            info.last_seen = now
+            return
+        if pi != self._candidate_pi:
+            # A single group may be a misdecode; wait for it to repeat
+            self._candidate_pi = pi
+            return
+
+        # Confirmed a new (or different) station on this frequency
+        info = self._entry(self.freq)
+        if info.pi != pi:
+            info.pi = pi
+            info.ps = ""
+            self.version += 1
+        info.last_seen = now
+        self._set_current(info)
+
+    def _on_service_name(self, name) -> None:
+        info = self.current
+        name = name.rstrip()
+        if info is None or not name or info.ps == name:
+            return
+        info.ps = name
+        self.version += 1
+        self._notify()
+
+    def _entry(self, freq: int) -> StationInfo:
+        info = self.cache.get(freq)
+        if info is None:
+            if len(self.cache) >= self.cache_size:
+                self._evict()
+            info = StationInfo(freq)
+            self.cache[freq] = info
+        self._touch(info)
+        return info
+
+    def _evict(self) -> None:
+        oldest = None
+        for info in self.cache.values():
+            if info.freq != self.freq and (oldest is None or info.used < oldest.used):
+                oldest = info
+        if oldest is not None:
+            del self.cache[oldest.freq]
+            self.evictions += 1
+
+    def _touch(self, info: StationInfo) -> None:
+        self._tick += 1
+        info.used = self._tick
+
+    def _set_current(self, info) -> None:
+        if info is self.current:
+            return
+        self.current = info
+        self._notify()
+
+    def _notify(self) -> None:
+        for listener in self.listeners:
+            listener(self.current)
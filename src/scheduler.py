@@ -0,0 +1,195 @@
+import time
+
+
+class ScheduledTask:
+    """Bookkeeping for one service registered with the :class:`Scheduler`.
+
+    A task runs ``callback(now)`` whenever its deadline passes. The next
+    deadline comes from ``next_deadline(now)`` when the service can predict
+    its own work (e.g. the next scan hop), otherwise from a fixed ``period``.
+    A run counts as an overrun when it starts, or runs for, longer than
+    ``tolerance`` past its deadline (defaults to the period, else 5 ms).
+    """
+
+    def __init__(self, name, callback, *, period=None, next_deadline=None, tolerance=None) -> None:
+        if period is None and next_deadline is None:
+            raise ValueError("Task needs a period or a next_deadline hint.")
+
+        self.name = name
+        self.callback = callback
+        self.period = period
+        self.next_deadline = next_deadline
+        self.enabled = True
+        self.deadline = 0.0
+        if tolerance is None:
+            tolerance = period if period is not None else 0.005
+        self.tolerance = tolerance
+
+        # Timing statistics (seconds)
+        self.runs = 0
+        self.overruns = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def schedule_next(self, now: float) -> None:
+        """Compute the deadline following a run that finished at ``now``."""
+        if self.next_deadline is not None:
+            self.deadline = self.next_deadline(now)
+            return
+
+        self.deadline += self.period
+        if self.deadline <= now:
+            # Fell a whole period behind; resync instead of bursting.
+            self.deadline = now + self.period
+
+    def record(self, started: float, finished: float) -> None:
+        """Update jitter/overrun counters for a run."""
+        jitter = started - self.deadline
+        if jitter < 0.0:
+            jitter = 0.0
+        self.runs += 1
+        self.last_jitter = jitter
+        self.total_jitter += jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+        duration = finished - started
+        self.last_duration = duration
+        if duration > self.max_duration:
+            self.max_duration = duration
+
+        if jitter > self.tolerance or duration > self.tolerance:
+            self.overruns += 1
+
+    def reset_stats(self) -> None:
+        self.runs = 0
+        self.overruns = 0
+        self.last_jitter = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+
+    def stats(self):
+        mean_jitter = self.total_jitter / self.runs if self.runs else 0.0
+        return {
+            "name": self.name,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "last_jitter_s": self.last_jitter,
+            "max_jitter_s": self.max_jitter,
+            "mean_jitter_s": mean_jitter,
+            "last_duration_s": self.last_duration,
+            "max_duration_s": self.max_duration,
+        }
+
+
+class Scheduler:
+    """Deadline-driven cooperative scheduler for device services.
+
+    Instead of polling every service at a fixed rate, the scheduler sleeps
+    until the earliest task deadline, runs every task that is due, and
+    recomputes deadlines.
+    """
+
+    def __init__(self, *, min_sleep: float = 0.0, debug: bool = False) -> None:
+        self.min_sleep = min_sleep
+        self.debug = debug
+        self.tasks = []
+        self._running = False
+
+    def add_task(self, name, callback, *, period=None, next_deadline=None, tolerance=None, start=None):
+        """Register ``callback(now)`` and return its :class:`ScheduledTask`."""
+        task = ScheduledTask(
+            name,
+            callback,
+            period=period,
+            next_deadline=next_deadline,
+            tolerance=tolerance,
+        )
+        task.deadline = time.monotonic() if start is None else start
+        self.tasks.append(task)
+        if self.debug:
+            print("Scheduler: added task", name)
+        return task
+
+    def remove_task(self, name) -> None:
+        self.tasks = [task for task in self.tasks if task.name != name]
+
+    def get_task(self, name):
+        for task in self.tasks:
+            if task.name == name:
+                return task
+        return None
+
+    def next_deadline(self):
+        """Return the earliest deadline among enabled tasks, or None."""
+        earliest = None
+        for task in self.tasks:
+            if task.enabled and (earliest is None or task.deadline < earliest):
+                earliest = task.deadline
+        return earliest
+
+    def run_due(self, now: float) -> int:
+        """Run every enabled task whose deadline is at or before ``now``."""
+        ran = 0
+        for task in self.tasks:
+            if not task.enabled or task.deadline > now:
+                continue
+            started = time.monotonic()
+            task.callback(started)
+            finished = time.monotonic()
+            task.record(started, finished)
+            task.schedule_next(finished)
+            ran += 1
+        return ran
+
+    def sleep_time(self, now: float) -> float:
+        """Seconds until the earliest deadline (never negative)."""
+        earliest = self.next_deadline()
+        if earliest is None:
+            return self.min_sleep
+        delay = earliest - now
+        if delay < self.min_sleep:
+            delay = self.min_sleep
+        return delay
+
+    async def run(self) -> None:
+        """Run tasks forever, yielding to asyncio until the next deadline."""
+        import asyncio
+
+        self._running = True
+        while self._running:
+            self.run_due(time.monotonic())
+            await asyncio.sleep(self.sleep_time(time.monotonic()))
+
+    def run_blocking(self) -> None:
+        """Fallback loop for builds without asyncio."""
+        self._running = True
+        while self._running:
+            self.run_due(time.monotonic())
+            delay = self.sleep_time(time.monotonic())
+            if delay > 0.0:
+                time.sleep(delay)
+
+    def stop(self) -> None:
+        self._running = False
+
+    def report(self):
+        """Return per-task timing statistics."""
+        return [task.stats() for task in self.tasks]
+
+    def print_report(self) -> None:
+        for stats in self.report():
+            print(
+                "Scheduler:",
+                stats["name"],
+                "runs =", stats["runs"],
+                "overruns =", stats["overruns"],
+                "max jitter =", stats["max_jitter_s"],
+                "s, mean jitter =", stats["mean_jitter_s"],
+                "s",
+            )
@@ -0,0 +1,86 @@
+import struct
+
+MAGIC = b"SPKI"
+VERSION = 1
+_PREAMBLE = "<4sBB"  # magic, version, record size
+HEADER_SIZE = struct.calcsize(_PREAMBLE)
+RECORD_FORMAT = "<III"  # elapsed ms, audio byte offset, sidecar byte offset
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+
+class SessionIndexWriter:
+    """Sparse time index written alongside a session.
+
+    Every ``interval`` seconds one fixed-size record maps the elapsed time to
+    the byte offset in ``session.wav`` and in the data sidecar at that
+    moment. Records are sorted by time, so readers can binary-search them.
+    The file is flushed every ``sync_interval`` seconds so a crash loses at
+    most that much of the index.
+    """
+
+    def __init__(self, file, *, interval: float = 1.0, sync_interval: float = 5.0) -> None:
+        self.file = file
+        self.interval = interval
+        self.sync_interval = sync_interval
+        self.records = 0
+        self._next_t = 0.0
+        self._last_sync = 0.0
+        self._buf = bytearray(RECORD_SIZE)
+        file.write(struct.pack(_PREAMBLE, MAGIC, VERSION, RECORD_SIZE))
+
+    def due(self, elapsed: float) -> bool:
+        return elapsed >= self._next_t
+
+    def add(self, elapsed: float, audio_offset: int, sidecar_offset: int) -> None:
+        struct.pack_into(RECORD_FORMAT, self._buf, 0, int(elapsed * 1000), audio_offset, sidecar_offset)
+        self.file.write(self._buf)
+        self.records += 1
+        if elapsed - self._last_sync >= self.sync_interval:
+            self.file.flush()
+            self._last_sync = elapsed
+        # Stay on the interval grid even if a call arrives late
+        while self._next_t <= elapsed:
+            self._next_t += self.interval
+
+
+class SessionIndexReader:
+    """Binary-search lookups in a ``session_index.bin`` file.
+
+    Only the header and the O(log n) probed records are read from disk.
+    """
+
+    def __init__(self, file) -> None:
+        self.file = file
+        preamble = file.read(HEADER_SIZE)
+        if len(preamble) < HEADER_SIZE:
+            raise ValueError("Truncated session index header.")
+        magic, version, record_size = struct.unpack(_PREAMBLE, preamble)
+        if magic != MAGIC or record_size != RECORD_SIZE:
+            raise ValueError("Not a session index file.")
+        if version != VERSION:
+            raise ValueError("Unsupported session index version {}.".format(version))
+        size = file.seek(0, 2)
+        self.count = (size - HEADER_SIZE) // RECORD_SIZE
+
+    def record(self, i: int):
+        """Return ``(t_seconds, audio_offset, sidecar_offset)`` for record ``i``."""
+        self.file.seek(HEADER_SIZE + i * RECORD_SIZE)
+        t_ms, audio_offset, sidecar_offset = struct.unpack(RECORD_FORMAT, self.file.read(RECORD_SIZE))
+        return t_ms / 1000, audio_offset, sidecar_offset
+
+    def lookup(self, t: float):
+        """Latest record at or before ``t`` (the first record if ``t`` is earlier)."""
+        if self.count == 0:
+            return None
+        target = int(t * 1000)
+        lo = 0
+        hi = self.count - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            self.file.seek(HEADER_SIZE + mid * RECORD_SIZE)
+            t_ms = struct.unpack("<I", self.file.read(4))[0]
+            if t_ms <= target:
+                lo = mid
+            else:
+                hi = mid - 1
+        return self.record(lo)
@@ -6,6 +6,16 @@ import time
 import adafruit_sdcard
 import storage
 
+from audio_buffer import AudioRingBuffer, SD_BLOCK_SIZE
+from wav_writer import HEADER_SIZE, WavWriter, build_cue_chunks, recover_wav
+from sidecar import BinarySidecarWriter, DEFAULT_FIELDS
+from session_index import SessionIndexWriter
+
+
+class SidecarFormat:
+    JSONL = "jsonl"
+    BINARY = "binary"
+
 
 class SessionManagerError(Exception):
     """Raised when session storage operations fail."""
@@ -22,6 +32,24 @@ class SessionManager:
         mount_point="/sd",
         sessions_dir_name="sessions",
         debug=True,
+        audio_buffer_size=16384,
+        audio_block_size=SD_BLOCK_SIZE,
+        audio_flush_bytes=4096,
+        audio_flush_interval=1.0,
+        audio_sync_interval=5.0,
+        audio_sample_rate=16000,
+        audio_channels=2,
+        audio_bits=16,
+        audio_prealloc_bytes=1 << 20,
+        audio_checkpoint_interval=5.0,
+        sidecar_format=SidecarFormat.JSONL,
+        sidecar_fields=DEFAULT_FIELDS,
+        sidecar_group_bytes=4096,
+        sidecar_commit_interval=2.0,
+        index_interval=1.0,
+        index_sync_interval=5.0,
+        max_markers=256,
+        reserved_markers=32,
     ) -> None:
         self.spi = spi
         self.cs = cs
@@ -44,6 +72,41 @@ class SessionManager:
         self._audio_bytes = 0
         self._serial = 0
 
+        # Audio is staged in a preallocated ring and written in whole blocks
+        self._audio_ring = AudioRingBuffer(
+            audio_buffer_size,
+            block_size=audio_block_size,
+            flush_bytes=audio_flush_bytes,
+            flush_interval=audio_flush_interval,
+        )
+        self.audio_sync_interval = audio_sync_interval
+        self._last_audio_sync = 0.0
+
+        self.audio_sample_rate = audio_sample_rate
+        self.audio_channels = audio_channels
+        self.audio_bits = audio_bits
+        self.audio_prealloc_bytes = audio_prealloc_bytes
+        self.audio_checkpoint_interval = audio_checkpoint_interval
+        self._wav = None
+
+        self.sidecar_format = sidecar_format
+        self.sidecar_fields = sidecar_fields
+        self.sidecar_group_bytes = sidecar_group_bytes
+        self.sidecar_commit_interval = sidecar_commit_interval
+        self._sidecar = None
+        self._data_bytes = 0
+
+        # Seek index and WAV cue markers
+        self.index_interval = index_interval
+        self.index_sync_interval = index_sync_interval
+        self.max_markers = max_markers
+        # Kept free of routine markers (e.g. per-hop frequencies) for events
+        self.reserved_markers = reserved_markers
+        self._index_file = None
+        self._index = None
+        self._markers = []
+        self.markers_dropped = 0
+
     # -------------------------------------------------------------------------
     # SD card management
     # -------------------------------------------------------------------------
@@ -109,8 +172,12 @@ class SessionManager:
         session_id = session_id or self._generate_session_id()
         session_path = self._prepare_session_dir(root, session_id)
 
+        binary_sidecar = self.sidecar_format == SidecarFormat.BINARY
         audio_path = session_path + "/session.wav"
-        data_path = session_path + "/session_data.jsonl"
+        if binary_sidecar:
+            data_path = session_path + "/session_data.bin"
+        else:
+            data_path = session_path + "/session_data.jsonl"
 
         try:
             audio_file = open(audio_path, "wb")
@@ -118,21 +185,68 @@ class SessionManager:
             raise SessionManagerError("Unable to open audio file: {}".format(exc))
 
         try:
-            data_file = open(data_path, "a")
+            wav = WavWriter(
+                audio_file,
+                sample_rate=self.audio_sample_rate,
+                channels=self.audio_channels,
+                bits=self.audio_bits,
+                prealloc_bytes=self.audio_prealloc_bytes,
+                checkpoint_interval=self.audio_checkpoint_interval,
+            )
+        except OSError as exc:
+            audio_file.close()
+            raise SessionManagerError("Unable to write WAV header: {}".format(exc))
+
+        sidecar = None
+        try:
+            if binary_sidecar:
+                data_file = open(data_path, "wb")
+                sidecar = BinarySidecarWriter(
+                    data_file,
+                    self.sidecar_fields,
+                    group_bytes=self.sidecar_group_bytes,
+                    commit_interval=self.sidecar_commit_interval,
+                )
+            else:
+                data_file = open(data_path, "a")
         except OSError as exc:
             audio_file.close()
             raise SessionManagerError("Unable to open data file: {}".format(exc))
 
+        try:
+            index_file = open(session_path + "/session_index.bin", "wb")
+            index = SessionIndexWriter(
+                index_file,
+                interval=self.index_interval,
+                sync_interval=self.index_sync_interval,
+            )
+        except OSError as exc:
+            audio_file.close()
+            data_file.close()
+            raise SessionManagerError("Unable to open index file: {}".format(exc))
+
         self.session_active = True
         self.session_id = session_id
         self.session_path = session_path
         self._audio_path = audio_path
         self._data_path = data_path
         self._audio_file = audio_file
+        self._wav = wav
         self._data_file = data_file
+        self._sidecar = sidecar
+        self._index_file = index_file
+        self._index = index
+        self._markers = []
+        self.markers_dropped = 0
         self._start_ticks = time.monotonic()
         self._frames_written = 0
         self._audio_bytes = 0
+        self._data_bytes = sidecar.header_size if sidecar else 0
+        self._audio_ring.reset()
+        self._audio_ring.reset_stats()
+        self._last_audio_sync = self._start_ticks
+
+        self.add_marker("record_start")
 
         if self.debug:
             print("SessionManager: started session", session_id)
@@ -144,18 +258,30 @@ class SessionManager:
         if not self.session_active:
             return
 
+        self.add_marker("record_stop" if reason is None else "record_stop:{}".format(reason), force=True)
+
         summary = {
             "session_id": self.session_id,
             "audio_bytes": self._audio_bytes,
             "frames_written": self._frames_written,
             "duration_s": None,
             "reason": reason,
+            "audio_buffer": None,
+            "markers": len(self._markers),
         }
 
         if self._start_ticks is not None:
             summary["duration_s"] = time.monotonic() - self._start_ticks
 
         if self._audio_file:
+            try:
+                self._audio_ring.drain(self._wav, force=True)
+                self._wav.finalize(build_cue_chunks(self._markers))
+            except OSError as exc:
+                if self.debug:
+                    print("SessionManager: audio finalize failed during stop:", exc)
+            summary["audio_buffer"] = self._audio_ring.stats()
+            summary["audio_data_bytes"] = self._wav.data_bytes
             try:
                 self._audio_file.flush()
             except OSError as exc:
@@ -167,8 +293,15 @@ class SessionManager:
                 if self.debug:
                     print("SessionManager: audio close failed during stop:", exc)
         self._audio_file = None
+        self._wav = None
 
         if self._data_file:
+            if self._sidecar:
+                try:
+                    self._sidecar.commit()
+                except OSError as exc:
+                    if self.debug:
+                        print("SessionManager: sidecar commit failed during stop:", exc)
             try:
                 self._data_file.flush()
             except OSError as exc:
@@ -180,6 +313,17 @@ class SessionManager:
                 if self.debug:
                     print("SessionManager: data close failed during stop:", exc)
         self._data_file = None
+        self._sidecar = None
+
+        if self._index_file:
+            try:
+                self._index_file.close()
+            except OSError as exc:
+                if self.debug:
+                    print("SessionManager: index close failed during stop:", exc)
+        self._index_file = None
+        self._index = None
+        self._markers = []
 
         self._write_summary(summary)
 
@@ -199,11 +343,32 @@ class SessionManager:
     # Data append helpers
     # -------------------------------------------------------------------------
     def append_data_frame(self, payload) -> bool:
-        """Append a JSON-serializable payload with a relative timestamp."""
+        """Append a JSON-serializable payload with a relative timestamp.
+
+        In binary sidecar mode the payload must be a flat dict; keys named in
+        the sidecar schema are packed and everything else is ignored.
+        """
         if not self.session_active or not self._data_file:
             return False
 
-        elapsed = time.monotonic() - self._start_ticks if self._start_ticks else 0.0
+        now = time.monotonic()
+        elapsed = now - self._start_ticks if self._start_ticks else 0.0
+
+        if self._sidecar:
+            if not isinstance(payload, dict):
+                raise SessionManagerError("Binary sidecar payload must be a dict.")
+            try:
+                self._sidecar.append(elapsed, payload, now)
+            except (TypeError, ValueError, OverflowError) as exc:
+                raise SessionManagerError("Sensor payload not packable: {}".format(exc))
+            except OSError as exc:
+                self._handle_io_error(exc)
+                return False
+            self._frames_written += 1
+            self._data_bytes = self._sidecar.offset
+            self._update_index(elapsed)
+            return True
+
         record = {"t": elapsed, "data": payload}
 
         try:
@@ -216,40 +381,92 @@ class SessionManager:
             self._data_file.write("\n")
             self._data_file.flush()
             self._frames_written += 1
+            # json.dumps output is ASCII, so characters == bytes
+            self._data_bytes += len(line) + 1
+            self._update_index(elapsed)
             return True
         except OSError as exc:
             self._handle_io_error(exc)
             return False
 
     def append_audio_chunk(self, chunk) -> bool:
-        """Write raw audio bytes for the active session."""
+        """Queue audio bytes for the active session.
+
+        The chunk is copied into the audio ring buffer (memoryviews are not
+        converted to ``bytes`` first) and the ring is drained to the card in
+        whole blocks according to the flush policy. Returns False if the
+        chunk was dropped because the ring was full or the card failed.
+        """
         if not self.session_active or not self._audio_file:
             return False
 
         if not chunk:
             return True
 
-        if isinstance(chunk, memoryview):
-            chunk = chunk.tobytes()
-
-        if not isinstance(chunk, (bytes, bytearray)):
+        if not isinstance(chunk, (bytes, bytearray, memoryview)):
             raise SessionManagerError("Audio chunk must be bytes-like.")
 
-        try:
-            written = self._audio_file.write(chunk)
-        except OSError as exc:
-            self._handle_io_error(exc)
+        queued = self._audio_ring.write(chunk)
+        self._audio_bytes += queued
+        if self._start_ticks is not None:
+            self._update_index(time.monotonic() - self._start_ticks)
+
+        if not self.drain_audio():
             return False
+        return queued > 0
+
+    def drain_audio(self, now=None, force=False) -> bool:
+        """Write buffered audio to the card if the flush policy says so."""
+        if not self.session_active or not self._audio_file:
+            return False
+
+        if now is None:
+            now = time.monotonic()
 
         try:
-            self._audio_file.flush()
+            self._audio_ring.drain(self._wav, now, force)
+            if not self._wav.maybe_checkpoint(now):
+                if now - self._last_audio_sync >= self.audio_sync_interval:
+                    self._audio_file.flush()
+                    self._last_audio_sync = now
         except OSError as exc:
             self._handle_io_error(exc)
             return False
+        return True
 
-        self._audio_bytes += written if written else len(chunk)
+    def audio_buffer_stats(self):
+        """High-water mark, overrun and throughput counters for the audio ring."""
+        return self._audio_ring.stats()
+
+    def add_marker(self, label, audio_offset=None, *, routine=False, force=False) -> bool:
+        """Mark the current audio position (e.g. a frequency change).
+
+        Markers become WAV ``cue `` points with ``labl`` text when the
+        session stops. ``routine`` markers, such as one per radio hop, stop
+        ``reserved_markers`` short of ``max_markers`` so event markers (PTT,
+        record start/stop) still fit; ``force`` ignores the limit. Returns
+        False if the session is inactive or the marker limit was reached.
+        """
+        if not self.session_active:
+            return False
+        limit = self.max_markers - self.reserved_markers if routine else self.max_markers
+        if len(self._markers) >= limit and not force:
+            self.markers_dropped += 1
+            return False
+
+        if audio_offset is None:
+            audio_offset = self._audio_bytes
+        block_align = self.audio_channels * self.audio_bits // 8
+        self._markers.append((audio_offset // block_align, label))
         return True
 
+    def recover_audio(self, session_path) -> int:
+        """Repair ``session.wav`` in a session that was cut off mid-recording."""
+        try:
+            return recover_wav(session_path + "/session.wav")
+        except (OSError, ValueError) as exc:
+            raise SessionManagerError("Unable to recover audio: {}".format(exc))
+
     # -------------------------------------------------------------------------
     # Internal helpers
     # -------------------------------------------------------------------------
@@ -265,6 +482,16 @@ class SessionManager:
         self.sdcard = None
         self.vfs = None
 
+    def _update_index(self, elapsed) -> None:
+        """Append a seek index record if the index interval has passed."""
+        index = self._index
+        if not index or not index.due(elapsed):
+            return
+        try:
+            index.add(elapsed, HEADER_SIZE + self._audio_bytes, self._data_bytes)
+        except OSError as exc:
+            self._handle_io_error(exc)
+
     def _ensure_sessions_dir(self) -> str:
         """Create the root sessions directory if it does not exist."""
         root = "{}/{}".format(self.mount_point, self.sessions_dir_name)
@@ -0,0 +1,184 @@
+import json
+import math
+import struct
+import time
+
+MAGIC = b"SPKB"
+VERSION = 1
+_PREAMBLE = "<4sBH"  # magic, version, schema length
+_PREAMBLE_SIZE = struct.calcsize(_PREAMBLE)
+_TIME_FMT = "I"  # elapsed milliseconds
+# What a bad value can raise while packing; struct.error only exists on CPython
+_PACK_ERRORS = (TypeError, ValueError, OverflowError, getattr(struct, "error", ValueError))
+# Ranges of the integer struct codes; values are clamped into them
+_INT_LIMITS = {
+    "b": (-0x80, 0x7F),
+    "B": (0, 0xFF),
+    "h": (-0x8000, 0x7FFF),
+    "H": (0, 0xFFFF),
+    "i": (-0x80000000, 0x7FFFFFFF),
+    "I": (0, 0xFFFFFFFF),
+    "l": (-0x80000000, 0x7FFFFFFF),
+    "L": (0, 0xFFFFFFFF),
+}
+
+# Default record layout: flat payload keys and their struct codes
+DEFAULT_FIELDS = (
+    ("emf_uT", "f"),
+    ("emf_level", "B"),
+    ("emf_mains_uT", "f"),
+    ("emf_mains_hz", "B"),
+    ("freq", "H"),
+    ("rssi", "B"),
+    ("rds_pi", "H"),
+    ("radio_rms", "H"),
+    ("mic_rms", "H"),
+    ("clips", "H"),
+)
+
+
+class BinarySidecarWriter:
+    """Fixed-layout, struct-packed alternative to ``session_data.jsonl``.
+
+    The file starts with a small self-describing header: magic, version and
+    a JSON schema listing each field's name and struct code. Each record is
+    the elapsed time in milliseconds followed by the schema fields, packed
+    into a preallocated group buffer. The group is committed to the file
+    when it cannot hold another record or ``commit_interval`` has passed.
+    Missing float fields are written as NaN and missing integers as 0.
+    Integer fields take ``int()`` of the value, clamped to the field's
+    range; NaN and infinities become 0. A value that cannot be packed
+    raises ValueError.
+    """
+
+    def __init__(
+        self,
+        file,
+        fields=DEFAULT_FIELDS,
+        *,
+        group_bytes: int = 4096,
+        commit_interval: float = 2.0,
+    ) -> None:
+        self.file = file
+        self.fields = tuple(fields)
+        self.record_format = "<" + _TIME_FMT + "".join(fmt for _, fmt in self.fields)
+        self.record_size = struct.calcsize(self.record_format)
+        if group_bytes < self.record_size:
+            group_bytes = self.record_size
+        self.commit_interval = commit_interval
+
+        self._group = bytearray(group_bytes - group_bytes % self.record_size)
+        self._group_mv = memoryview(self._group)
+        self._fill = 0
+        self._values = [0] * (len(self.fields) + 1)
+        self._defaults = [float("nan") if fmt in "fd" else 0 for _, fmt in self.fields]
+        self._limits = [_INT_LIMITS.get(fmt) for _, fmt in self.fields]
+        self._last_commit = time.monotonic()
+
+        self.records = 0
+        self.commits = 0
+        self.bytes_written = 0
+        self.header_size = self._write_header()
+
+    def append(self, elapsed: float, payload, now=None) -> None:
+        """Pack one record; commits the group when a threshold is reached."""
+        values = self._values
+        values[0] = int(elapsed * 1000)
+        defaults = self._defaults
+        limits = self._limits
+        i = 1
+        try:
+            for name, _ in self.fields:
+                value = payload.get(name)
+                if value is None:
+                    value = defaults[i - 1]
+                elif limits[i - 1] is not None:
+                    lo, hi = limits[i - 1]
+                    value = int(value) if math.isfinite(value) else 0
+                    if value < lo:
+                        value = lo
+                    elif value > hi:
+                        value = hi
+                values[i] = value
+                i += 1
+            struct.pack_into(self.record_format, self._group, self._fill, *values)
+        except _PACK_ERRORS as exc:
+            # e.g. a string in a numeric field; callers handle ValueError
+            raise ValueError(str(exc))
+        self._fill += self.record_size
+        self.records += 1
+
+        if now is None:
+            now = time.monotonic()
+        if self._fill + self.record_size > len(self._group) or now - self._last_commit >= self.commit_interval:
+            self.commit(now)
+
+    def commit(self, now=None) -> int:
+        """Write the buffered group to the file."""
+        fill = self._fill
+        if fill:
+            self.file.write(self._group_mv[:fill])
+            self.file.flush()
+            self.bytes_written += fill
+            self.commits += 1
+            self._fill = 0
+        self._last_commit = time.monotonic() if now is None else now
+        return fill
+
+    @property
+    def offset(self) -> int:
+        """Byte offset in the file the next record will occupy."""
+        return self.header_size + self.bytes_written + self._fill
+
+    # Private methods
+    def _write_header(self) -> int:
+        schema = json.dumps(
+            {
+                "time": ["t_ms", _TIME_FMT],
+                "fields": [[name, fmt] for name, fmt in self.fields],
+                "record": self.record_format,
+            }
+        ).encode()
+        self.file.write(struct.pack(_PREAMBLE, MAGIC, VERSION, len(schema)))
+        self.file.write(schema)
+        self.file.flush()
+        return _PREAMBLE_SIZE + len(schema)
+
+
+def read_schema(file):
+    """Read the sidecar header; returns the schema dict with sizes added."""
+    preamble = file.read(_PREAMBLE_SIZE)
+    if len(preamble) < _PREAMBLE_SIZE:
+        raise ValueError("Truncated sidecar header.")
+    magic, version, schema_len = struct.unpack(_PREAMBLE, preamble)
+    if magic != MAGIC:
+        raise ValueError("Not a binary sidecar file.")
+    if version != VERSION:
+        raise ValueError("Unsupported sidecar version {}.".format(version))
+    schema = json.loads(file.read(schema_len))
+    schema["record_size"] = struct.calcsize(schema["record"])
+    schema["header_size"] = _PREAMBLE_SIZE + schema_len
+    return schema
+
+
+def iter_records(file, schema=None, chunk_records: int = 256):
+    """Yield ``(t_seconds, payload_dict)`` for each record in a sidecar file."""
+    if schema is None:
+        schema = read_schema(file)
+    record_format = schema["record"]
+    record_size = schema["record_size"]
+    names = [name for name, _ in schema["fields"]]
+
+    while True:
+        block = file.read(record_size * chunk_records)
+        if not block:
+            return
+        usable = len(block) - len(block) % record_size  # drop a torn last record
+        for offset in range(0, usable, record_size):
+            values = struct.unpack_from(record_format, block, offset)
+            payload = {}
+            for i, name in enumerate(names):
+                value = values[i + 1]
+                if value == value:  # NaN marks a missing value
+                    payload[name] = value
+            yield values[0] / 1000, payload
@@ -0,0 +1,130 @@
+import time
+from array import array
+
+# Tick value for channels that have never been measured
+NEVER = -0x7FFFFFFF
+
+
+class SpectrumMap:
+    """Per-channel RSSI map backed by preallocated arrays.
+
+    Channels are indexed the same way as the radio's channel number:
+    ``(freq - freq_low) // spacing``. For every channel the map stores the
+    latest RSSI, the tick (milliseconds since ``epoch``) it was measured and
+    how many samples it has seen. Updates are O(1) and allocation-free.
+    """
+
+    def __init__(self, freq_low: int, freq_high: int, spacing: int = 10, *, epoch=None) -> None:
+        self.freq_low = freq_low
+        self.freq_high = freq_high
+        self.spacing = spacing
+        self.size = (freq_high - freq_low) // spacing + 1
+        self.epoch = time.monotonic() if epoch is None else epoch
+
+        self.rssi = bytearray(self.size)
+        self.ticks = array("l", [NEVER] * self.size)
+        self.samples = array("H", [0] * self.size)
+        # Bumped whenever an RSSI value changes so consumers can cache
+        self.version = 0
+        # Bumped on every measurement, e.g. to know when to persist the map
+        self.updates = 0
+
+    # Indexing helpers
+    def index(self, freq: int) -> int:
+        return (freq - self.freq_low) // self.spacing
+
+    def freq(self, index: int) -> int:
+        return self.freq_low + index * self.spacing
+
+    def tick(self, now: float) -> int:
+        """Convert a monotonic time to a map tick (ms since epoch)."""
+        return int((now - self.epoch) * 1000)
+
+    # Updates
+    def update(self, index: int, rssi: int, now: float) -> None:
+        if rssi != self.rssi[index]:
+            self.rssi[index] = rssi
+            self.version += 1
+        self.ticks[index] = self.tick(now)
+        if self.samples[index] < 0xFFFF:
+            self.samples[index] += 1
+        self.updates += 1
+
+    def update_freq(self, freq: int, rssi: int, now: float) -> None:
+        self.update(self.index(freq), rssi, now)
+
+    def merge(self, index: int, rssi: int, tick: int, samples: int) -> bool:
+        """Adopt an older record (e.g. loaded from disk) unless ours is newer."""
+        if not samples or (self.samples[index] and self.ticks[index] >= tick):
+            return False
+        if rssi != self.rssi[index]:
+            self.rssi[index] = rssi
+            self.version += 1
+        self.ticks[index] = tick
+        self.samples[index] = min(0xFFFF, samples)
+        return True
+
+    def clear(self) -> None:
+        for i in range(self.size):
+            self.rssi[i] = 0
+            self.ticks[i] = NEVER
+            self.samples[i] = 0
+        self.version += 1
+
+    # Queries
+    def measured(self, index: int) -> bool:
+        return self.samples[index] != 0
+
+    def age(self, index: int, now: float):
+        """Seconds since the channel was measured, or None if never."""
+        if not self.samples[index]:
+            return None
+        return (self.tick(now) - self.ticks[index]) / 1000
+
+    def is_stale(self, index: int, now: float, max_age: float) -> bool:
+        if not self.samples[index]:
+            return True
+        return self.tick(now) - self.ticks[index] > max_age * 1000
+
+    def stalest(self, start: int = 0, stop=None) -> int:
+        """Index of the least recently measured channel in [start, stop)."""
+        if stop is None:
+            stop = self.size
+        ticks = self.ticks
+        best = start
+        best_tick = ticks[start]
+        for i in range(start + 1, stop):
+            if ticks[i] < best_tick:
+                best = i
+                best_tick = ticks[i]
+        return best
+
+    def count_stale(self, now: float, max_age: float, start: int = 0, stop=None) -> int:
+        if stop is None:
+            stop = self.size
+        cutoff = self.tick(now) - int(max_age * 1000)
+        ticks = self.ticks
+        count = 0
+        for i in range(start, stop):
+            if ticks[i] < cutoff:
+                count += 1
+        return count
+
+    def decayed_rssi(self, index: int, now: float, half_life: float) -> float:
+        """RSSI discounted by age, halving every ``half_life`` seconds."""
+        if not self.samples[index]:
+            return 0.0
+        age = (self.tick(now) - self.ticks[index]) / 1000
+        return self.rssi[index] * 0.5 ** (age / half_life)
+
+    def unmeasured_freqs(self, start: int = 0, stop=None):
+        """Frequencies of channels that have never been measured."""
+        if stop is None:
+            stop = self.size
+        return [self.freq(i) for i in range(start, stop) if not self.samples[i]]
+
+    def stale_freqs(self, now: float, max_age: float, start: int = 0, stop=None):
+        """Frequencies of channels never measured or older than ``max_age``."""
+        if stop is None:
+            stop = self.size
+        return [self.freq(i) for i in range(start, stop) if self.is_stale(i, now, max_age)]
@@ -0,0 +1,245 @@
+import os
+import struct
+import time
+
+from spectrum_map import NEVER
+
+_MAGIC = b"ATL1"
+_VERSION = 2
+# magic, version, label, freq_low, freq_high, spacing, channels, saved_at,
+# stations, monotonic ms at save, boot counter
+_HEADER = "<4sB16sHHHHIHIH"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_CHANNEL = "<BHI"  # rssi, samples, age in seconds
+_CHANNEL_SIZE = struct.calcsize(_CHANNEL)
+_STATION = "<HH8sI"  # freq, PI code, service name, age in seconds
+_STATION_SIZE = struct.calcsize(_STATION)
+_NEVER_AGE = 0xFFFFFFFF
+
+
+class StationAtlas:
+    """Spectrum map and RDS station cache saved across power cycles.
+
+    One small binary file per location ``label`` (``<directory>/<label>.atl``)
+    holds every channel's RSSI, sample count and age, plus the identities in
+    the :class:`RdsService` cache. ``load()`` reads it in one go at boot and
+    merges it into the live maps, keeping whichever measurement is newer, so
+    the survey only has to re-measure channels whose saved data is stale.
+    ``maybe_save()`` rewrites the file (via a temporary file) when new
+    measurements have arrived and ``save_interval`` has passed.
+
+    Ages are stored relative to the wall clock at save time, together with
+    the monotonic time and a ``boots`` counter. Without an RTC the wall
+    clock restarts at boot. If the monotonic clock is still past the saved
+    value, the file was written earlier in this power session (e.g. before
+    a code reload) and the elapsed time is exact. Otherwise the device was
+    power cycled, ``boots`` goes up and the time since the save is unknown:
+    the data is then treated as ``unknown_age`` seconds older than when it
+    was saved. The default is past the scanner's ``survey_max_age``, so
+    after an unknown gap the survey re-measures every channel; the restored
+    values still seed the map and the RDS cache until it does.
+    """
+
+    def __init__(
+        self,
+        spectrum,
+        rds=None,
+        *,
+        directory: str = "/sd/atlas",
+        label: str = "default",
+        save_interval: float = 60.0,
+        unknown_age: float = 3600.0,
+        debug: bool = False,
+    ) -> None:
+        self.spectrum = spectrum
+        self.rds = rds
+        self.directory = directory
+        self.label = _clean_label(label)
+        self.path = "{}/{}.atl".format(directory, self.label)
+        self.save_interval = save_interval
+        self.unknown_age = unknown_age
+        self.debug = debug
+
+        stations = rds.cache_size if rds is not None else 0
+        self._buffer = bytearray(_HEADER_SIZE + spectrum.size * _CHANNEL_SIZE + stations * _STATION_SIZE)
+        # Anything measured so far has not been saved yet
+        self._saved_updates = 0
+        self._saved_rds = 0
+        self._last_save = time.monotonic()
+        self.loads = 0
+        self.saves = 0
+        self.restored_channels = 0
+        self.restored_stations = 0
+        self.boots = 0  # power cycles of unknown length this atlas went through
+        self.elapsed_known = False
+
+    def load(self, now=None) -> bool:
+        """Merge the saved atlas into the spectrum map and RDS cache."""
+        if now is None:
+            now = time.monotonic()
+        data = None
+        for path in (self.path, self.path + ".tmp"):
+            try:
+                with open(path, "rb") as atlas_file:
+                    data = atlas_file.read()
+                break
+            except OSError:
+                continue
+        if not data or len(data) < _HEADER_SIZE:
+            return False
+
+        (magic, version, _, freq_low, freq_high, spacing, size, saved_at, stations, saved_ms, boots) = struct.unpack_from(
+            _HEADER, data
+        )
+        spectrum = self.spectrum
+        if magic != _MAGIC or version != _VERSION:
+            return False
+        if (freq_low, freq_high, spacing, size) != (spectrum.freq_low, spectrum.freq_high, spectrum.spacing, spectrum.size):
+            return False
+        if len(data) < _HEADER_SIZE + size * _CHANNEL_SIZE + stations * _STATION_SIZE:
+            return False
+
+        wall = int(time.time())
+        if wall >= saved_at:
+            elapsed = wall - saved_at
+            self.elapsed_known = True
+        elif now * 1000 >= saved_ms:
+            # Same power session: the monotonic clock kept running
+            elapsed = now - saved_ms / 1000
+            self.elapsed_known = True
+        else:
+            elapsed = self.unknown_age
+            self.elapsed_known = False
+        self.boots = boots if self.elapsed_known else boots + 1
+        now_tick = spectrum.tick(now)
+        offset = _HEADER_SIZE
+        restored = 0
+        for index in range(size):
+            rssi, samples, age = struct.unpack_from(_CHANNEL, data, offset)
+            offset += _CHANNEL_SIZE
+            if age == _NEVER_AGE:
+                continue
+            tick = max(NEVER + 1, now_tick - int((age + elapsed) * 1000))
+            if spectrum.merge(index, rssi, tick, samples):
+                restored += 1
+
+        restored_stations = 0
+        if self.rds is not None:
+            for _ in range(min(stations, self.rds.cache_size)):
+                freq, pi, ps, age = struct.unpack_from(_STATION, data, offset)
+                offset += _STATION_SIZE
+                self.rds.remember(freq, pi, ps.rstrip(b"\x00 ").decode(), now - age - elapsed)
+                restored_stations += 1
+
+        self.restored_channels = restored
+        self.restored_stations = restored_stations
+        self._saved_updates = spectrum.updates
+        self._saved_rds = self.rds.version if self.rds is not None else 0
+        self.loads += 1
+        if self.debug:
+            print("StationAtlas: restored", restored, "channels and", restored_stations, "stations from", self.path)
+            if not self.elapsed_known:
+                print("StationAtlas: time since the save is unknown; treating it as", self.unknown_age, "s")
+        return True
+
+    def dirty(self) -> bool:
+        if self.spectrum.updates != self._saved_updates:
+            return True
+        return self.rds is not None and self.rds.version != self._saved_rds
+
+    def maybe_save(self, now=None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        if not self.dirty() or now - self._last_save < self.save_interval:
+            return False
+        return self.save(now)
+
+    def save(self, now=None) -> bool:
+        """Write the current maps to the atlas file."""
+        if now is None:
+            now = time.monotonic()
+        self._last_save = now
+        length = self._pack(now)
+        tmp = self.path + ".tmp"
+        try:
+            _ensure_dir(self.directory)
+            with open(tmp, "wb") as atlas_file:
+                atlas_file.write(memoryview(self._buffer)[:length])
+            # FAT cannot rename over an existing file
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            os.rename(tmp, self.path)
+        except OSError as exc:
+            if self.debug:
+                print("StationAtlas: failed to save:", exc)
+            return False
+        self._saved_updates = self.spectrum.updates
+        self._saved_rds = self.rds.version if self.rds is not None else 0
+        self.saves += 1
+        return True
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "loads": self.loads,
+            "saves": self.saves,
+            "restored_channels": self.restored_channels,
+            "restored_stations": self.restored_stations,
+            "boots": self.boots,
+            "elapsed_known": self.elapsed_known,
+            "bytes": len(self._buffer),
+        }
+
+    # Private methods
+    def _pack(self, now) -> int:
+        spectrum = self.spectrum
+        buf = self._buffer
+        now_tick = spectrum.tick(now)
+        offset = _HEADER_SIZE
+        for index in range(spectrum.size):
+            samples = spectrum.samples[index]
+            age = (now_tick - spectrum.ticks[index]) // 1000 if samples else _NEVER_AGE
+            struct.pack_into(_CHANNEL, buf, offset, spectrum.rssi[index], samples, max(0, min(age, _NEVER_AGE)))
+            offset += _CHANNEL_SIZE
+
+        stations = 0
+        if self.rds is not None:
+            for info in self.rds.cache.values():
+                if not info.pi:
+                    continue
+                age = max(0, int(now - info.last_seen))
+                struct.pack_into(_STATION, buf, offset, info.freq, info.pi, info.ps.encode(), age)
+                offset += _STATION_SIZE
+                stations += 1
+
+        struct.pack_into(
+            _HEADER,
+            buf,
+            0,
+            _MAGIC,
+            _VERSION,
+            self.label.encode(),
+            spectrum.freq_low,
+            spectrum.freq_high,
+            spectrum.spacing,
+            spectrum.size,
+            int(time.time()),
+            stations,
+            int(now * 1000) & 0xFFFFFFFF,
+            self.boots & 0xFFFF,
+        )
+        return offset
+
+
+def _clean_label(label: str) -> str:
+    chars = [c if c.isalpha() or c.isdigit() or c in "-_" else "_" for c in label[:16]]
+    return "".join(chars) or "default"
+
+
+def _ensure_dir(path: str) -> None:
+    try:
+        os.stat(path)
+    except OSError:
+        os.mkdir(path)
@@ -0,0 +1,259 @@
+import struct
+import time
+
+# The header is padded with a JUNK chunk so sample data starts on an SD
+# block boundary and block-aligned appends stay sector aligned on the card.
+HEADER_SIZE = 512
+_FMT_END = 36
+_JUNK_SIZE = HEADER_SIZE - _FMT_END - 8 - 8
+_DATA_SIZE_OFFSET = HEADER_SIZE - 4
+_RIFF_SIZE_OFFSET = 4
+
+
+def _build_header(sample_rate: int, channels: int, bits: int, data_size: int) -> bytearray:
+    header = bytearray(HEADER_SIZE)
+    block_align = channels * bits // 8
+    struct.pack_into("<4sI4s", header, 0, b"RIFF", HEADER_SIZE - 8 + data_size, b"WAVE")
+    struct.pack_into(
+        "<4sIHHIIHH",
+        header,
+        12,
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bits,
+    )
+    struct.pack_into("<4sI", header, _FMT_END, b"JUNK", _JUNK_SIZE)
+    struct.pack_into("<4sI", header, HEADER_SIZE - 8, b"data", data_size)
+    return header
+
+
+class WavWriter:
+    """Streams PCM data into a RIFF/WAVE file on a FAT volume.
+
+    A complete header is written up front with zero sizes. The file is grown
+    ahead of the data in ``prealloc_bytes`` extents so the FAT chain is
+    extended rarely and in large contiguous runs. The RIFF and data sizes are
+    patched every ``checkpoint_interval`` seconds, so after a power loss the
+    file can be recovered by truncating it to the checkpointed size (see
+    :func:`recover_wav`) instead of rescanning it.
+    """
+
+    def __init__(
+        self,
+        file,
+        *,
+        sample_rate: int = 16000,
+        channels: int = 2,
+        bits: int = 16,
+        prealloc_bytes: int = 1 << 20,
+        checkpoint_interval: float = 5.0,
+    ) -> None:
+        self.file = file
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bits = bits
+        self.prealloc_bytes = prealloc_bytes
+        self.checkpoint_interval = checkpoint_interval
+
+        self.data_bytes = 0
+        self.checkpoints = 0
+        self._allocated = HEADER_SIZE  # file length reserved so far
+        self._last_checkpoint = time.monotonic()
+        self._size_buf = bytearray(4)
+        self.finalized = False
+
+        file.write(_build_header(sample_rate, channels, bits, 0))
+
+    @property
+    def data_end(self) -> int:
+        return HEADER_SIZE + self.data_bytes
+
+    def write(self, data) -> int:
+        """Append sample bytes; the ring buffer drains through this method."""
+        size = len(data)
+        if self.prealloc_bytes and self.data_end + size > self._allocated:
+            self._preallocate(self.data_end + size)
+
+        written = self.file.write(data)
+        if written is None:
+            written = size
+        self.data_bytes += written
+        return written
+
+    def maybe_checkpoint(self, now=None) -> bool:
+        """Patch the header sizes if ``checkpoint_interval`` has passed."""
+        if now is None:
+            now = time.monotonic()
+        if now - self._last_checkpoint < self.checkpoint_interval:
+            return False
+        self.checkpoint(now)
+        return True
+
+    def checkpoint(self, now=None) -> None:
+        """Write the current data size into the header and sync the file."""
+        self._patch_sizes(HEADER_SIZE - 8 + self.data_bytes)
+        self.file.flush()
+        self.checkpoints += 1
+        self._last_checkpoint = time.monotonic() if now is None else now
+
+    def finalize(self, trailer=None) -> None:
+        """Close out the data chunk, append ``trailer`` chunks and fix sizes."""
+        if self.finalized:
+            return
+
+        end = self.data_end
+        self.file.seek(end)
+        if self.data_bytes & 1:
+            # RIFF chunks are word aligned
+            self.file.write(b"\x00")
+            end += 1
+        if trailer:
+            self.file.write(trailer)
+            end += len(trailer)
+
+        end = self._release_tail(end)
+        self._patch_sizes(end - 8)
+        self.file.seek(end)
+        self.file.flush()
+        self.finalized = True
+
+    # Private methods
+    def _preallocate(self, needed: int) -> None:
+        target = self._allocated
+        while target < needed:
+            target += self.prealloc_bytes
+        # Seeking past EOF and writing one byte makes FAT allocate the whole
+        # extent in one go without writing the gap
+        self.file.seek(target - 1)
+        self.file.write(b"\x00")
+        self.file.seek(self.data_end)
+        self._allocated = target
+
+    def _release_tail(self, end: int) -> int:
+        """Drop or wrap the unused preallocated extent; returns the file end."""
+        if self._allocated <= end:
+            return end
+
+        truncate = getattr(self.file, "truncate", None)
+        if truncate is not None:
+            try:
+                truncate(end)
+                self._allocated = end
+                return end
+            except OSError:
+                pass
+
+        # No truncate() on this filesystem: cover the tail with a JUNK chunk
+        tail = self._allocated - end
+        if tail < 8:
+            tail = 8
+        self.file.seek(end)
+        self.file.write(struct.pack("<4sI", b"JUNK", tail - 8))
+        if end + tail > self._allocated:
+            self.file.seek(end + tail - 1)
+            self.file.write(b"\x00")
+        self._allocated = end + tail
+        return end + tail
+
+    def _patch_sizes(self, riff_size: int) -> None:
+        buf = self._size_buf
+        struct.pack_into("<I", buf, 0, riff_size)
+        self.file.seek(_RIFF_SIZE_OFFSET)
+        self.file.write(buf)
+        struct.pack_into("<I", buf, 0, self.data_bytes)
+        self.file.seek(_DATA_SIZE_OFFSET)
+        self.file.write(buf)
+        self.file.seek(self.data_end)
+
+
+def recover_wav(path: str) -> int:
+    """Repair a WAV file left behind by an interrupted session.
+
+    The data size from the last header checkpoint is trusted; everything
+    after it (unflushed audio or preallocated space) is cut off, or covered
+    with a JUNK chunk where the filesystem cannot truncate. Returns the
+    recovered data size in bytes.
+    """
+    with open(path, "r+b") as wav_file:
+        header = bytearray(HEADER_SIZE)
+        wav_file.readinto(header)
+        if header[0:4] != b"RIFF" or header[HEADER_SIZE - 8:HEADER_SIZE - 4] != b"data":
+            raise ValueError("Not a WavWriter file: {}".format(path))
+
+        data_size = struct.unpack_from("<I", header, _DATA_SIZE_OFFSET)[0]
+        file_size = wav_file.seek(0, 2)
+        if HEADER_SIZE + data_size > file_size:
+            data_size = (file_size - HEADER_SIZE) & ~1
+
+        end = HEADER_SIZE + data_size
+        if hasattr(wav_file, "truncate"):
+            wav_file.truncate(end)
+        elif file_size - end >= 8:
+            wav_file.seek(end)
+            wav_file.write(struct.pack("<4sI", b"JUNK", file_size - end - 8))
+            end = file_size
+
+        wav_file.seek(_RIFF_SIZE_OFFSET)
+        wav_file.write(struct.pack("<I", end - 8))
+        wav_file.seek(_DATA_SIZE_OFFSET)
+        wav_file.write(struct.pack("<I", data_size))
+    return data_size
+
+
+def build_cue_chunks(markers) -> bytes:
+    """Encode ``(sample_frame, label)`` markers as ``cue `` + ``LIST adtl`` chunks."""
+    if not markers:
+        return b""
+
+    cue = bytearray(struct.pack("<4sII", b"cue ", 4 + 24 * len(markers), len(markers)))
+    adtl = bytearray(b"adtl")
+    for cue_id, (frame, label) in enumerate(markers, 1):
+        cue += struct.pack("<II4sIII", cue_id, frame, b"data", 0, 0, frame)
+        text = label.encode() + b"\x00"
+        adtl += struct.pack("<4sII", b"labl", 4 + len(text), cue_id)
+        adtl += text
+        if len(text) & 1:
+            adtl += b"\x00"
+    return bytes(cue) + struct.pack("<4sI", b"LIST", len(adtl)) + bytes(adtl)
+
+
+def read_cue_markers(path: str):
+    """Return ``[(sample_frame, label), ...]`` from a WAV file's cue chunks."""
+    positions = {}
+    labels = {}
+    with open(path, "rb") as wav_file:
+        riff = wav_file.read(12)
+        if riff[0:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError("Not a WAV file: {}".format(path))
+        while True:
+            chunk_header = wav_file.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"cue ":
+                body = wav_file.read(chunk_size)
+                count = struct.unpack_from("<I", body, 0)[0]
+                for i in range(count):
+                    cue_id, _, _, _, _, frame = struct.unpack_from("<II4sIII", body, 4 + 24 * i)
+                    positions[cue_id] = frame
+            elif chunk_id == b"LIST":
+                body = wav_file.read(chunk_size)
+                if body[0:4] == b"adtl":
+                    offset = 4
+                    while offset + 8 <= len(body):
+                        sub_id, sub_size = struct.unpack_from("<4sI", body, offset)
+                        if sub_id == b"labl":
+                            cue_id = struct.unpack_from("<I", body, offset + 8)[0]
+                            text = body[offset + 12:offset + 8 + sub_size]
+                            labels[cue_id] = text.split(b"\x00", 1)[0].decode()
+                        offset += 8 + sub_size + (sub_size & 1)
+            else:
+                wav_file.seek(chunk_size + (chunk_size & 1), 1)
+            if chunk_size & 1 and chunk_id in (b"cue ", b"LIST"):
+                wav_file.seek(1, 1)
+    return sorted((frame, labels.get(cue_id, "")) for cue_id, frame in positions.items())
@@ -0,0 +1,19 @@
+"""Host benchmarks for the device hot paths, run on the simulated hardware.
+
+::
+
+    python -m tools.bench              # run and compare with baseline.json
+    python -m tools.bench --save       # run and record a new baseline
+    python -m tools.bench -o bench_output.txt
+
+Each benchmark reports metrics with a direction (lower or higher is
+better) and a tolerance. Bus traffic and virtual sleep time come from the
+simulation and are exact, so their tolerance is zero. Timings and
+allocation sizes depend on the host and get a relative margin; timings
+are also scaled by a fixed reference workload timed in the same run, and
+each metric keeps its best value over ``--runs`` passes. A run exits
+non-zero when any metric regresses past its tolerance.
+"""
+from .suite import BENCHMARKS, Metric, run_all
+
+__all__ = ["BENCHMARKS", "Metric", "run_all"]
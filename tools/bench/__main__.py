@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import platform
+import sys
+
+from .suite import BENCHMARKS, run_all
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+_ABS_SLACK = 1e-9  # keeps exact zero baselines comparable
+
+
+def compare(metrics, baseline, scale=1.0):
+    """Return ``(lines, regressions)`` comparing ``metrics`` with a baseline dict.
+
+    ``scale`` is this host's reference time over the baseline's; timed
+    baselines are scaled by it so a slower or busier machine is not
+    reported as a regression.
+    """
+    lines = []
+    regressions = []
+    for metric in metrics:
+        base = baseline.get(metric.name)
+        if base is None:
+            lines.append("{:<44} {:>12.3f} {:<10} (new)".format(metric.name, metric.value, metric.unit))
+            continue
+        ref = base["value"]
+        if base.get("timed", metric.timed):
+            ref = ref / scale if metric.better == "higher" else ref * scale
+        tolerance = base.get("tolerance", metric.tolerance)
+        if metric.better == "higher":
+            worse = metric.value < ref * (1 - tolerance) - _ABS_SLACK
+        else:
+            worse = metric.value > ref * (1 + tolerance) + _ABS_SLACK
+        change = (metric.value / ref - 1) * 100 if ref else 0.0
+        flag = "REGRESSION" if worse else ""
+        lines.append(
+            "{:<44} {:>12.3f} {:<10} {:>+7.1f}% {}".format(metric.name, metric.value, metric.unit, change, flag)
+        )
+        if worse:
+            regressions.append(metric.name)
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m tools.bench", description="Benchmark device hot paths.")
+    parser.add_argument("benchmarks", nargs="*", help="subset to run: " + ", ".join(n for n, _ in BENCHMARKS))
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--runs", type=int, default=3, help="keep each metric's best of this many runs")
+    parser.add_argument("-o", "--output", help="also write results as JSON here")
+    args = parser.parse_args(argv)
+
+    metrics, reference = run_all(args.benchmarks or None, args.runs)
+    results = {m.name: m.as_dict() for m in metrics}
+
+    baseline = {}
+    scale = 1.0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            document = json.load(baseline_file)
+        baseline = document.get("metrics", {})
+        scale = reference / document.get("reference_us", reference)
+    lines, regressions = compare(metrics, baseline, scale)
+    print("host reference {:.1f} us ({:.2f}x baseline)".format(reference, scale))
+    print("\n".join(lines))
+
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "reference_us": reference,
+        "metrics": results,
+    }
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(document, out, indent=2, sort_keys=True)
+            out.write("\n")
+    if args.save:
+        if args.benchmarks and baseline:
+            baseline.update(results)
+            document["metrics"] = baseline
+        with open(args.baseline, "w") as out:
+            json.dump(document, out, indent=2, sort_keys=True)
+            out.write("\n")
+        print("Baseline written to", args.baseline)
+        return 0
+
+    if regressions:
+        print("{} regression(s): {}".format(len(regressions), ", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
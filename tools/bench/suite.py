@@ -0,0 +1,273 @@
+import os
+import shutil
+import time
+import tracemalloc
+
+from tools import sim
+
+# Host timings wander; exact counts do not
+TIME_TOLERANCE = 1.0  # flag a 2x slowdown; shared hosts jitter well past 50%
+ALLOC_TOLERANCE = 0.10
+
+
+class Metric:
+    __slots__ = ("name", "value", "unit", "better", "tolerance", "timed")
+
+    def __init__(self, name, value, unit, better="lower", tolerance=TIME_TOLERANCE, timed=None) -> None:
+        self.name = name
+        self.value = value
+        self.unit = unit
+        self.better = better
+        self.tolerance = tolerance
+        # Wall-clock metrics are scaled by the host reference when compared
+        self.timed = tolerance == TIME_TOLERANCE if timed is None else timed
+
+    def as_dict(self):
+        return {
+            "value": self.value,
+            "unit": self.unit,
+            "better": self.better,
+            "tolerance": self.tolerance,
+            "timed": self.timed,
+        }
+
+
+def _timed(fn, repeat: int, rounds: int = 5, setup=None) -> float:
+    """Best-of-``rounds`` wall time per call in microseconds.
+
+    ``setup`` runs untimed before each round, for code whose cost drifts
+    as its state evolves.
+    """
+    best = None
+    for _ in range(rounds):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = (time.perf_counter() - start) / repeat
+        if best is None or elapsed < best:
+            best = elapsed
+    return best * 1e6
+
+
+def reference_us() -> float:
+    """Time of a fixed pure-Python workload, used to normalise host speed."""
+    def work():
+        total = 0
+        for i in range(1000):
+            total += i * i & 0xFF
+        return total
+
+    return _timed(work, 200)
+
+
+def _alloc_per_call(fn, repeat: int) -> float:
+    """Average peak transient allocation per call, in bytes."""
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(repeat):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / repeat
+
+
+def _bus_delta(env, address, fn):
+    stats = env.i2c.stats[address]
+    before = (stats.transactions, stats.bytes_out + stats.bytes_in)
+    fn()
+    stats = env.i2c.stats[address]
+    return stats.transactions - before[0], stats.bytes_out + stats.bytes_in - before[1]
+
+
+def bench_scanner(env):
+    from radio_scanner import RadioScanner
+
+    clock = env.clock
+    state = {}
+
+    def fresh():
+        # The survey refresh changes what update() does over time; start
+        # every round from the same point
+        state["scanner"] = RadioScanner(env.i2c)
+        state["scanner"].setup()
+
+    def update():
+        scanner = state["scanner"]
+        now = clock.now
+        scanner.update(now)
+        clock.now = max(now + 0.001, scanner.next_deadline(now))
+
+    def scan_step():
+        state["scanner"].scan_step()
+        clock.advance(0.06)
+
+    return [
+        Metric("scanner.update", _timed(update, 1000, setup=fresh), "us/call"),
+        Metric("scanner.scan_step", _timed(scan_step, 500, setup=fresh), "us/call"),
+    ]
+
+
+def bench_driver_io(env):
+    from radio_scanner import RadioScanner
+
+    scanner = RadioScanner(env.i2c)
+    scanner.setup()
+    radio = scanner.radio
+    clock = env.clock
+
+    tx_tune, bytes_tune = _bus_delta(env, 0x11, lambda: radio.set_freq(9110))
+    clock.advance(0.001)
+    radio.invalidate_status()
+    tx_busy, bytes_busy = _bus_delta(env, 0x11, radio.poll_tune)
+    clock.advance(0.2)
+    radio.invalidate_status()
+    tx_done, bytes_done = _bus_delta(env, 0x11, radio.poll_tune)
+    exact = dict(tolerance=0.0)
+    return [
+        Metric("radio.set_freq.transactions", tx_tune, "i2c", **exact),
+        Metric("radio.set_freq.bytes", bytes_tune, "bytes", **exact),
+        Metric("radio.poll_tune.pending.transactions", tx_busy, "i2c", **exact),
+        Metric("radio.poll_tune.pending.bytes", bytes_busy, "bytes", **exact),
+        Metric("radio.poll_tune.done.transactions", tx_done, "i2c", **exact),
+        Metric("radio.poll_tune.done.bytes", bytes_done, "bytes", **exact),
+    ]
+
+
+def bench_rds(env):
+    import tinkeringtech_rda5807m
+
+    parser = tinkeringtech_rda5807m.RDSParser()
+    groups = []
+    for station in env.radio.stations.values():
+        groups.extend(station.rds_groups(clock_minutes=21 * 60 + 13))
+    clock = env.clock
+    state = {"i": 0}
+
+    def feed():
+        group = groups[state["i"]]
+        state["i"] = (state["i"] + 1) % len(groups)
+        parser.process_data(*group)
+
+    start = clock.now
+    for _ in range(len(groups)):
+        feed()
+    slept = (clock.now - start) / len(groups)
+
+    # Time spent sleeping stalls the device loop just the same
+    per_group = _timed(feed, len(groups) * 20) + slept * 1e6
+    return [
+        Metric("rds.process_data.rate", 1e6 / per_group, "groups/s", better="higher"),
+        Metric("rds.process_data.sleep", round(slept * 1000, 3), "ms/group", tolerance=0.0),
+    ]
+
+
+def bench_emf(env):
+    from emf_reader import EMFReader
+
+    reader = EMFReader(env.i2c)
+    clock = env.clock
+
+    def update():
+        clock.advance(reader.sampler.period)
+        reader.update(clock.now)
+
+    def draw():
+        reader.frame = (reader.frame + 1) % 7
+        reader.draw_square()
+
+    reader.init_matrix()
+    draw()
+    _, frame_bytes = _bus_delta(env, 0x30, draw)
+    return [
+        Metric("emf.update", _timed(update, 1000), "us/call"),
+        Metric("emf.draw_square", _timed(draw, 500), "us/frame"),
+        Metric("emf.draw_square.bytes", frame_bytes, "bytes/frame", tolerance=0.0),
+    ]
+
+
+def bench_session(env):
+    from session_manager import SessionManager, SidecarFormat
+
+    results = []
+    chunk = memoryview(bytearray(512))
+    payload = {"emf_uT": 51.5, "emf_level": 1, "freq": 9110, "rssi": 28}
+    for fmt in (SidecarFormat.JSONL, SidecarFormat.BINARY):
+        manager = SessionManager(None, None, mount_point=env.sd_root, debug=False, sidecar_format=fmt)
+        manager.start_session()
+
+        def frame():
+            env.clock.advance(0.05)
+            manager.append_data_frame(payload)
+
+        results.append(Metric("session.append_data_frame.{}".format(fmt), _timed(frame, 2000), "us/call"))
+        results.append(
+            Metric(
+                "session.append_data_frame.{}.alloc".format(fmt),
+                _alloc_per_call(frame, 500),
+                "bytes/call",
+                tolerance=ALLOC_TOLERANCE,
+            )
+        )
+        if fmt == SidecarFormat.JSONL:
+
+            def audio():
+                env.clock.advance(0.016)
+                manager.append_audio_chunk(chunk)
+
+            per_chunk = _timed(audio, 4000)
+            results.append(Metric("session.append_audio_chunk", per_chunk, "us/call"))
+            results.append(
+                Metric("session.append_audio_chunk.rate", len(chunk) / per_chunk, "MB/s", better="higher")
+            )
+            results.append(
+                Metric(
+                    "session.append_audio_chunk.alloc",
+                    _alloc_per_call(audio, 1000),
+                    "bytes/call",
+                    tolerance=ALLOC_TOLERANCE,
+                )
+            )
+        manager.stop_session()
+        manager.unmount()
+    return results
+
+
+BENCHMARKS = (
+    ("scanner", bench_scanner),
+    ("driver_io", bench_driver_io),
+    ("rds", bench_rds),
+    ("emf", bench_emf),
+    ("session", bench_session),
+)
+
+
+def run_all(names=None, runs: int = 3):
+    """Run the selected benchmarks (all by default) ``runs`` times.
+
+    Returns ``(metrics, reference)``: the best value of each metric across
+    the runs and the host reference time from :func:`reference_us`.
+    """
+    reference = reference_us()
+    best = {}
+    for _ in range(runs):
+        for name, bench in BENCHMARKS:
+            if names and name not in names:
+                continue
+            env = sim.install()
+            try:
+                results = bench(env)
+            finally:
+                env.uninstall()
+                shutil.rmtree(os.path.dirname(env.sd_root), ignore_errors=True)
+            for metric in results:
+                kept = best.get(metric.name)
+                if kept is None or (metric.value > kept.value if metric.better == "higher" else metric.value < kept.value):
+                    best[metric.name] = metric
+        reference = min(reference, reference_us())
+    return list(best.values()), reference
@@ -0,0 +1,27 @@
+"""Host-side review of sessions recorded by ``SessionManager``.
+
+Copy a session directory off the SD card and run::
+
+    python -m tools.session_review <session_dir> [-o events.jsonl]
+
+``session.wav`` is memory-mapped and processed in fixed-size blocks and the
+data sidecar (``session_data.jsonl`` or ``session_data.bin``) is streamed in
+chunks, so memory use stays bounded regardless of session length. Requires
+NumPy.
+"""
+from .audio import WavMap, open_wav
+from .detect import AudioBurstDetector, EmfSpikeDetector
+from .engine import Event, review_session
+from .records import iter_sidecar_chunks
+from .timeline import Timeline
+
+__all__ = [
+    "AudioBurstDetector",
+    "EmfSpikeDetector",
+    "Event",
+    "Timeline",
+    "WavMap",
+    "iter_sidecar_chunks",
+    "open_wav",
+    "review_session",
+]
@@ -0,0 +1,46 @@
+import argparse
+import json
+import sys
+from collections import Counter
+
+from .engine import review_session
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.session_review",
+        description="Find EMF spikes and audio bursts in a recorded session.",
+    )
+    parser.add_argument("session_dir")
+    parser.add_argument("-o", "--output", help="write events as JSON Lines here (default: stdout)")
+    parser.add_argument("--block-seconds", type=float, default=10.0)
+    parser.add_argument("--emf-threshold", type=float, default=5.0)
+    parser.add_argument("--emf-min-delta", type=float, default=2.0)
+    parser.add_argument("--audio-threshold-db", type=float, default=12.0)
+    args = parser.parse_args(argv)
+
+    events = review_session(
+        args.session_dir,
+        block_seconds=args.block_seconds,
+        emf_threshold=args.emf_threshold,
+        emf_min_delta=args.emf_min_delta,
+        audio_threshold_db=args.audio_threshold_db,
+    )
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for event in events:
+            out.write(json.dumps(event.to_dict()))
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    counts = Counter("{} ({})".format(e.kind, e.source) for e in events)
+    summary = ", ".join("{} {}".format(n, k) for k, n in sorted(counts.items())) or "no events"
+    print("{}: {}".format(args.session_dir, summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import struct
+
+import numpy as np
+
+_DTYPES = {8: np.uint8, 16: np.int16, 32: np.int32}
+
+
+class WavMap:
+    """Read-only memory map over the sample data of a PCM WAV file.
+
+    ``data`` is an ``(frames, channels)`` view straight onto the file; pages
+    are only read when a block touches them, so multi-gigabyte sessions cost
+    address space rather than RAM.
+    """
+
+    def __init__(self, path, data_offset, data_size, sample_rate, channels, bits) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bits = bits
+        self.data_offset = data_offset
+
+        frame_bytes = channels * bits // 8
+        self.frames = data_size // frame_bytes
+        if self.frames:
+            self.data = np.memmap(
+                path,
+                dtype=np.dtype(_DTYPES[bits]).newbyteorder("<"),
+                mode="r",
+                offset=data_offset,
+                shape=(self.frames, channels),
+            )
+        else:
+            self.data = np.zeros((0, channels), dtype=_DTYPES[bits])
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def blocks(self, block_frames: int):
+        """Yield ``(start_frame, block)`` views of at most ``block_frames`` frames."""
+        for start in range(0, self.frames, block_frames):
+            yield start, self.data[start:start + block_frames]
+
+    def to_float(self, block):
+        """Scale a block to float32 in [-1, 1)."""
+        if self.bits == 8:
+            return (block.astype(np.float32) - 128.0) / 128.0
+        return block.astype(np.float32) / float(1 << (self.bits - 1))
+
+
+def open_wav(path) -> WavMap:
+    """Locate the ``fmt `` and ``data`` chunks and map the samples.
+
+    A data size of zero or one that runs past the end of the file (a
+    session that was never finalized) is replaced by what the file holds.
+    """
+    with open(path, "rb") as wav_file:
+        riff = wav_file.read(12)
+        if riff[0:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError("Not a WAV file: {}".format(path))
+        file_size = wav_file.seek(0, 2)
+        wav_file.seek(12)
+
+        fmt = None
+        while True:
+            chunk_header = wav_file.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError("No data chunk in {}".format(path))
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", wav_file.read(16))
+                wav_file.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b"data":
+                data_offset = wav_file.tell()
+                break
+            else:
+                wav_file.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None:
+        raise ValueError("No fmt chunk in {}".format(path))
+    audio_format, channels, sample_rate, _, _, bits = fmt
+    if audio_format != 1 or bits not in _DTYPES:
+        raise ValueError("Unsupported WAV encoding in {}".format(path))
+
+    if chunk_size == 0 or data_offset + chunk_size > file_size:
+        chunk_size = file_size - data_offset
+    return WavMap(path, data_offset, chunk_size, sample_rate, channels, bits)
@@ -0,0 +1,142 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_MAD_SCALE = 1.4826  # MAD -> standard deviation for normal noise
+
+
+class _RunMerger:
+    """Groups sorted flagged positions into events, across feed boundaries.
+
+    Positions closer than ``gap`` belong to the same event. The last event
+    stays open until a later flag lands too far away or ``finish()`` is
+    called, so an event split across two blocks is reported once.
+    """
+
+    def __init__(self, gap) -> None:
+        self.gap = gap
+        self._open = None  # [start, end, score, value]
+
+    def add(self, pos, score, value, width=0):
+        closed = []
+        if not len(pos):
+            return closed
+        breaks = np.flatnonzero(np.diff(pos) > self.gap) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(pos)]))
+        for s, e in zip(starts, ends):
+            k = s + int(np.argmax(score[s:e]))
+            group = [float(pos[s]), float(pos[e - 1] + width), float(score[k]), float(value[k])]
+            current = self._open
+            if current is not None and group[0] - current[1] <= self.gap:
+                current[1] = group[1]
+                if group[2] > current[2]:
+                    current[2] = group[2]
+                    current[3] = group[3]
+            else:
+                if current is not None:
+                    closed.append(tuple(current))
+                self._open = group
+        return closed
+
+    def finish(self):
+        current = self._open
+        self._open = None
+        return [tuple(current)] if current is not None else []
+
+
+class EmfSpikeDetector:
+    """Flags EMF samples that jump away from their recent baseline.
+
+    Each sample is compared with the median of the ``window`` samples before
+    it. It counts as a spike when the deviation exceeds ``threshold`` robust
+    standard deviations (MAD-based) and at least ``min_delta`` in absolute
+    terms, so a perfectly steady field does not make every wobble a spike.
+    ``feed()`` takes one sidecar chunk at a time and keeps the last
+    ``window`` samples as context; events are ``(start_t, end_t,
+    deviation, value)``.
+    """
+
+    def __init__(self, *, window: int = 64, threshold: float = 5.0, min_delta: float = 2.0, merge_gap: float = 1.0) -> None:
+        self.window = window
+        self.threshold = threshold
+        self.min_delta = min_delta
+        self._merger = _RunMerger(merge_gap)
+        self._history_t = np.empty(0)
+        self._history_x = np.empty(0)
+
+    def feed(self, t, x):
+        valid = np.isfinite(t) & np.isfinite(x)
+        t = np.concatenate((self._history_t, t[valid]))
+        x = np.concatenate((self._history_x, x[valid]))
+        self._history_t = t[-self.window:]
+        self._history_x = x[-self.window:]
+        if len(x) <= self.window:
+            return []
+
+        # Row i is the baseline window for sample window + i
+        windows = sliding_window_view(x[:-1], self.window)
+        baseline = np.median(windows, axis=1)
+        spread = _MAD_SCALE * np.median(np.abs(windows - baseline[:, None]), axis=1)
+        samples = x[self.window:]
+        deviation = np.abs(samples - baseline)
+        limit = np.maximum(self.threshold * spread, self.min_delta)
+        hits = np.flatnonzero(deviation > limit)
+        return self._merger.add(t[self.window:][hits], deviation[hits], samples[hits])
+
+    def finish(self):
+        return self._merger.finish()
+
+
+class AudioBurstDetector:
+    """Flags short windows whose energy rises well above the noise floor.
+
+    Audio is cut into ``window_frames`` windows and their mean power is
+    converted to dBFS. The noise floor is the ``floor_percentile`` of the
+    last ``history`` window levels, updated once per block, so it follows
+    slow changes in hiss and volume. Windows more than ``threshold_db``
+    above it are bursts. Leftover frames that don't fill a window are
+    carried into the next block. Events are ``(start_frame, end_frame,
+    db_above_floor, dbfs)``.
+    """
+
+    def __init__(
+        self,
+        window_frames: int,
+        *,
+        threshold_db: float = 12.0,
+        floor_percentile: float = 20.0,
+        history: int = 1200,
+        merge_gap: int = 0,
+    ) -> None:
+        self.window_frames = window_frames
+        self.threshold_db = threshold_db
+        self.floor_percentile = floor_percentile
+        self.history = history
+        self._merger = _RunMerger(merge_gap)
+        self._levels = np.empty(0, dtype=np.float32)
+        self._leftover = np.empty(0, dtype=np.float32)
+        self._leftover_start = 0
+
+    def feed(self, start_frame: int, samples):
+        if len(self._leftover):
+            samples = np.concatenate((self._leftover, samples))
+            start_frame = self._leftover_start
+        wf = self.window_frames
+        count = len(samples) // wf
+        self._leftover = samples[count * wf:]
+        self._leftover_start = start_frame + count * wf
+        if not count:
+            return []
+
+        power = np.mean(np.square(samples[:count * wf].reshape(count, wf), dtype=np.float32), axis=1)
+        levels = 10.0 * np.log10(power + 1e-12)
+        self._levels = np.concatenate((self._levels, levels.astype(np.float32)))[-self.history:]
+        floor = np.percentile(self._levels, self.floor_percentile)
+
+        above = levels - floor
+        hits = np.flatnonzero(above > self.threshold_db)
+        positions = start_frame + hits * wf
+        return self._merger.add(positions, above[hits], levels[hits], width=wf)
+
+    def finish(self):
+        return self._merger.finish()
@@ -0,0 +1,161 @@
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+
+from .audio import open_wav
+from .detect import AudioBurstDetector, EmfSpikeDetector
+from .records import iter_sidecar_chunks
+from .timeline import Timeline
+
+# Session audio interleaves the radio (left) and microphone (right)
+CHANNEL_NAMES = ("radio", "mic")
+CONTEXT_FIELDS = ("freq", "rssi")
+
+
+@dataclass
+class Event:
+    kind: str  # "emf_spike" or "audio_burst"
+    source: str  # "emf", "radio" or "mic"
+    start: float  # session seconds
+    end: float
+    peak: float  # deviation in uT, or dB above the noise floor
+    level: float  # field strength in uT, or dBFS, at the peak
+    freq: Optional[int] = None  # tuned frequency at the start, 10 kHz units
+    rssi: Optional[int] = None
+
+    def to_dict(self):
+        record = asdict(self)
+        for key in ("start", "end"):
+            record[key] = round(record[key], 3)
+        for key in ("peak", "level"):
+            record[key] = round(record[key], 2)
+        return record
+
+
+def review_session(
+    session_dir,
+    *,
+    block_seconds: float = 10.0,
+    chunk_records: int = 8192,
+    emf_field: str = "emf_uT",
+    emf_window: int = 64,
+    emf_threshold: float = 5.0,
+    emf_min_delta: float = 2.0,
+    emf_merge_gap: float = 1.0,
+    audio_window: float = 0.05,
+    audio_threshold_db: float = 12.0,
+    audio_floor_percentile: float = 20.0,
+    audio_history: float = 60.0,
+    audio_merge_gap: float = 0.25,
+):
+    """Scan a session directory and return its events sorted by start time.
+
+    Memory use is bounded by ``block_seconds`` of audio, ``chunk_records``
+    sidecar rows and the events themselves.
+    """
+    events = []
+
+    emf = EmfSpikeDetector(
+        window=emf_window,
+        threshold=emf_threshold,
+        min_delta=emf_min_delta,
+        merge_gap=emf_merge_gap,
+    )
+    for chunk in iter_sidecar_chunks(session_dir, (emf_field,), chunk_records):
+        found = emf.feed(chunk["t"], chunk[emf_field])
+        events.extend(Event("emf_spike", "emf", *e) for e in found)
+    events.extend(Event("emf_spike", "emf", *e) for e in emf.finish())
+
+    wav_path = os.path.join(session_dir, "session.wav")
+    if os.path.exists(wav_path):
+        events.extend(
+            _audio_events(
+                session_dir,
+                wav_path,
+                block_seconds,
+                audio_window,
+                audio_threshold_db,
+                audio_floor_percentile,
+                audio_history,
+                audio_merge_gap,
+            )
+        )
+
+    events.sort(key=lambda e: e.start)
+    _annotate(events, iter_sidecar_chunks(session_dir, CONTEXT_FIELDS, chunk_records))
+    return events
+
+
+def _audio_events(session_dir, wav_path, block_seconds, window, threshold_db, floor_percentile, history, merge_gap):
+    wav = open_wav(wav_path)
+    timeline = Timeline.for_session(session_dir, wav)
+    window_frames = max(1, int(window * wav.sample_rate))
+    detectors = [
+        AudioBurstDetector(
+            window_frames,
+            threshold_db=threshold_db,
+            floor_percentile=floor_percentile,
+            history=max(1, int(history / window)),
+            merge_gap=int(merge_gap * wav.sample_rate),
+        )
+        for _ in range(wav.channels)
+    ]
+
+    found = [[] for _ in range(wav.channels)]
+    block_frames = max(window_frames, int(block_seconds * wav.sample_rate) // window_frames * window_frames)
+    for start, block in wav.blocks(block_frames):
+        block = wav.to_float(block)
+        for channel, detector in enumerate(detectors):
+            found[channel].extend(detector.feed(start, block[:, channel]))
+    for channel, detector in enumerate(detectors):
+        found[channel].extend(detector.finish())
+
+    events = []
+    for channel, bursts in enumerate(found):
+        if not bursts:
+            continue
+        name = CHANNEL_NAMES[channel] if channel < len(CHANNEL_NAMES) else "ch{}".format(channel)
+        bursts = np.asarray(bursts, dtype=np.float64)
+        starts = timeline.frame_to_time(bursts[:, 0])
+        ends = timeline.frame_to_time(bursts[:, 1])
+        for i in range(len(bursts)):
+            events.append(Event("audio_burst", name, float(starts[i]), float(ends[i]), float(bursts[i, 2]), float(bursts[i, 3])))
+    return events
+
+
+def _annotate(events, chunks) -> None:
+    """Attach the latest sidecar context at or before each event's start.
+
+    ``events`` must be sorted by start; the sidecar is streamed once.
+    """
+    if not events:
+        return
+    starts = np.fromiter((e.start for e in events), dtype=np.float64, count=len(events))
+    last = {name: np.nan for name in CONTEXT_FIELDS}
+    done = 0
+    for chunk in chunks:
+        t = chunk["t"]
+        if not len(t):
+            continue
+        # Events that start before this chunk take the previous chunk's tail
+        upto = int(np.searchsorted(starts, t[-1], side="right"))
+        for name in CONTEXT_FIELDS:
+            column = chunk[name]
+            valid = np.isfinite(column)
+            if not valid.any():
+                continue
+            vt = t[valid]
+            vc = column[valid]
+            idx = np.searchsorted(vt, starts[done:upto], side="right") - 1
+            values = np.where(idx >= 0, vc[np.maximum(idx, 0)], last[name])
+            for offset, value in enumerate(values):
+                if value == value:
+                    setattr(events[done + offset], name, int(value))
+            last[name] = vc[-1]
+        done = upto
+    for event in events[done:]:
+        for name in CONTEXT_FIELDS:
+            if last[name] == last[name]:
+                setattr(event, name, int(last[name]))
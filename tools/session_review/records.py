@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src"))
+
+from sidecar import read_schema  # noqa: E402
+
+_NUMPY_CODES = {
+    "b": "i1", "B": "u1", "h": "<i2", "H": "<u2", "i": "<i4", "I": "<u4",
+    "l": "<i4", "L": "<u4", "q": "<i8", "Q": "<u8", "f": "<f4", "d": "<f8",
+}
+
+
+def iter_sidecar_chunks(session_dir, fields, chunk_records: int = 8192):
+    """Yield dicts of column arrays, ``chunk_records`` rows at a time.
+
+    Each chunk holds ``"t"`` (seconds, float64) and one float64 column per
+    requested field, with NaN where a record lacks the field. The binary
+    sidecar is memory-mapped; the JSONL sidecar is parsed line by line into
+    preallocated columns.
+    """
+    bin_path = os.path.join(session_dir, "session_data.bin")
+    if os.path.exists(bin_path):
+        return _iter_binary(bin_path, fields, chunk_records)
+    jsonl_path = os.path.join(session_dir, "session_data.jsonl")
+    if os.path.exists(jsonl_path):
+        return _iter_jsonl(jsonl_path, fields, chunk_records)
+    return iter(())
+
+
+def _iter_jsonl(path, fields, chunk_records):
+    columns = {name: np.empty(chunk_records) for name in ("t",) + tuple(fields)}
+    fill = 0
+    with open(path, "r") as data_file:
+        for line in data_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn line at the end of an interrupted session
+            data = record.get("data")
+            if not isinstance(data, dict):
+                data = {}
+            columns["t"][fill] = record.get("t", np.nan)
+            for name in fields:
+                value = data.get(name)
+                columns[name][fill] = value if isinstance(value, (int, float)) else np.nan
+            fill += 1
+            if fill == chunk_records:
+                yield {name: column.copy() for name, column in columns.items()}
+                fill = 0
+    if fill:
+        yield {name: column[:fill].copy() for name, column in columns.items()}
+
+
+def _iter_binary(path, fields, chunk_records):
+    with open(path, "rb") as data_file:
+        schema = read_schema(data_file)
+    dtype = np.dtype(
+        [("t_ms", "<u4")] + [(name, _NUMPY_CODES[fmt]) for name, fmt in schema["fields"]]
+    )
+    if dtype.itemsize != schema["record_size"]:
+        raise ValueError("Sidecar record layout not understood: {}".format(schema["record"]))
+
+    count = (os.path.getsize(path) - schema["header_size"]) // dtype.itemsize
+    if count <= 0:
+        return
+    records = np.memmap(path, dtype=dtype, mode="r", offset=schema["header_size"], shape=(count,))
+    for start in range(0, count, chunk_records):
+        block = records[start:start + chunk_records]
+        chunk = {"t": block["t_ms"] / 1000.0}
+        for name in fields:
+            if name in dtype.names:
+                chunk[name] = block[name].astype(np.float64)
+            else:
+                chunk[name] = np.full(len(block), np.nan)
+        yield chunk
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+from .records import _NUMPY_CODES  # also puts src/ on sys.path
+from session_index import HEADER_SIZE, RECORD_FORMAT, RECORD_SIZE, SessionIndexReader  # noqa: E402
+
+# Same layout as the device writes: RECORD_FORMAT is "<" plus one code per field
+_INDEX_DTYPE = np.dtype(
+    [(name, _NUMPY_CODES[fmt]) for name, fmt in zip(("t_ms", "audio", "sidecar"), RECORD_FORMAT[1:])]
+)
+
+
+class Timeline:
+    """Maps audio frames onto the session clock used by the sidecar.
+
+    With a ``session_index.bin`` the mapping is interpolated between index
+    records, which absorbs audio lost to ring overruns or a slow card. Without
+    one, frame ``n`` is assumed to be at ``n / sample_rate`` seconds.
+    """
+
+    def __init__(self, sample_rate: int, frame_bytes: int, data_offset: int, index=None) -> None:
+        self.sample_rate = sample_rate
+        self._times = None
+        self._frames = None
+        if index is not None and len(index) >= 2:
+            frames = (index["audio"].astype(np.float64) - data_offset) / frame_bytes
+            # Offsets only grow; keep the first record of any stalled stretch
+            keep = np.concatenate(([True], np.diff(frames) > 0))
+            self._frames = frames[keep]
+            self._times = index["t_ms"][keep] / 1000.0
+
+    @classmethod
+    def for_session(cls, session_dir, wav) -> "Timeline":
+        index = None
+        path = os.path.join(session_dir, "session_index.bin")
+        if os.path.exists(path):
+            with open(path, "rb") as index_file:
+                # Checks magic, version and record size; raises ValueError
+                count = SessionIndexReader(index_file).count
+            if _INDEX_DTYPE.itemsize != RECORD_SIZE:
+                raise ValueError("Session index record layout not understood: {}".format(RECORD_FORMAT))
+            index = np.fromfile(path, dtype=_INDEX_DTYPE, count=count, offset=HEADER_SIZE)
+        return cls(wav.sample_rate, wav.channels * wav.bits // 8, wav.data_offset, index)
+
+    def frame_to_time(self, frames):
+        """Session time in seconds for scalar or array ``frames``."""
+        frames = np.asarray(frames, dtype=np.float64)
+        if self._frames is None:
+            return frames / self.sample_rate
+        # np.interp clamps at the ends; extrapolate at the nominal rate instead
+        t = np.interp(frames, self._frames, self._times)
+        before = frames < self._frames[0]
+        after = frames > self._frames[-1]
+        t = np.where(before, self._times[0] - (self._frames[0] - frames) / self.sample_rate, t)
+        t = np.where(after, self._times[-1] + (frames - self._frames[-1]) / self.sample_rate, t)
+        return t
@@ -0,0 +1,55 @@
+"""Jump to a moment in a recorded session without reading it end to end.
+
+Looks up the elapsed time in ``session_index.bin`` with a binary search and
+prints the matching byte offsets in ``session.wav`` and the data sidecar,
+plus the nearest WAV cue markers (frequency changes, record events).
+
+Usage::
+
+    python tools/session_seek.py <session_dir> <seconds>
+    python tools/session_seek.py <session_dir> --markers
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from session_index import SessionIndexReader  # noqa: E402
+from wav_writer import read_cue_markers  # noqa: E402
+
+
+def seek(session_dir, t):
+    """Return ``(t_indexed, audio_offset, sidecar_offset)`` for time ``t``."""
+    with open(os.path.join(session_dir, "session_index.bin"), "rb") as index_file:
+        return SessionIndexReader(index_file).lookup(t)
+
+
+def markers(session_dir):
+    return read_cue_markers(os.path.join(session_dir, "session.wav"))
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip())
+        return 2
+
+    session_dir = argv[0]
+    if argv[1] == "--markers":
+        for frame, label in markers(session_dir):
+            print(frame, label)
+        return 0
+
+    result = seek(session_dir, float(argv[1]))
+    if result is None:
+        print("Session index is empty.")
+        return 1
+    t_indexed, audio_offset, sidecar_offset = result
+    print("t = {:.3f} s".format(t_indexed))
+    print("audio byte offset = {}".format(audio_offset))
+    print("sidecar byte offset = {}".format(sidecar_offset))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
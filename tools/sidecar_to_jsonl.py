@@ -0,0 +1,49 @@
+"""Convert a binary session sidecar (``session_data.bin``) to JSON Lines.
+
+The output matches what ``SessionManager`` writes in JSONL mode: one
+``{"t": <seconds>, "data": {...}}`` object per line.
+
+Usage::
+
+    python tools/sidecar_to_jsonl.py session_data.bin [session_data.jsonl]
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from sidecar import iter_records, read_schema  # noqa: E402
+
+
+def convert(src_path, dst_path) -> int:
+    """Write ``src_path`` as JSON Lines to ``dst_path``; returns the record count."""
+    count = 0
+    with open(src_path, "rb") as src, open(dst_path, "w") as dst:
+        schema = read_schema(src)
+        for t, payload in iter_records(src, schema):
+            dst.write(json.dumps({"t": t, "data": payload}))
+            dst.write("\n")
+            count += 1
+    return count
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or len(argv) > 2:
+        print(__doc__.strip())
+        return 2
+
+    src_path = argv[0]
+    if len(argv) == 2:
+        dst_path = argv[1]
+    else:
+        dst_path = os.path.splitext(src_path)[0] + ".jsonl"
+
+    count = convert(src_path, dst_path)
+    print("Wrote {} records to {}".format(count, dst_path))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Register-level simulation of the Spooky Box hardware for Linux hosts.
+
+``install()`` registers stand-ins for the CircuitPython modules the device
+code imports (``board``, ``busio``, ``adafruit_bus_device``,
+``adafruit_lis2mdl``, ``adafruit_is31fl3741``, ``storage``,
+``adafruit_sdcard``, ``microcontroller``) and puts ``src/`` and ``src/lib``
+on ``sys.path``, so ``RadioScanner``, ``Radio``, ``EMFReader`` and
+``SessionManager`` run unmodified::
+
+    from tools import sim
+
+    env = sim.install()
+    from radio_scanner import RadioScanner
+    scanner = RadioScanner(env.i2c)
+    env.clock.advance(0.1)
+
+Behind the I2C bus sit register models of the RDA5807M (tune/seek
+latency, STC, per-channel RSSI, RDS group stream), the LIS2MDL (ODR grid,
+data-ready/overrun flags, a configurable field) and the IS31FL3741 LED
+driver. The SD card is a host directory: pass ``env.sd_root`` as the
+``SessionManager`` mount point. With ``virtual_time`` (the default)
+``time.monotonic`` and ``time.sleep`` run on :class:`SimClock`.
+"""
+import os
+import sys
+import tempfile
+import types
+
+from .bus import I2CDevice, SimI2C
+from .clock import SimClock, real_clock
+from .is31fl3741 import IS31FL3741Model
+from .lis2mdl import LIS2MDLModel, earth_field
+from .rda5807m import RDA5807MModel, Station
+
+_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src")
+
+DEFAULT_STATIONS = (
+    Station(8830, 42, ps="SPOOKY  ", text="Tonight on the late show: voices from the static", pi=0x5301, pty=10),
+    Station(9110, 28, ps="WRAITH", text="All request hour", pi=0x5302, pty=15),
+    Station(9590, 51, ps="NEWS 95", pi=0x5303, pty=1),
+    Station(10230, 22),
+    Station(10610, 35, ps="CLASSIC", text="Nocturne in E-flat", pi=0x5304, pty=14),
+)
+
+_MODULES = (
+    "board",
+    "busio",
+    "adafruit_bus_device",
+    "adafruit_bus_device.i2c_device",
+    "adafruit_lis2mdl",
+    "adafruit_is31fl3741",
+    "adafruit_is31fl3741.adafruit_rgbmatrixqt",
+    "storage",
+    "adafruit_sdcard",
+    "microcontroller",
+)
+
+
+class Simulation:
+    """Handles to the simulated bus, clock, device models and SD directory."""
+
+    def __init__(self, i2c, clock, radio, mag, matrix, nvm, sd_root, saved_modules) -> None:
+        self.i2c = i2c
+        self.clock = clock
+        self.radio = radio
+        self.mag = mag
+        self.matrix = matrix
+        self.nvm = nvm
+        self.sd_root = sd_root
+        self._saved = saved_modules
+
+    def uninstall(self) -> None:
+        """Remove the stand-in modules and restore the real clock."""
+        for name in _MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(self._saved)
+        if isinstance(self.clock, SimClock):
+            SimClock.unpatch()
+
+
+def install(*, stations=DEFAULT_STATIONS, field=None, sd_root=None, virtual_time: bool = True, seed: int = 1) -> Simulation:
+    for path in (os.path.join(_SRC, "lib"), _SRC):
+        path = os.path.normpath(path)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    clock = SimClock() if virtual_time else None
+    if clock:
+        clock.patch()
+    now = clock.monotonic if clock else real_clock
+
+    i2c = SimI2C()
+    radio = RDA5807MModel(stations, clock=now, seed=seed)
+    mag = LIS2MDLModel(field or earth_field(), clock=now, seed=seed + 1)
+    matrix = IS31FL3741Model()
+    i2c.attach(0x11, radio)
+    i2c.attach(0x1E, mag)
+    i2c.attach(0x30, matrix)
+    if sd_root is None:
+        sd_root = os.path.join(tempfile.mkdtemp(prefix="spooky_sd_"), "sd")
+    nvm = bytearray(8192)
+
+    saved = {name: sys.modules[name] for name in _MODULES if name in sys.modules}
+    _register(i2c, nvm)
+    return Simulation(i2c, clock or real_clock, radio, mag, matrix, nvm, sd_root, saved)
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def _register(i2c, nvm) -> None:
+    from . import is31fl3741, lis2mdl, storage
+
+    class _SPI:
+        def __init__(self, *args, **kwargs) -> None:
+            pass
+
+        def try_lock(self) -> bool:
+            return True
+
+        def unlock(self) -> None:
+            pass
+
+        def configure(self, **kwargs) -> None:
+            pass
+
+    def _pin(name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return "board." + name
+
+    _module(
+        "board",
+        I2C=lambda: i2c,
+        STEMMA_I2C=lambda: i2c,
+        SPI=_SPI,
+        __getattr__=_pin,
+    )
+    _module("busio", I2C=lambda *args, **kwargs: i2c, SPI=_SPI)
+    bus_device = _module("adafruit_bus_device", __path__=[])
+    bus_device.i2c_device = _module("adafruit_bus_device.i2c_device", I2CDevice=I2CDevice)
+    _module("adafruit_lis2mdl", LIS2MDL=lis2mdl.LIS2MDL)
+    matrix_pkg = _module(
+        "adafruit_is31fl3741",
+        __path__=[],
+        PREFER_BUFFER=is31fl3741.PREFER_BUFFER,
+        NO_BUFFER=is31fl3741.NO_BUFFER,
+    )
+    matrix_pkg.adafruit_rgbmatrixqt = _module(
+        "adafruit_is31fl3741.adafruit_rgbmatrixqt",
+        Adafruit_RGBMatrixQT=is31fl3741.Adafruit_RGBMatrixQT,
+    )
+    _module(
+        "storage",
+        mount=storage.mount,
+        umount=storage.umount,
+        getmount=storage.getmount,
+        remount=storage.remount,
+        VfsFat=storage.VfsFat,
+    )
+    _module("adafruit_sdcard", SDCard=storage.SDCard)
+    _module("microcontroller", nvm=nvm)
@@ -0,0 +1,59 @@
+"""Run the radio scanner and EMF reader against the simulated hardware.
+
+Usage::
+
+    python -m tools.sim [seconds] [--profile]
+
+Prints I2C traffic per device and scheduler timing after ``seconds`` of
+virtual time (default 30). ``--profile`` runs it under cProfile.
+"""
+import sys
+
+from . import install
+
+
+def run(seconds: float = 30.0) -> None:
+    env = install()
+    try:
+        from device_controller import DeviceController
+
+        controller = DeviceController(i2c=env.i2c)
+        controller.initialize()
+        controller.enable_emf()
+        emf = controller.emf_reader
+
+        end = env.clock.now + seconds
+        while env.clock.now < end:
+            controller.loop()
+            deadline = controller.scheduler.next_deadline()
+            env.clock.now = max(env.clock.now + 0.0005, min(deadline, end))
+
+        names = {0x11: "RDA5807M", 0x1E: "LIS2MDL", 0x30: "IS31FL3741"}
+        for address, stats in sorted(env.i2c.stats.items()):
+            print("{:<11} 0x{:02x} {}".format(names.get(address, "?"), address, stats.as_dict()))
+        print("radio tunes:", env.radio.tunes, "rds groups:", env.radio.rds_latched)
+        print("mag:", emf.sample_stats())
+        controller.scheduler.print_report()
+    finally:
+        env.uninstall()
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    profile = "--profile" in argv
+    args = [a for a in argv if a != "--profile"]
+    seconds = float(args[0]) if args else 30.0
+    if profile:
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.runcall(run, seconds)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    else:
+        run(seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
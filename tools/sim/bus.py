@@ -0,0 +1,139 @@
+class BusStats:
+    """Transaction and byte counters for one I2C address."""
+
+    __slots__ = ("transactions", "bytes_out", "bytes_in")
+
+    def __init__(self) -> None:
+        self.transactions = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+
+    def as_dict(self):
+        return {
+            "transactions": self.transactions,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+        }
+
+
+class SimI2C:
+    """A ``busio.I2C`` stand-in that routes transfers to register models.
+
+    Models are attached with ``attach(address, model)`` and implement
+    ``write(data)``, ``read(count)`` and ``write_then_read(data, count)``.
+    Every transfer is counted per address (see ``stats``), which is what the
+    benchmarks use to measure bus traffic.
+    """
+
+    def __init__(self) -> None:
+        self.devices = {}
+        self.stats = {}
+        self._locked = False
+
+    def attach(self, address: int, model) -> None:
+        self.devices[address] = model
+        self.stats[address] = BusStats()
+
+    def reset_stats(self) -> None:
+        for address in self.stats:
+            self.stats[address] = BusStats()
+
+    def totals(self):
+        total = BusStats()
+        for stats in self.stats.values():
+            total.transactions += stats.transactions
+            total.bytes_out += stats.bytes_out
+            total.bytes_in += stats.bytes_in
+        return total
+
+    # busio.I2C API
+    def try_lock(self) -> bool:
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self) -> None:
+        self._locked = False
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def deinit(self) -> None:
+        pass
+
+    def writeto(self, address: int, buffer, *, start: int = 0, end=None) -> None:
+        data = bytes(buffer[start:end])
+        model = self._model(address)
+        stats = self.stats[address]
+        stats.transactions += 1
+        stats.bytes_out += len(data)
+        model.write(data)
+
+    def readfrom_into(self, address: int, buffer, *, start: int = 0, end=None) -> None:
+        if end is None:
+            end = len(buffer)
+        model = self._model(address)
+        data = model.read(end - start)
+        stats = self.stats[address]
+        stats.transactions += 1
+        stats.bytes_in += len(data)
+        buffer[start:end] = data
+
+    def writeto_then_readfrom(
+        self, address: int, out_buffer, in_buffer, *, out_start=0, out_end=None, in_start=0, in_end=None
+    ) -> None:
+        if in_end is None:
+            in_end = len(in_buffer)
+        out = bytes(out_buffer[out_start:out_end])
+        model = self._model(address)
+        data = model.write_then_read(out, in_end - in_start)
+        stats = self.stats[address]
+        stats.transactions += 1
+        stats.bytes_out += len(out)
+        stats.bytes_in += len(data)
+        in_buffer[in_start:in_end] = data
+
+    def _model(self, address: int):
+        model = self.devices.get(address)
+        if model is None:
+            raise OSError(19, "No I2C device at address: 0x{:x}".format(address))
+        return model
+
+
+class I2CDevice:
+    """``adafruit_bus_device.i2c_device.I2CDevice`` on top of :class:`SimI2C`."""
+
+    def __init__(self, i2c, device_address: int, probe: bool = True) -> None:
+        self.i2c = i2c
+        self.device_address = device_address
+        if probe and device_address not in i2c.devices:
+            raise ValueError("No I2C device at address: 0x{:x}".format(device_address))
+
+    def __enter__(self):
+        while not self.i2c.try_lock():
+            pass
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
+        self.i2c.unlock()
+        return False
+
+    def readinto(self, buf, *, start: int = 0, end=None) -> None:
+        self.i2c.readfrom_into(self.device_address, buf, start=start, end=end)
+
+    def write(self, buf, *, start: int = 0, end=None) -> None:
+        self.i2c.writeto(self.device_address, buf, start=start, end=end)
+
+    def write_then_readinto(
+        self, out_buffer, in_buffer, *, out_start=0, out_end=None, in_start=0, in_end=None
+    ) -> None:
+        self.i2c.writeto_then_readfrom(
+            self.device_address,
+            out_buffer,
+            in_buffer,
+            out_start=out_start,
+            out_end=out_end,
+            in_start=in_start,
+            in_end=in_end,
+        )
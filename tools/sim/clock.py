@@ -0,0 +1,47 @@
+import time
+
+_real_monotonic = time.monotonic
+_real_monotonic_ns = time.monotonic_ns
+_real_sleep = time.sleep
+
+
+class SimClock:
+    """Virtual monotonic clock.
+
+    When installed (see :func:`tools.sim.install`) it replaces
+    ``time.monotonic``, ``time.monotonic_ns`` and ``time.sleep``, so device
+    code that polls or sleeps runs instantly and deterministically; ``sleep``
+    just advances the clock.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def monotonic_ns(self) -> int:
+        return int(self.now * 1e9)
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now += seconds
+
+    def advance(self, seconds: float) -> float:
+        self.sleep(seconds)
+        return self.now
+
+    def patch(self) -> None:
+        time.monotonic = self.monotonic
+        time.monotonic_ns = self.monotonic_ns
+        time.sleep = self.sleep
+
+    @staticmethod
+    def unpatch() -> None:
+        time.monotonic = _real_monotonic
+        time.monotonic_ns = _real_monotonic_ns
+        time.sleep = _real_sleep
+
+
+def real_clock() -> float:
+    return _real_monotonic()
@@ -0,0 +1,110 @@
+WIDTH = 13
+HEIGHT = 9
+LEDS = 351
+PAGE0_LEDS = 180
+CMD_UNLOCK = 0xFE
+CMD_PAGE = 0xFD
+UNLOCK_KEY = 0xC5
+PREFER_BUFFER = 2
+NO_BUFFER = 0
+
+
+class IS31FL3741Model:
+    """IS31FL3741 PWM registers (I2C address 0x30), with page switching.
+
+    Page 0 holds LEDs 0-179 and page 1 LEDs 180-350. ``frames`` counts
+    full PWM page updates so benchmarks can see how often the matrix was
+    redrawn.
+    """
+
+    def __init__(self) -> None:
+        self.pwm = bytearray(LEDS)
+        self.page = 0
+        self._unlocked = False
+        self._ptr = 0
+        self.page_writes = 0
+
+    def write(self, data) -> None:
+        if not data:
+            return
+        reg = data[0]
+        if reg == CMD_UNLOCK:
+            self._unlocked = len(data) > 1 and data[1] == UNLOCK_KEY
+            return
+        if reg == CMD_PAGE:
+            if self._unlocked and len(data) > 1:
+                self.page = data[1]
+            self._unlocked = False
+            return
+        if self.page in (0, 1):
+            base = 0 if self.page == 0 else PAGE0_LEDS
+            end = min(LEDS, base + reg + len(data) - 1)
+            self.pwm[base + reg:end] = data[1:1 + end - base - reg]
+            if len(data) > 32:
+                self.page_writes += 1
+
+    def read(self, count: int) -> bytes:
+        return bytes(count)
+
+    def write_then_read(self, data, count: int) -> bytes:
+        return bytes(count)
+
+
+class Adafruit_RGBMatrixQT:
+    """Minimal ``Adafruit_RGBMatrixQT`` with a ``PREFER_BUFFER`` pixel buffer.
+
+    Like the real driver, the buffer carries one spare leading byte for the
+    register address and ``show()`` pushes each PWM page in one write.
+    """
+
+    width = WIDTH
+    height = HEIGHT
+
+    def __init__(self, i2c, address: int = 0x30, allocate: int = NO_BUFFER) -> None:
+        from .bus import I2CDevice
+
+        self.i2c_device = I2CDevice(i2c, address)
+        self._pixel_buffer = bytearray(LEDS + 1) if allocate >= PREFER_BUFFER else None
+        self.global_current = 0xFF
+        self.enable = False
+
+    def set_led_scaling(self, scale: int) -> None:
+        pass
+
+    def fill(self, color: int = 0) -> None:
+        for y in range(HEIGHT):
+            for x in range(WIDTH):
+                self.pixel(x, y, color)
+
+    def pixel(self, x: int, y: int, color: int) -> None:
+        if not (0 <= x < WIDTH and 0 <= y < HEIGHT):
+            return
+        i = 1 + 3 * (y * WIDTH + x)
+        buf = self._pixel_buffer
+        if buf is None:
+            with self.i2c_device as dev:
+                dev.write(bytes((CMD_UNLOCK, UNLOCK_KEY)))
+                dev.write(bytes((CMD_PAGE, 0 if i - 1 < PAGE0_LEDS else 1)))
+            base = 0 if i - 1 < PAGE0_LEDS else PAGE0_LEDS
+            with self.i2c_device as dev:
+                dev.write(bytes((i - 1 - base, (color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)))
+            return
+        buf[i] = (color >> 16) & 0xFF
+        buf[i + 1] = (color >> 8) & 0xFF
+        buf[i + 2] = color & 0xFF
+
+    def show(self) -> None:
+        buf = self._pixel_buffer
+        if buf is None:
+            raise RuntimeError("No pixel buffer to show")
+        with self.i2c_device as dev:
+            dev.write(bytes((CMD_UNLOCK, UNLOCK_KEY)))
+            dev.write(bytes((CMD_PAGE, 0)))
+            buf[0] = 0
+            dev.write(buf, end=1 + PAGE0_LEDS)
+            dev.write(bytes((CMD_UNLOCK, UNLOCK_KEY)))
+            dev.write(bytes((CMD_PAGE, 1)))
+            saved = buf[PAGE0_LEDS]
+            buf[PAGE0_LEDS] = 0
+            dev.write(buf, start=PAGE0_LEDS)
+            buf[PAGE0_LEDS] = saved
@@ -0,0 +1,153 @@
+import math
+import random
+import struct
+
+from .clock import real_clock
+
+WHO_AM_I = 0x4F
+CFG_REG_A = 0x60
+CFG_REG_C = 0x62
+STATUS_REG = 0x67
+OUTX_L = 0x68
+UT_PER_LSB = 0.15
+_ODR_HZ = (10, 20, 50, 100)
+SINGLE_CONVERSION_S = 0.006  # single-mode measurement time
+
+
+class LIS2MDLModel:
+    """Register file of an LIS2MDL magnetometer (I2C address 0x1E).
+
+    Samples are produced on the output-data-rate grid chosen in CFG_REG_A
+    from ``field(t)`` (µT per axis). Writing single mode (MD = 01) takes
+    one sample ``SINGLE_CONVERSION_S`` later and drops back to idle.
+    STATUS_REG reports ZYXDA while an
+    unread sample is waiting and ZYXOR when one was overwritten; reading
+    OUTZ_H clears both. Reads auto-increment from the register pointer.
+    """
+
+    def __init__(self, field=None, *, clock=real_clock, noise: float = 0.05, seed: int = 2) -> None:
+        self.clock = clock
+        self.field = field or earth_field()
+        self.noise = noise
+        self._rng = random.Random(seed)
+        self.regs = bytearray(0x80)
+        self.regs[WHO_AM_I] = 0x40
+        self.regs[CFG_REG_A] = 0x03  # idle after power-on
+        self._ptr = 0
+        self._index = None  # index of the sample held in the output registers
+        self._read_index = None
+        self._single_due = None
+        self.samples = 0
+
+    @property
+    def odr_hz(self) -> int:
+        return _ODR_HZ[(self.regs[CFG_REG_A] >> 2) & 0x03]
+
+    def write(self, data) -> None:
+        if not data:
+            return
+        reg = data[0]
+        for value in data[1:]:
+            self._write_reg(reg, value)
+            reg += 1
+        self._ptr = reg
+
+    def read(self, count: int) -> bytes:
+        self._advance()
+        out = bytearray(count)
+        reg = self._ptr
+        for i in range(count):
+            out[i] = self.regs[reg & 0x7F]
+            if reg == OUTX_L + 5:
+                self._read_index = self._index
+                self.regs[STATUS_REG] = 0
+            reg += 1
+        self._ptr = reg
+        return bytes(out)
+
+    def write_then_read(self, data, count: int) -> bytes:
+        if data:
+            self._ptr = data[0]
+            if len(data) > 1:
+                self.write(data)
+                self._ptr = data[0]
+        return self.read(count)
+
+    # Private methods
+    def _write_reg(self, reg: int, value: int) -> None:
+        if reg == CFG_REG_A and value & 0x20:
+            value &= ~0x20  # soft reset: back to defaults, self-clearing
+            self.regs[CFG_REG_C] = 0
+        if reg == CFG_REG_A and value & 0x03 == 0x01:
+            self._single_due = self.clock() + SINGLE_CONVERSION_S
+        self.regs[reg & 0x7F] = value
+
+    def _advance(self) -> None:
+        mode = self.regs[CFG_REG_A] & 0x03
+        if mode == 0x01:
+            if self._single_due is None or self.clock() < self._single_due:
+                return
+            # Single conversion done: back to idle with the new sample
+            unread = self.regs[STATUS_REG] & 0x08
+            self.regs[CFG_REG_A] |= 0x03
+            self._index = (self._index or 0) + 1
+            self._store(self._single_due, 0x88 if unread else 0x08)
+            self._single_due = None
+            return
+        if mode:
+            return  # idle: no new samples
+        index = int(self.clock() * self.odr_hz)
+        if index == self._index:
+            return
+        if self._read_index is not None and index > self._read_index + 1:
+            status = 0x88  # ZYXOR | ZYXDA
+        else:
+            status = 0x08
+        self._index = index
+        self._store(index / self.odr_hz, status)
+
+    def _store(self, t: float, status: int) -> None:
+        self.regs[STATUS_REG] = status
+        self.samples += 1
+        x, y, z = self.field(t)
+        rng = self._rng
+        values = [int(round((v + rng.gauss(0.0, self.noise)) / UT_PER_LSB)) for v in (x, y, z)]
+        values = [max(-32768, min(32767, v)) for v in values]
+        self.regs[OUTX_L:OUTX_L + 6] = struct.pack("<hhh", *values)
+
+
+def earth_field(x: float = 22.0, y: float = 5.0, z: float = -42.0, *, mains_uT: float = 0.0, mains_hz: float = 60.0):
+    """A constant field, optionally with a mains-frequency component."""
+
+    def field(t):
+        if not mains_uT:
+            return x, y, z
+        m = mains_uT * math.sin(2 * math.pi * mains_hz * t)
+        return x + 0.6 * m, y + 0.8 * m, z
+
+    return field
+
+
+class LIS2MDL:
+    """Minimal ``adafruit_lis2mdl.LIS2MDL`` talking to the register model."""
+
+    def __init__(self, i2c, address: int = 0x1E) -> None:
+        from .bus import I2CDevice
+
+        self.i2c_device = I2CDevice(i2c, address)
+        buf = bytearray(1)
+        with self.i2c_device as dev:
+            dev.write_then_readinto(bytes((WHO_AM_I,)), buf)
+        if buf[0] != 0x40:
+            raise RuntimeError("Failed to find LIS2MDL")
+        with self.i2c_device as dev:
+            dev.write(bytes((CFG_REG_A, 0x20)))  # reset
+            dev.write(bytes((CFG_REG_A, 0x00)))  # continuous, 10 Hz
+        self._buf = bytearray(6)
+
+    @property
+    def magnetic(self):
+        with self.i2c_device as dev:
+            dev.write_then_readinto(bytes((OUTX_L,)), self._buf)
+        x, y, z = struct.unpack("<hhh", self._buf)
+        return x * UT_PER_LSB, y * UT_PER_LSB, z * UT_PER_LSB
@@ -0,0 +1,258 @@
+import random
+
+from .clock import real_clock
+
+# Register bits, mirroring the driver
+CTRL = 0x02
+CTRL_SEEKUP = 0x0200
+CTRL_SEEK = 0x0100
+CTRL_SKMODE = 0x0080
+CTRL_RDS = 0x0008
+CTRL_RESET = 0x0002
+CTRL_ENABLE = 0x0001
+CHAN = 0x03
+CHAN_TUNE = 0x0010
+VOL = 0x05
+VOL_SEEKTH_SHIFT = 8
+RA = 0x0A
+RA_RDS = 0x8000
+RA_STC = 0x4000
+RA_SF = 0x2000
+RA_STEREO = 0x0400
+RB = 0x0B
+RB_FMTRUE = 0x0100
+RB_FMREADY = 0x0080
+RDSA = 0x0C
+
+FREQ_LOW = 8700
+CHANNELS = (10800 - FREQ_LOW) // 10 + 1
+RDS_GROUP_PERIOD = 1.0 / 11.4  # 1187.5 bit/s / 104 bits per group
+
+
+class Station:
+    """A transmitter on one channel, optionally carrying RDS."""
+
+    def __init__(self, freq: int, rssi: int, *, ps: str = "", text: str = "", pi: int = 0x1000, pty: int = 0) -> None:
+        self.freq = freq
+        self.rssi = rssi
+        self.ps = (ps + " " * 8)[:8]
+        self.text = text
+        self.pi = pi or 0x1000
+        self.pty = pty
+
+    def rds_groups(self, clock_minutes=None):
+        """One full RDS cycle as a list of (A, B, C, D) block tuples."""
+        groups = []
+        ps = self.ps.encode("latin-1", "replace")
+        b_common = (self.pty & 0x1F) << 5
+        for seg in range(4):
+            b = (0 << 12) | b_common | seg
+            d = (ps[2 * seg] << 8) | ps[2 * seg + 1]
+            groups.append((self.pi, b, 0xE0CD, d))
+        if self.text:
+            text = (self.text + "\r").encode("latin-1", "replace")
+            text = text + b" " * (-len(text) % 4)
+            for seg in range(min(16, len(text) // 4)):
+                b = (2 << 12) | b_common | seg
+                c = (text[4 * seg] << 8) | text[4 * seg + 1]
+                d = (text[4 * seg + 2] << 8) | text[4 * seg + 3]
+                groups.append((self.pi, b, c, d))
+                # Interleave PS so the name keeps refreshing
+                ps_seg = seg % 4
+                groups.append((self.pi, b_common | ps_seg, 0xE0CD, (ps[2 * ps_seg] << 8) | ps[2 * ps_seg + 1]))
+        if clock_minutes is not None:
+            # 4A clock-time group: MJD left at 0, hour/minute, UTC offset 0
+            hour, minute = divmod(clock_minutes, 60)
+            b = (4 << 12) | b_common
+            c = (hour >> 4) & 0x1
+            d = ((hour & 0x0F) << 12) | (minute << 6)
+            groups.append((self.pi, b, c, d))
+        return groups
+
+
+class RDA5807MModel:
+    """Register file of an RDA5807M at its random-access address (0x11).
+
+    Writes take a register pointer followed by big-endian words and
+    auto-increment; reads continue from the last pointer. Writing TUNE
+    starts a tune that completes ``tune_latency`` seconds later; SEEK walks
+    channels at ``seek_step_latency`` per channel until one's RSSI reaches
+    ``4 * SEEKTH``. Each channel has a noise-floor RSSI unless a
+    :class:`Station` is placed there. While RDS is enabled and the tuned
+    station carries it, a new group is latched into 0x0C-0x0F every
+    87.6 ms; RDSR clears when the group is read, and groups not read in
+    time are lost, as on the chip.
+    """
+
+    def __init__(
+        self,
+        stations=(),
+        *,
+        clock=real_clock,
+        tune_latency: float = 0.05,
+        seek_step_latency: float = 0.004,
+        noise_floor: int = 6,
+        rssi_jitter: int = 1,
+        seed: int = 1,
+    ) -> None:
+        self.clock = clock
+        self.tune_latency = tune_latency
+        self.seek_step_latency = seek_step_latency
+        self.rssi_jitter = rssi_jitter
+        self._rng = random.Random(seed)
+        self.floor = [self._rng.randint(0, noise_floor) for _ in range(CHANNELS)]
+        self.stations = {}
+        for station in stations:
+            self.add_station(station)
+
+        self.regs = [0] * 16
+        self.regs[0] = 0x5804  # chip id
+        self._ptr = 0
+        self.channel = 0
+        self._busy_until = None
+        self._target = 0
+        self._seek_failed = False
+        self._rds_groups = []
+        self._rds_index = 0
+        self._rds_next = None
+        self.rds_latched = 0
+        self.rds_lost = 0
+        self.tunes = 0
+        self.seeks = 0
+
+    def add_station(self, station: Station) -> None:
+        self.stations[(station.freq - FREQ_LOW) // 10] = station
+
+    def rssi(self, channel: int) -> int:
+        station = self.stations.get(channel)
+        base = station.rssi if station else self.floor[channel]
+        if self.rssi_jitter:
+            base += self._rng.randint(-self.rssi_jitter, self.rssi_jitter)
+        return max(0, min(63, base))
+
+    # Bus interface
+    def write(self, data) -> None:
+        if not data:
+            return
+        reg = data[0]
+        for i in range(1, len(data) - 1, 2):
+            self._write_reg(reg & 0x0F, (data[i] << 8) | data[i + 1])
+            reg += 1
+        self._ptr = reg & 0x0F
+
+    def read(self, count: int) -> bytes:
+        self._advance()
+        out = bytearray(count)
+        reg = self._ptr
+        for i in range(0, count - 1, 2):
+            value = self.regs[reg & 0x0F]
+            out[i] = value >> 8
+            out[i + 1] = value & 0xFF
+            if (reg & 0x0F) == RDSA + 3:
+                # Reading the last RDS block releases the group
+                self.regs[RA] &= ~RA_RDS
+            reg += 1
+        return bytes(out)
+
+    def write_then_read(self, data, count: int) -> bytes:
+        if data:
+            self._ptr = data[0] & 0x0F
+            if len(data) > 1:
+                self.write(data)
+                self._ptr = data[0] & 0x0F
+        return self.read(count)
+
+    # Private methods
+    def _write_reg(self, reg: int, value: int) -> None:
+        if reg < CTRL or reg > 0x07:
+            return  # status registers are read-only
+        old = self.regs[reg]
+        self.regs[reg] = value
+        if reg == CTRL:
+            if value & CTRL_RESET and not old & CTRL_RESET:
+                self._reset()
+            elif value & CTRL_SEEK and not old & CTRL_SEEK:
+                self._start_seek(value)
+            if not value & CTRL_RDS:
+                self._rds_next = None
+        elif reg == CHAN and value & CHAN_TUNE:
+            self._start_tune((value >> 6) & 0x3FF)
+
+    def _reset(self) -> None:
+        for reg in range(RA, 16):
+            self.regs[reg] = 0
+        self.channel = 0
+        self._busy_until = None
+        self._rds_next = None
+
+    def _start_tune(self, channel: int) -> None:
+        self.tunes += 1
+        self._target = min(channel, CHANNELS - 1)
+        self._seek_failed = False
+        self._busy_until = self.clock() + self.tune_latency
+        self.regs[RA] &= ~(RA_STC | RA_SF | RA_RDS | RA_STEREO)
+        self._rds_next = None
+
+    def _start_seek(self, ctrl: int) -> None:
+        self.seeks += 1
+        up = bool(ctrl & CTRL_SEEKUP)
+        wrap = not ctrl & CTRL_SKMODE
+        threshold = 4 * ((self.regs[VOL] >> VOL_SEEKTH_SHIFT) & 0x0F)
+        channel = self.channel
+        steps = 0
+        found = False
+        while steps < CHANNELS:
+            channel += 1 if up else -1
+            steps += 1
+            if channel < 0 or channel >= CHANNELS:
+                if not wrap:
+                    channel = max(0, min(CHANNELS - 1, channel))
+                    break
+                channel %= CHANNELS
+            if self.rssi(channel) >= threshold:
+                found = True
+                break
+        self._target = channel
+        self._seek_failed = not found
+        self._busy_until = self.clock() + steps * self.seek_step_latency
+        self.regs[RA] &= ~(RA_STC | RA_SF | RA_RDS | RA_STEREO)
+        self._rds_next = None
+
+    def _advance(self) -> None:
+        """Bring status registers up to date with the clock."""
+        now = self.clock()
+        if self._busy_until is not None and now >= self._busy_until:
+            self._busy_until = None
+            self.channel = self._target
+            self.regs[CHAN] &= ~CHAN_TUNE
+            self.regs[CTRL] &= ~CTRL_SEEK
+            ra = RA_STC | (self.channel & 0x3FF)
+            if self._seek_failed:
+                ra |= RA_SF
+            self.regs[RA] = ra
+            station = self.stations.get(self.channel)
+            self._rds_groups = station.rds_groups() if station and self.regs[CTRL] & CTRL_RDS else []
+            self._rds_index = 0
+            self._rds_next = now + RDS_GROUP_PERIOD if self._rds_groups else None
+
+        if self._busy_until is None:
+            rssi = self.rssi(self.channel)
+            rb = rssi << 10
+            if rssi >= 20:
+                rb |= RB_FMTRUE | RB_FMREADY
+                self.regs[RA] |= RA_STEREO if rssi >= 35 else 0
+            self.regs[RB] = rb
+
+        if self._rds_next is not None and now >= self._rds_next:
+            missed = int((now - self._rds_next) / RDS_GROUP_PERIOD)
+            if self.regs[RA] & RA_RDS:
+                missed += 1  # the latched group was never read
+            self.rds_lost += missed
+            self._rds_index = (self._rds_index + missed) % len(self._rds_groups)
+            group = self._rds_groups[self._rds_index]
+            self._rds_index = (self._rds_index + 1) % len(self._rds_groups)
+            for i in range(4):
+                self.regs[RDSA + i] = group[i]
+            self.regs[RA] |= RA_RDS
+            self.rds_latched += 1
+            self._rds_next += (missed + 1) * RDS_GROUP_PERIOD
@@ -0,0 +1,43 @@
+import os
+
+_mounts = {}
+
+
+class SDCard:
+    """``adafruit_sdcard.SDCard`` stand-in; the card is a host directory."""
+
+    def __init__(self, spi=None, cs=None, baudrate=None) -> None:
+        self.spi = spi
+        self.cs = cs
+
+
+class VfsFat:
+    def __init__(self, block_device) -> None:
+        self.block_device = block_device
+
+
+def mount(vfs, mount_path, *, readonly: bool = False) -> None:
+    """Mounting creates ``mount_path`` on the host; files go straight there."""
+    if mount_path in _mounts:
+        raise OSError(16, "Mount point busy: {}".format(mount_path))
+    os.makedirs(mount_path, exist_ok=True)
+    _mounts[mount_path] = vfs
+
+
+def umount(mount):
+    for path, vfs in list(_mounts.items()):
+        if mount in (path, vfs):
+            del _mounts[path]
+            return
+    raise OSError(22, "Not mounted: {}".format(mount))
+
+
+def getmount(mount_path):
+    try:
+        return _mounts[mount_path]
+    except KeyError:
+        raise ValueError("No mount at {}".format(mount_path))
+
+
+def remount(mount_path, readonly: bool = False, *, disable_concurrent_write_protection: bool = False) -> None:
+    pass